@@ -1,8 +1,17 @@
-"""Generate a tiny synthetic repo with a cycle to demo GitCube."""
+"""Generate a synthetic repo to demo (or benchmark) GitCube.
+
+Without arguments this writes the tiny three-file demo with a cycle (a <-> b).
+With --modules it delegates to gitcube.synthetic for a scaled repo:
+
+  python examples/demo_repo_generator.py
+  python examples/demo_repo_generator.py --modules 10000 --package-depth 3 \\
+      --fanout powerlaw --mean-fanout 4 --cycle-density 0.05 --file-size 2048
+"""
+import argparse
 from pathlib import Path
 
-def main() -> None:
-    out = Path("demo_repo")
+
+def write_tiny_demo(out: Path) -> None:
     out.mkdir(exist_ok=True)
     (out / "a.py").write_text("import b\n", encoding="utf-8")
     (out / "b.py").write_text("import a\n", encoding="utf-8")
@@ -10,5 +19,45 @@ def main() -> None:
     (out / "README.md").write_text("# demo_repo\n", encoding="utf-8")
     print("Generated demo_repo with a circular import: a <-> b")
 
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--out", default="demo_repo", help="Output folder (default: demo_repo)")
+    p.add_argument("--modules", type=int, default=None, help="Module count (enables the scalable generator)")
+    p.add_argument("--package-depth", type=int, default=2)
+    p.add_argument("--packages-per-level", type=int, default=8)
+    p.add_argument("--fanout", choices=["fixed", "uniform", "powerlaw"], default="powerlaw")
+    p.add_argument("--mean-fanout", type=float, default=3.0)
+    p.add_argument("--cycle-density", type=float, default=0.02, help="Fraction of modules with a back-edge")
+    p.add_argument("--file-size", type=int, default=512, help="Approximate bytes per module")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    out = Path(args.out)
+    if args.modules is None:
+        write_tiny_demo(out)
+        return
+
+    from gitcube.synthetic import SynthConfig, generate_repo
+
+    stats = generate_repo(
+        out,
+        SynthConfig(
+            modules=args.modules,
+            package_depth=args.package_depth,
+            packages_per_level=args.packages_per_level,
+            fanout=args.fanout,
+            mean_fanout=args.mean_fanout,
+            cycle_density=args.cycle_density,
+            file_size=args.file_size,
+            seed=args.seed,
+        ),
+    )
+    print(
+        f"Generated {out} with {stats['modules']} modules, {stats['edges']} imports "
+        f"({stats['back_edges']} cycle-closing), {stats['bytes']} bytes"
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -2,7 +2,7 @@
 """Repository analyzer entrypoint.
 
 This module keeps the MVP intentionally small:
-- Ingest Python files
+- Ingest source files (Python, plus JS/TS/Go via scanner extractors)
 - Build a lightweight dependency graph
 - Compute a few stability metrics
 - Decide ALLOW/BLOCK ("Meru gate")
@@ -11,28 +11,537 @@ This module keeps the MVP intentionally small:
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from .ingest import ingest_files
-from .graph import build_import_graph
-from .metrics import compute_metrics, decide_action
-from .report import build_report_dict, print_report
+from .ingest import FileInfo, ReadAhead, duplicate_clusters, ingest_files
+from .graph import EdgeProvenance, Graph, build_import_graph
+from .metrics import Metrics, compute_metrics
+from .report import build_report_dict, print_profile, print_report
+from .baseline import load_baseline, save_baseline, thresholds_for_metric, RepoBaseline
+from .dna import build_structural_dna
+from .layers import compute_octave_distribution
+from .profile import StageProfiler, maybe_profiler
+from .externals import DEFAULT_EXTERNALS, ExternalFilter, filter_graph, load_import_index
 
+if TYPE_CHECKING:
+    from .rules import RuleSet
 
-def analyze_repo_dict(path: Path) -> Dict[str, Any]:
-    files = ingest_files(path)
-    graph = build_import_graph(files)
-    metrics = compute_metrics(graph, files)
-    action = decide_action(metrics)
-    return build_report_dict(path, files, graph, metrics, action)
 
+def _action_with_dynamic_thresholds(
+    *,
+    metrics,
+    repo_root: Path,
+    baseline_path: Path,
+    update_baseline: bool,
+    disable_baseline: bool,
+    profiler: Optional[StageProfiler] = None,
+    estimates: Optional[Dict[str, Any]] = None,
+    gated: Optional[Dict[str, float]] = None,
+    rules: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # ``gated`` adds opt-in metrics (e.g. import_closure) to the gate and baseline.
+    # ``rules`` (a RuleSet summary) escalates the verdict on forbidden imports.
+    # approximate (time-budgeted) metrics are gated on their CI upper bound
+    # and never written into the rolling baseline
+    approximate = {k for k, e in (estimates or {}).items() if not e.exact}
+    if approximate:
+        update_baseline = False
+    if profiler is not None and not disable_baseline:
+        with profiler.stage("baseline", files=1):
+            baseline = load_baseline(baseline_path)
+    else:
+        baseline = None if disable_baseline else load_baseline(baseline_path)
+    if baseline is None and not disable_baseline:
+        baseline = RepoBaseline(window=30)
 
-def analyze_repo_text(path: Path) -> Dict[str, Any]:
+    thresholds: Dict[str, Dict[str, float]] = {}
+    # NOTE: v0.1 computes entropy_score/cycle_index/density.
+    # churn_accel is reserved for future and is excluded from gating to avoid false BLOCK.
+    values = {k: float(getattr(metrics, k)) for k in ["entropy_score", "cycle_index", "density"]}
+    values.update(gated or {})
+    for k, v in values.items():
+        th = thresholds_for_metric(
+            key=k,
+            value=v,
+            n_nodes=metrics.n_nodes,
+            n_edges=metrics.n_edges,
+            baseline=None if disable_baseline else baseline,
+        )
+        thresholds[k] = {"warn": th.warn, "block": th.block, "method": th.method}
+
+    warn_count = 0
+    block_hit = False
+    for k, th in thresholds.items():
+        v = float(estimates[k].high) if k in approximate else values[k]
+        if v >= float(th["block"]):
+            block_hit = True
+        elif v >= float(th["warn"]):
+            warn_count += 1
+
+    if block_hit:
+        recommendation = "BLOCK"
+        reason = "threshold_block"
+    elif warn_count >= 2:
+        recommendation = "WARN"
+        reason = "threshold_warn_accumulated"
+    elif warn_count == 1:
+        recommendation = "WARN"
+        reason = "threshold_warn"
+    else:
+        recommendation = "ALLOW"
+        reason = "below_threshold"
+    if rules is not None and rules["violations"]:
+        if rules["severity"] == "block":
+            recommendation, reason = "BLOCK", "rule_violation"
+        elif recommendation == "ALLOW":
+            recommendation, reason = "WARN", "rule_violation"
+
+    if (baseline is not None) and update_baseline and not disable_baseline:
+        baseline.update(values)
+        if profiler is not None:
+            with profiler.stage("baseline", files=1):
+                save_baseline(baseline_path, baseline)
+        else:
+            save_baseline(baseline_path, baseline)
+
+    dna = build_structural_dna(
+        metrics={
+            "entropy_score": metrics.entropy_score,
+            "cycle_index": metrics.cycle_index,
+            "density": metrics.density,
+            "change_score": 0.0,
+            "churn_accel": metrics.churn_accel,
+        },
+        thresholds=thresholds,
+        gate=recommendation,
+        n_nodes=metrics.n_nodes,
+        rules=rules,
+    )
+
+    return {
+        "action": {"recommendation": recommendation, "reason": reason},
+        "thresholds": thresholds,
+        "dna": dna,
+        "baseline": {
+            "path": str(baseline_path),
+            "enabled": (not disable_baseline),
+            "updated": bool(update_baseline),
+            "samples": {k: len(v) for k, v in baseline.samples.items()} if baseline is not None else {},
+        },
+    }
+
+
+@dataclass
+class AnalysisOptions:
+    """Pipeline knobs beyond baselining; defaults reproduce the plain run."""
+
+    jobs: int = 0  # worker processes for import extraction (0/1 = in-process)
+    external: bool = False  # stream edges into an on-disk store (see extmem.py)
+    ram_limit_mb: int = 512  # memory ceiling for the external store
+    store_path: Optional[Path] = None  # default: <repo>/.gitcube/extmem.sqlite
+    time_budget_s: Optional[float] = None  # anytime mode: sample and estimate (see anytime.py)
+    externals: str = DEFAULT_EXTERNALS  # keep | collapse | exclude imported non-repo modules
+    import_index_path: Optional[Path] = None  # default: <repo>/.gitcube/import_index.json
+    granularity: str = "module"  # module | symbol (classes/functions, see symbols.py)
+    map_reduce: bool = False  # per-package partials merged into exact metrics (see mapreduce.py)
+    snapshot_tree: Optional[str] = None  # git tree hash: persist graph + SCCs + metrics (see snapshot.py)
+    snapshot_dir: Optional[Path] = None  # default: <repo>/.gitcube/snapshots
+    snapshot_max_mb: int = 256  # LRU-evict older snapshots beyond this total
+    import_time: bool = False  # report eager import closures (see importtime.py)
+    import_time_gate: bool = False  # also gate worst entry-point closure as ``import_closure``
+    rules_path: Optional[Path] = None  # [tool.gitcube.rules] source; default: <repo>/pyproject.toml
+    read_ahead: Optional[ReadAhead] = None  # threaded file reads for high-latency filesystems
+
+
+def _external_filter(path: Path, opts: AnalysisOptions, profiler: Optional[StageProfiler]) -> ExternalFilter:
+    cache = opts.import_index_path or (path / ".gitcube" / "import_index.json")
+    if profiler is not None:
+        with profiler.stage("externals", files=1):
+            index = load_import_index(cache)
+    else:
+        index = load_import_index(cache)
+    return ExternalFilter(index, opts.externals)
+
+
+def _load_rules(path: Path, opts: AnalysisOptions) -> Optional["RuleSet"]:
+    from .rules import load_rules
+
+    return load_rules(opts.rules_path or (path / "pyproject.toml"), root=path)
+
+
+def _save_snapshot(
+    path: Path, graph: Graph, metrics: Metrics, opts: AnalysisOptions, profiler: Optional[StageProfiler]
+) -> None:
+    from .snapshot import SnapshotStore, default_snapshot_dir, snapshot_key
+
+    tree = str(opts.snapshot_tree)
+    store = SnapshotStore(opts.snapshot_dir or default_snapshot_dir(path), max_bytes=opts.snapshot_max_mb << 20)
+    try:
+        store.save(
+            snapshot_key(tree, granularity=opts.granularity, externals=opts.externals),
+            graph,
+            metrics,
+            tree=tree,
+            meta={"granularity": opts.granularity, "externals": opts.externals},
+            profiler=profiler,
+        )
+    except OSError:
+        pass  # a cache: never fail the analysis over it
+
+
+def _run_pipeline(
+    path: Path,
+    *,
+    baseline_path: Path | None,
+    update_baseline: bool,
+    disable_baseline: bool,
+    profiler: Optional[StageProfiler],
+    options: Optional[AnalysisOptions] = None,
+) -> Tuple[List[FileInfo], Graph, Metrics, Dict[str, Any]]:
+    opts = options or AnalysisOptions()
+    if opts.granularity != "module" and (opts.external or opts.time_budget_s is not None or opts.map_reduce):
+        raise ValueError("symbol granularity is only available in the in-memory pipeline")
+    if (opts.import_time or opts.import_time_gate) and (
+        opts.granularity != "module" or opts.external or opts.time_budget_s is not None or opts.map_reduce
+    ):
+        raise ValueError("import-time analysis is only available in the in-memory module pipeline")
+    if opts.map_reduce:
+        from .mapreduce import run_map_reduce
+
+        result = run_map_reduce(
+            path,
+            jobs=opts.jobs,
+            externals=opts.externals,
+            import_index_path=opts.import_index_path,
+            profiler=profiler,
+        )
+        return _merged_pipeline(
+            path,
+            result,
+            baseline_path=baseline_path,
+            update_baseline=update_baseline,
+            disable_baseline=disable_baseline,
+            profiler=profiler,
+        )
+    if opts.time_budget_s is not None:
+        return _run_budgeted_pipeline(
+            path,
+            baseline_path=baseline_path,
+            update_baseline=update_baseline,
+            disable_baseline=disable_baseline,
+            profiler=profiler,
+            options=opts,
+        )
+    if opts.external:
+        return _run_external_pipeline(
+            path,
+            baseline_path=baseline_path,
+            update_baseline=update_baseline,
+            disable_baseline=disable_baseline,
+            profiler=profiler,
+            options=opts,
+        )
+    files = ingest_files(path, profiler=profiler, read=opts.read_ahead)
+    flt = _external_filter(path, opts, profiler).set_tree((f.path for f in files), path)
+    provenance = None
+    rules = None
+    if opts.granularity == "symbol":
+        from .symbols import build_symbol_graph
+
+        graph = build_symbol_graph(path, files, profiler=profiler)
+        flt.index.internal |= set(graph.lang)
+    else:
+        provenance = EdgeProvenance(path)
+        rules = _load_rules(path, opts)
+        graph = build_import_graph(files, profiler=profiler, jobs=opts.jobs, provenance=provenance, rules=rules)
+    if profiler is not None:
+        t = profiler.clock()
+    if flt.mode == "keep":
+        for n in graph.nodes:
+            flt(n)
+    else:
+        graph = filter_graph(graph, flt)
+    if profiler is not None:
+        profiler.charge("externals", t, nodes=len(graph.nodes))
+    metrics = compute_metrics(graph, files, profiler=profiler)
+    if opts.snapshot_tree is not None:
+        _save_snapshot(path, graph, metrics, opts, profiler)
+    import_time = None
+    if opts.import_time or opts.import_time_gate:
+        from .importtime import analyze_import_time, build_import_time_graph
+
+        import_time = analyze_import_time(build_import_time_graph(files, profiler=profiler), profiler=profiler)
+    violations = rules.summary() if rules is not None else None
+    bp = baseline_path or (path / ".gitcube" / "baseline.json")
+    extra = _action_with_dynamic_thresholds(
+        metrics=metrics,
+        repo_root=path,
+        baseline_path=bp,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=profiler,
+        gated={"import_closure": import_time["worst_share"]} if opts.import_time_gate else None,
+        rules=violations,
+    )
+    if import_time is not None:
+        extra["import_time"] = import_time
+    if violations is not None:
+        extra["rules"] = violations
+    if opts.granularity == "module":
+        extra["duplicates"] = duplicate_clusters(files, path)
+    if metrics.cycle_index > 0:
+        from .cuts import suggest_cuts
+        from .metrics import condense
+        from .witness import witness_cycles
+
+        condensed = condense(graph)
+        extra["cycles"] = witness_cycles(graph, provenance, condensed=condensed, profiler=profiler)
+        extra["cuts"] = suggest_cuts(graph, metrics, provenance, condensed=condensed, profiler=profiler)
+    if profiler is not None:
+        with profiler.stage("layers", nodes=metrics.n_nodes, edges=metrics.n_edges):
+            extra["octave_distribution"] = compute_octave_distribution(graph)
+    else:
+        extra["octave_distribution"] = compute_octave_distribution(graph)
+    extra["externals"] = flt.summary()
+    extra["granularity"] = opts.granularity
+    return files, graph, metrics, extra
+
+
+def _merged_pipeline(
+    path: Path,
+    result: Any,
+    *,
+    baseline_path: Path | None,
+    update_baseline: bool,
+    disable_baseline: bool,
+    profiler: Optional[StageProfiler],
+) -> Tuple[List[FileInfo], Any, Metrics, Dict[str, Any]]:
+    """Gate a mapreduce.MergeResult; no graph is materialized, so no octaves."""
+    bp = baseline_path or (path / ".gitcube" / "baseline.json")
+    extra = _action_with_dynamic_thresholds(
+        metrics=result.metrics,
+        repo_root=path,
+        baseline_path=bp,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=profiler,
+    )
+    extra["octave_distribution"] = []
+    extra["file_count"] = result.files
+    extra["map_reduce"] = {"packages": len(result.packages)}
+    return [], result, result.metrics, extra
+
+
+def _merge(
+    partials: List[Dict[str, Any]],
+    path: Path,
+    *,
+    baseline_path: Path | None,
+    update_baseline: bool,
+    disable_baseline: bool,
+) -> Tuple[List[FileInfo], Any, Metrics, Dict[str, Any]]:
+    from .mapreduce import merge_partials
+
+    return _merged_pipeline(
+        path,
+        merge_partials(partials),
+        baseline_path=baseline_path,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=None,
+    )
+
+
+def analyze_partials_dict(
+    partials: List[Dict[str, Any]],
+    *,
+    path: Path = Path("."),
+    baseline_path: Path | None = None,
+    update_baseline: bool = False,
+    disable_baseline: bool = False,
+) -> Dict[str, Any]:
+    """Report for partials produced elsewhere (`gitcube partial`), merged here."""
+    files, graph, metrics, extra = _merge(
+        partials, path, baseline_path=baseline_path, update_baseline=update_baseline, disable_baseline=disable_baseline
+    )
+    return build_report_dict(path, files, graph, metrics, extra)
+
+
+def analyze_partials_text(
+    partials: List[Dict[str, Any]],
+    *,
+    path: Path = Path("."),
+    baseline_path: Path | None = None,
+    update_baseline: bool = False,
+    disable_baseline: bool = False,
+) -> Dict[str, Any]:
+    files, graph, metrics, extra = _merge(
+        partials, path, baseline_path=baseline_path, update_baseline=update_baseline, disable_baseline=disable_baseline
+    )
+    print_report(path, files, graph, metrics, extra)
+    return build_report_dict(path, files, graph, metrics, extra)
+
+
+def _run_budgeted_pipeline(
+    path: Path,
+    *,
+    baseline_path: Path | None,
+    update_baseline: bool,
+    disable_baseline: bool,
+    profiler: Optional[StageProfiler],
+    options: AnalysisOptions,
+) -> Tuple[List[FileInfo], Graph, Metrics, Dict[str, Any]]:
+    """Anytime variant: parse a random sample until the deadline, then estimate."""
+    import time
+
+    from .anytime import PARSE_SHARE, estimate_metrics, sample_graph
+
+    budget = float(options.time_budget_s or 0.0)
+    t0 = time.perf_counter()
+    flt = _external_filter(path, options, profiler)
+    sample = sample_graph(path, deadline=t0 + PARSE_SHARE * budget, profiler=profiler, externals=flt)
+    metrics, estimates = estimate_metrics(sample, profiler=profiler)
+    bp = baseline_path or (path / ".gitcube" / "baseline.json")
+    extra = _action_with_dynamic_thresholds(
+        metrics=metrics,
+        repo_root=path,
+        baseline_path=bp,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=profiler,
+        estimates=estimates,
+    )
+    if profiler is not None:
+        with profiler.stage("layers", nodes=metrics.n_nodes, edges=metrics.n_edges):
+            extra["octave_distribution"] = compute_octave_distribution(sample.graph)
+    else:
+        extra["octave_distribution"] = compute_octave_distribution(sample.graph)
+    extra["externals"] = flt.summary()
+    extra["granularity"] = options.granularity
+    extra["estimates"] = {k: e.to_dict() for k, e in estimates.items()}
+    extra["sampling"] = {
+        "time_budget_s": budget,
+        "elapsed_s": time.perf_counter() - t0,
+        "modules_total": sample.modules_total,
+        "modules_parsed": sample.modules_parsed,
+        "seeds": len(sample.sampled),
+        "complete": sample.complete,
+    }
+    return sample.files, sample.graph, metrics, extra
+
+
+def _run_external_pipeline(
+    path: Path,
+    *,
+    baseline_path: Path | None,
+    update_baseline: bool,
+    disable_baseline: bool,
+    profiler: Optional[StageProfiler],
+    options: AnalysisOptions,
+) -> Tuple[List[FileInfo], Any, Metrics, Dict[str, Any]]:
+    """Out-of-core variant: files are streamed, edges live in SQLite."""
+    from .extmem import ExternalGraph, build_external_graph, compute_metrics_external, external_octave_distribution
+    from .ingest import _walk, iter_files
+
+    paths = _walk(path.resolve())
+    flt = _external_filter(path, options, profiler).set_tree(paths, path)
+    store_path = options.store_path or (path / ".gitcube" / "extmem.sqlite")
+    store = ExternalGraph(store_path, ram_limit_mb=options.ram_limit_mb)
+    rules = _load_rules(path, options)
+    files = iter_files(path, paths, read=options.read_ahead)
+    build_external_graph(files, store, profiler=profiler, externals=flt, rules=rules)
+    metrics = compute_metrics_external(store, profiler=profiler)
+    violations = rules.summary() if rules is not None else None
+    bp = baseline_path or (path / ".gitcube" / "baseline.json")
+    extra = _action_with_dynamic_thresholds(
+        metrics=metrics,
+        repo_root=path,
+        baseline_path=bp,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=profiler,
+        rules=violations,
+    )
+    if violations is not None:
+        extra["rules"] = violations
+    if profiler is not None:
+        with profiler.stage("layers", nodes=metrics.n_nodes, edges=metrics.n_edges):
+            extra["octave_distribution"] = external_octave_distribution(store)
+    else:
+        extra["octave_distribution"] = external_octave_distribution(store)
+    extra["file_count"] = store.file_count
+    extra["externals"] = flt.summary()
+    extra["granularity"] = options.granularity
+    extra["external"] = {
+        "store": str(store_path),
+        "ram_limit_mb": int(options.ram_limit_mb),
+        "adjacency": "csr" if store.csr_fits() else "sqlite",
+        **store.degree_stats(),
+    }
+    return [], store, metrics, extra
+
+
+def analyze_repo_dict(
+    path: Path,
+    *,
+    baseline_path: Path | None = None,
+    update_baseline: bool = False,
+    disable_baseline: bool = False,
+    profile: bool = False,
+    profiler: Optional[StageProfiler] = None,
+    options: Optional[AnalysisOptions] = None,
+) -> Dict[str, Any]:
+    if profiler is None:
+        profiler = maybe_profiler(profile)
+    files, graph, metrics, extra = _run_pipeline(
+        path,
+        baseline_path=baseline_path,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=profiler,
+        options=options,
+    )
+    if profiler is None:
+        return build_report_dict(path, files, graph, metrics, extra)
+    with profiler.stage("report"):
+        report = build_report_dict(path, files, graph, metrics, extra)
+    profiler.stop()
+    if profile:
+        report["profile"] = profiler.to_dict()
+    return report
+
+
+def analyze_repo_text(
+    path: Path,
+    *,
+    baseline_path: Path | None = None,
+    update_baseline: bool = False,
+    disable_baseline: bool = False,
+    profile: bool = False,
+    profiler: Optional[StageProfiler] = None,
+    options: Optional[AnalysisOptions] = None,
+) -> Dict[str, Any]:
     """Print the pretty report and also return the dict (useful for tests/CI)."""
-    files = ingest_files(path)
-    graph = build_import_graph(files)
-    metrics = compute_metrics(graph, files)
-    action = decide_action(metrics)
-    print_report(path, files, graph, metrics, action)
-    return build_report_dict(path, files, graph, metrics, action)
+    if profiler is None:
+        profiler = maybe_profiler(profile)
+    files, graph, metrics, extra = _run_pipeline(
+        path,
+        baseline_path=baseline_path,
+        update_baseline=update_baseline,
+        disable_baseline=disable_baseline,
+        profiler=profiler,
+        options=options,
+    )
+    if profiler is None:
+        print_report(path, files, graph, metrics, extra)
+        return build_report_dict(path, files, graph, metrics, extra)
+    with profiler.stage("report"):
+        print_report(path, files, graph, metrics, extra)
+        report = build_report_dict(path, files, graph, metrics, extra)
+    profiler.stop()
+    if profile:
+        report["profile"] = profiler.to_dict()
+        print_profile(report["profile"])
+    return report
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+"""Anytime analysis: always return a verdict within a wall-clock budget.
+
+``gitcube analyze --time-budget 30s`` runs the pipeline in order of
+importance. The walk is always complete, so every source module is a known
+node. Parsing then proceeds seed by seed until the parse deadline
+(``PARSE_SHARE`` of the budget): seeds are modules in seeded random order,
+and each seed's forward import closure is parsed in full before the next
+seed starts (parses are shared, so later seeds get cheap quickly).
+
+If everything got parsed, metrics are exact and identical to a normal run.
+Otherwise the completed seeds are a simple random sample of the modules in
+which every seed is measured exactly:
+
+- cycle_index: a seed's SCC lies inside its closure, so "is it on a cycle"
+  is decided by Tarjan on the partial graph. The cyclic share of sources
+  gets a Wilson score interval, floored by the cycles already proven;
+- density: a seed's out-degree is known, so the edge count is
+  ``N * mean(out-degree)`` with a finite-population corrected interval,
+  floored by the edges actually seen.
+
+Each metric is marked ``exact`` or ``approximate``; the gate compares the
+upper bound of approximate metrics, and approximate runs never feed the
+rolling baseline.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+import math
+import random
+import re
+import time
+
+from .graph import EXTRACTORS, Graph, _extract, index_graph
+from .ingest import FileInfo, _walk
+from .metrics import Metrics, _cyclic_nodes, compute_metrics, strongly_connected_components
+
+if TYPE_CHECKING:
+    from .externals import ExternalFilter
+    from .profile import StageProfiler
+
+PARSE_SHARE = 0.6  # of the budget; the rest is left for cycles, gate and report
+Z_95 = 1.96
+
+_DURATION = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*(ms|s|m|h)?\s*$")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(text: str) -> float:
+    """'30s', '2m', '500ms', '1.5h' or bare seconds -> seconds."""
+    m = _DURATION.match(str(text))
+    if not m:
+        raise ValueError(f"bad duration {text!r} (expected e.g. 30s, 2m, 500ms)")
+    return float(m.group(1)) * _UNITS[m.group(2) or "s"]
+
+
+@dataclass
+class Estimate:
+    value: float
+    low: float
+    high: float
+    exact: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "value": float(self.value),
+            "ci95": [float(self.low), float(self.high)],
+            "mode": "exact" if self.exact else "approximate",
+        }
+
+
+@dataclass
+class SampleResult:
+    graph: Graph
+    files: List[FileInfo]
+    modules_total: int
+    modules_parsed: int
+    out_degree: List[int] = field(default_factory=list)  # per sampled module
+    sampled: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return self.modules_parsed >= self.modules_total
+
+
+def _wilson(k: float, n: int, z: float = Z_95) -> Tuple[float, float]:
+    if n <= 0:
+        return 0.0, 1.0
+    p = k / n
+    den = 1.0 + z * z / n
+    mid = (p + z * z / (2 * n)) / den
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+
+def sample_graph(
+    root: Path,
+    *,
+    deadline: float,
+    seed: int = 0,
+    max_seeds: Optional[int] = None,
+    profiler: Optional["StageProfiler"] = None,
+    externals: Optional["ExternalFilter"] = None,
+) -> SampleResult:
+    """Walk everything, then parse the closures of random seeds until ``deadline``."""
+    if profiler is not None:
+        t = profiler.clock()
+    paths = _walk(root.resolve())
+    if externals is not None:
+        externals.set_tree(paths, root)
+    units: Dict[str, List[Path]] = {}
+    lang: Dict[str, str] = {}
+    for p in paths:
+        ex = EXTRACTORS[p.suffix]
+        mod = ex.module_name(p)
+        units.setdefault(mod, []).append(p)
+        lang.setdefault(mod, ex.lang)
+    if profiler is not None:
+        profiler.charge("walk", t, files=len(paths))
+
+    order = sorted(units)
+    random.Random(seed).shuffle(order)
+
+    nodes: Set[str] = set(order)
+    edges: Dict[str, Set[str]] = {}
+    files: List[FileInfo] = []
+
+    def parse(mod: str) -> Set[str]:
+        deps: Set[str] = set()
+        for p in units[mod]:
+            if profiler is not None:
+                t = profiler.clock()
+            try:
+                text = p.read_bytes().decode("utf-8", errors="ignore")
+            except Exception:
+                continue
+            if profiler is not None:
+                profiler.charge("read", t, files=1, bytes=len(text))
+                t = profiler.clock()
+            got = _extract(p.suffix, text)
+            if profiler is not None:
+                profiler.charge("parse", t, files=1, bytes=len(text))
+            files.append(FileInfo(path=p, text=text))
+            if got:
+                deps.update(got if externals is None else externals.resolve_all(got))
+        edges[mod] = deps
+        nodes.update(deps)
+        return deps
+
+    seeds: List[str] = []
+    out_degree: List[int] = []
+    timed_out = False
+    for s in order:
+        if len(seeds) == max_seeds:
+            break
+        todo = [s]
+        while todo:
+            if time.perf_counter() >= deadline:
+                timed_out = True
+                break
+            mod = todo.pop()
+            if mod in edges:
+                continue
+            todo.extend(d for d in parse(mod) if d in units and d not in edges)
+        if timed_out:
+            break  # this seed's closure is incomplete: not part of the sample
+        seeds.append(s)
+        out_degree.append(len(edges[s]))
+
+    parsed = len(edges)
+    for n in nodes:
+        edges.setdefault(n, set())
+    return SampleResult(
+        graph=Graph(nodes=nodes, edges=edges, lang=lang),
+        files=files,
+        modules_total=len(order),
+        modules_parsed=parsed,
+        out_degree=out_degree,
+        sampled=seeds,
+    )
+
+
+def _density_estimate(s: SampleResult, n: int, m_seen: int) -> Estimate:
+    k, big_n = len(s.out_degree), s.modules_total
+    pairs = max(1, n * (n - 1))
+    mean = sum(s.out_degree) / max(1, k)
+    var = sum((d - mean) ** 2 for d in s.out_degree) / max(1, k - 1)
+    fpc = (big_n - k) / max(1, big_n - 1)
+    half = Z_95 * big_n * math.sqrt(var / max(1, k) * fpc)
+    m_hat = max(float(m_seen), big_n * mean)
+    low, high = max(float(m_seen), m_hat - half) / pairs, min(1.0, (m_hat + half) / pairs)
+    if k < 2 and k < big_n:
+        # no spread to go on: anything from the edges seen to a complete graph
+        low, high = m_seen / pairs, 1.0
+    return Estimate(value=m_hat / pairs, low=low, high=high, exact=False)
+
+
+def _cycle_estimate(s: SampleResult, n: int) -> Estimate:
+    names, adj = index_graph(s.graph)
+    comp, n_comps = strongly_connected_components(adj)
+    cyclic = set(_cyclic_nodes(adj, comp, n_comps))
+
+    ix = {name: i for i, name in enumerate(names)}
+    k = len(s.sampled)
+    ones = sum(1 for mod in s.sampled if ix[mod] in cyclic)
+    lo, hi = _wilson(ones, k)
+
+    # only source modules can be cyclic; externals dilute the index
+    scale = s.modules_total / max(1, n)
+    certain = len(cyclic) / max(1, n)
+    return Estimate(
+        value=max(certain, ones / max(1, k) * scale),
+        low=max(certain, lo * scale),
+        high=max(certain, min(1.0, hi * scale)),
+        exact=False,
+    )
+
+
+def estimate_metrics(
+    s: SampleResult,
+    *,
+    profiler: Optional["StageProfiler"] = None,
+) -> Tuple[Metrics, Dict[str, Estimate]]:
+    """Exact metrics when the sample is complete, otherwise point estimates + CIs."""
+    if s.complete:
+        metrics = compute_metrics(s.graph, s.files, profiler=profiler)
+        return metrics, {
+            k: Estimate(getattr(metrics, k), getattr(metrics, k), getattr(metrics, k))
+            for k in ("entropy_score", "cycle_index", "density")
+        }
+
+    n = max(1, len(s.graph.nodes))
+    m_seen = sum(len(v) for v in s.graph.edges.values())
+    if profiler is not None:
+        with profiler.stage("estimate", nodes=len(s.graph.nodes), edges=m_seen):
+            density = _density_estimate(s, n, m_seen)
+            cycles = _cycle_estimate(s, n)
+    else:
+        density = _density_estimate(s, n, m_seen)
+        cycles = _cycle_estimate(s, n)
+
+    ent = lambda d, c: min(1.0, 0.35 * d + 0.85 * c)
+    entropy = Estimate(
+        value=ent(density.value, cycles.value),
+        low=ent(density.low, cycles.low),
+        high=ent(density.high, cycles.high),
+        exact=False,
+    )
+    metrics = Metrics(
+        entropy_score=float(entropy.value),
+        cycle_index=float(cycles.value),
+        churn_accel=0.0,
+        density=float(density.value),
+        n_nodes=int(n),
+        n_edges=int(round(density.value * max(1, n * (n - 1)))),
+    )
+    return metrics, {"entropy_score": entropy, "cycle_index": cycles, "density": density}
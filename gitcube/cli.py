@@ -1,30 +1,565 @@
 from __future__ import annotations
 
-import argparse
-from pathlib import Path
+import sys
 
-from .analyze import analyze_repo_dict, analyze_repo_text
-from .report import print_report_json
+# Heavy modules (analysis stack, argparse) are imported lazily so that
+# `gitcube gate` only pays for the verdict lookup.
 
+def _add_baseline_args(a) -> None:
+    a.add_argument(
+        "--baseline",
+        default=None,
+        help="Path to baseline file (default: .gitcube/baseline.json inside repo)",
+    )
+    a.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Update baseline with current metrics (writes baseline JSON)",
+    )
+    a.add_argument(
+        "--no-baseline",
+        action="store_true",
+        help="Disable baselining (use size heuristics only)",
+    )
 
-def main() -> None:
-    p = argparse.ArgumentParser(prog="gitcube", description="Structural Stability & Entropy Analyzer")
+def _serve(args) -> None:
+    import threading
+    import time
+    from pathlib import Path
+
+    from .analyze import analyze_repo_dict
+    from .openmetrics import MetricsRegistry, make_server, record_report
+    from .profile import StageProfiler
+
+    registry = MetricsRegistry()
+    path = Path(args.path)
+
+    def loop() -> None:
+        while True:
+            try:
+                profiler = StageProfiler(track_memory=False).start()
+                report = analyze_repo_dict(
+                    path,
+                    baseline_path=Path(args.baseline) if args.baseline else None,
+                    update_baseline=bool(args.update_baseline),
+                    disable_baseline=bool(args.no_baseline),
+                    profiler=profiler,
+                )
+                record_report(registry, report, profile=profiler.to_dict())
+            except Exception as e:  # keep serving; the scrape shows staleness
+                print(f"[gitcube] analysis failed: {e}", file=sys.stderr)
+                registry.inc("gitcube_analysis_errors", "Analyses that raised.")
+            if args.interval <= 0:
+                return
+            time.sleep(args.interval)
+
+    threading.Thread(target=loop, daemon=True).start()
+    server = make_server(registry, args.host, args.port)
+    print(f"[gitcube] serving OpenMetrics on http://{args.host}:{args.port}/metrics", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def _store_verdict(path, tree, report) -> None:
+    from .gate import store_verdict
+
+    store_verdict(str(path), tree, report)
+
+def _record_dna(path, report, branch) -> None:
+    from .dna_history import DNAHistory, default_history_path, git_commit_and_branch
+
+    commit, git_branch = git_commit_and_branch(path)
+    DNAHistory(default_history_path(path)).append(
+        dna=report.get("dna", {}) or {},
+        commit=commit,
+        branch=branch if branch is not None else git_branch,
+    )
+
+def _snapshot(args) -> int:
+    import json
+    import time
+    from pathlib import Path
+
+    from .gate import tree_hash
+    from .snapshot import SnapshotStore, default_snapshot_dir, snapshot_key
+
+    path = Path(args.path)
+    store = SnapshotStore(default_snapshot_dir(path))
+    if args.list:
+        entries = store.entries()
+        if args.json:
+            print(json.dumps([{"key": e.key, "bytes": e.bytes, "used": e.used} for e in entries], indent=2))
+        else:
+            for e in entries:
+                used = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(e.used))
+                print(f"{e.key}  {e.bytes:>10}  {used}")
+        return 0
+    tree = args.tree or tree_hash(str(path), args.commit)
+    if tree is None:
+        print(f"gitcube snapshot: cannot resolve tree for {args.commit!r} in {path}", file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    try:
+        snap = store.open(snapshot_key(tree, granularity=args.granularity, externals=args.externals))
+    except ValueError as e:
+        print(f"gitcube snapshot: {e}", file=sys.stderr)
+        return 2
+    if snap is None:
+        print(f"gitcube snapshot: no snapshot for tree {tree[:12]}; run `gitcube analyze` first", file=sys.stderr)
+        return 2
+    with snap:
+        out = {**snap.summary(), "load_ms": (time.perf_counter() - t0) * 1000.0, "metrics": snap.metrics}
+        if args.node:
+            i = snap.find(args.node)
+            if i is None:
+                print(f"gitcube snapshot: no node {args.node!r}", file=sys.stderr)
+                return 2
+            c = snap.component(i)
+            peers = [u for u in snap.components().get(c, []) if u != i]
+            out["node"] = {
+                "name": args.node,
+                "lang": snap.lang(i),
+                "imports": [snap.name(v) for v in snap.successors(i)],
+                "scc": [snap.name(u) for u in peers],
+            }
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return 0
+    print(
+        f"tree {out['tree'][:12]}: {out['nodes']} nodes, {out['edges']} edges, {out['sccs']} SCCs "
+        f"({out['bytes']} bytes, opened in {out['load_ms']:.2f} ms)"
+    )
+    for k, v in out["metrics"].items():
+        print(f"  {k:<14} {v}")
+    if "node" in out:
+        node = out["node"]
+        print(f"{node['name']} imports: {', '.join(node['imports']) or '-'}")
+        print(f"{node['name']} cycle peers: {', '.join(node['scc']) or '-'}")
+    return 0
+
+def _partial(args) -> int:
+    import json
+    from pathlib import Path
+
+    from .mapreduce import build_partial, partition, write_partial
+
+    part = partition(Path(args.path), externals=args.externals)
+    if args.list:
+        for name in part.packages:
+            print(name)
+        return 0
+    names = list(part.packages) if args.all else args.package
+    unknown = [n for n in names if n not in part.packages]
+    if not names or unknown:
+        print(f"gitcube partial: unknown or missing --package {' '.join(unknown)} (see --list)", file=sys.stderr)
+        return 2
+    for name in names:
+        partial = build_partial(part, name)
+        if args.out is None:
+            print(json.dumps(partial, separators=(",", ":"), sort_keys=True))
+        elif len(names) == 1 and not Path(args.out).is_dir():
+            write_partial(Path(args.out), partial)
+        else:
+            write_partial(Path(args.out) / f"{'_root' if name == '.' else name}.partial.json", partial)
+    return 0
+
+def _dna_history(args) -> int:
+    import json
+    from pathlib import Path
+
+    from .dna_history import DNAHistory, default_history_path, parse_day, parse_symbol_level
+
+    hist = DNAHistory(default_history_path(Path(args.path)))
+    since = parse_day(args.since)
+    until = parse_day(args.until, end=True)
+    window = dict(branch=args.branch, since=since, until=until)
+
+    if args.first:
+        sym, lvl = parse_symbol_level(args.first)
+        row = hist.first(symbol=sym, level=lvl, **window)
+        out = {"query": f"first {sym}>={lvl}", "match": row.to_dict() if row else None}
+        text = f"{sym} first reached level {lvl}: " + (
+            f"{out['match']['time']} commit={row.commit[:12] or '?'} branch={row.branch} [{out['match']['signature']}]"
+            if row
+            else "never"
+        )
+    elif args.days:
+        sym, lvl = parse_symbol_level(args.days)
+        n = hist.days_at_level(symbol=sym, level=lvl, exact=not args.at_least, **window)
+        op = ">=" if args.at_least else "=="
+        out = {"query": f"days {sym}{op}{lvl}", "days": n}
+        text = f"{sym} {op} {lvl} on {n} day(s)"
+    elif args.commit:
+        rows = [hist.row(i) for i in hist.find_commit(args.commit)]
+        out = {"query": f"commit {args.commit}", "rows": [r.to_dict() for r in rows]}
+        text = "\n".join(f"{r['time']} {r['branch']} {r['signature']}" for r in out["rows"]) or "no runs recorded"
+    else:
+        rows = hist.last(args.last or 10, branch=args.branch)
+        out = {"query": "last", "rows": [r.to_dict() for r in rows]}
+        text = "\n".join(
+            f"{r['time']} {r['commit'][:12] or '-':<12} {r['branch']:<16} {r['signature']}" for r in out["rows"]
+        ) or "no runs recorded"
+
+    print(json.dumps(out, indent=2) if args.json else text)
+    return 0
+
+def _tune(args) -> int:
+    import json
+    from pathlib import Path
+
+    from .baseline import load_baseline
+    from .dna_history import DNAHistory, default_history_path, parse_day
+    from .tune import CURRENT, DEFAULT_BLOCK_K, DEFAULT_WARN_K, DEFAULT_WINDOWS, GATED, parse_grid, tune_history
+
+    path = Path(args.path)
+    try:
+        windows = [int(w) for w in parse_grid(args.windows)] if args.windows else list(DEFAULT_WINDOWS)
+        warn_ks = parse_grid(args.warn_k) if args.warn_k else list(DEFAULT_WARN_K)
+        block_ks = parse_grid(args.block_k) if args.block_k else list(DEFAULT_BLOCK_K)
+        baseline = load_baseline(Path(args.baseline) if args.baseline else path / ".gitcube" / "baseline.json")
+        current = (baseline.window if baseline is not None else CURRENT[0], CURRENT[1], CURRENT[2])
+        hist = DNAHistory(default_history_path(path))
+        series = hist.series(
+            list(GATED), branch=args.branch, since=parse_day(args.since), until=parse_day(args.until, end=True)
+        )
+        out = tune_history(series, windows=windows, warn_ks=warn_ks, block_ks=block_ks, current=current)
+    except ValueError as e:
+        print(f"gitcube tune: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return 0
+    if not out["grid"]:
+        print(f"not enough history: {out['runs']} recorded run(s), the replay needs more than 8 (see --record-dna)")
+        return 0
+
+    def line(r) -> str:
+        return (
+            f"{r['window']:>6} {r['warn_k']:>6g} {r['block_k']:>7g}  {r['flip_rate']:>8.1%} "
+            f"{r['warn_rate']:>6.1%} {r['block_rate']:>6.1%}"
+        )
+
+    print(f"Replayed {out['runs']} run(s) over {out['settings']} setting(s); lowest flip rate first:")
+    print(f"{'window':>6} {'warn_k':>6} {'block_k':>7}  {'flips':>8} {'warn':>6} {'block':>6}")
+    for r in out["grid"][: args.top]:
+        print(line(r))
+    if out["current"] is not None:
+        print("current:")
+        print(line(out["current"]))
+    return 0
+
+def main(argv: list[str] | None = None) -> int | None:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["gate"]:
+        from .gate import gate_main
+
+        return gate_main(argv[1:])
+
+    import argparse
+
+    p = argparse.ArgumentParser(prog="gitcube", description="Structural Stability & Entropy Analyzer for Git Repositories")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     a = sub.add_parser("analyze", help="Analyze a repository folder")
-    a.add_argument("path", nargs="?", default=".", help="Path to repository")
-    a.add_argument("--json", action="store_true", help="Emit a JSON report")
+    a.add_argument("path", nargs="?", default=".", help="Path to repo (default: .)")
+    a.add_argument("--json", action="store_true", help="Emit a JSON report (for CI/agents)")
+    _add_baseline_args(a)
+    a.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record per-stage wall/CPU time and peak memory (adds a 'profile' section)",
+    )
+    a.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes for import extraction (default: in-process)",
+    )
+    a.add_argument(
+        "--map-reduce",
+        action="store_true",
+        help="Analyze each top-level package separately (--jobs in parallel) and merge exact metrics",
+    )
+    a.add_argument(
+        "--granularity",
+        choices=["module", "symbol"],
+        default="module",
+        help="Graph nodes: modules (default) or fully qualified classes/functions (Python)",
+    )
+    a.add_argument(
+        "--externals",
+        choices=["keep", "collapse", "exclude"],
+        default="exclude",
+        help="Imported stdlib/third-party modules: keep as nodes, collapse per kind, or exclude (default)",
+    )
+    a.add_argument(
+        "--import-time",
+        action="store_true",
+        help="Report each entry point's eager import closure (top-level vs function-local vs TYPE_CHECKING)",
+    )
+    a.add_argument(
+        "--import-time-gate",
+        action="store_true",
+        help="Also gate regressions of the worst entry-point closure against the baseline (implies --import-time)",
+    )
+    a.add_argument(
+        "--time-budget",
+        default=None,
+        metavar="DURATION",
+        help="Always answer within DURATION (e.g. 30s, 2m): parse a random sample and estimate metrics if short on time",
+    )
+    a.add_argument(
+        "--external",
+        action="store_true",
+        help="Out-of-core mode: stream files and keep edges in an on-disk store (.gitcube/extmem.sqlite)",
+    )
+    a.add_argument(
+        "--ram-limit-mb",
+        type=int,
+        default=512,
+        help="Memory ceiling for --external (default: 512)",
+    )
+    a.add_argument(
+        "--openmetrics",
+        default=None,
+        metavar="FILE",
+        help="Also write an OpenMetrics textfile (e.g. for node_exporter's textfile collector)",
+    )
+
+    a.add_argument(
+        "--no-verdict-cache",
+        action="store_true",
+        help="Do not store the verdict under .gitcube/verdicts/<tree-hash> for `gitcube gate` "
+        "(never stored with --granularity symbol, --externals keep|collapse, --time-budget, "
+        "--map-reduce or --import-time-gate)",
+    )
+
+    a.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="Do not store a binary graph snapshot under .gitcube/snapshots/<tree-hash>.gcs",
+    )
+    a.add_argument(
+        "--snapshot-max-mb",
+        type=int,
+        default=256,
+        help="Evict least recently used snapshots beyond this total size (default: 256)",
+    )
+
+    a.add_argument(
+        "--read-threads",
+        type=int,
+        default=0,
+        help="Read files with N threads ahead of parsing (network/slow filesystems; default: serial)",
+    )
+    a.add_argument("--read-depth", type=int, default=64, help="Reads kept in flight with --read-threads (default: 64)")
+    a.add_argument(
+        "--read-ahead-mb",
+        type=int,
+        default=64,
+        help="Cap on bytes read but not yet consumed with --read-threads (default: 64)",
+    )
+
+    a.add_argument(
+        "--record-dna",
+        action="store_true",
+        help="Append this run's DNA to the history store (.gitcube/dna)",
+    )
+    a.add_argument("--dna-branch", default=None, help="Branch name to record (default: current git branch)")
+
+    sub.add_parser(
+        "gate",
+        help="Exit 0/3 (ALLOW-WARN/BLOCK) from the cached verdict of a git tree; see `gitcube gate --help`",
+        add_help=False,
+    )
 
-    args = p.parse_args()
+    h = sub.add_parser("dna-history", help="Query the recorded DNA history")
+    h.add_argument("path", nargs="?", default=".", help="Path to repo (default: .)")
+    q = h.add_mutually_exclusive_group()
+    q.add_argument("--first", metavar="SYM_LEVEL", help="First run where a symbol reached a level, e.g. C2")
+    q.add_argument("--days", metavar="SYM_LEVEL", help="Days a symbol was at a level, e.g. P1")
+    q.add_argument("--commit", help="Runs recorded for a commit (full or abbreviated sha)")
+    q.add_argument("--last", type=int, default=None, help="Show the last N runs (default: 10)")
+    h.add_argument("--branch", default=None, help="Only runs on this branch")
+    h.add_argument("--since", default=None, help="YYYY-MM-DD (UTC, inclusive)")
+    h.add_argument("--until", default=None, help="YYYY-MM-DD (UTC, inclusive)")
+    h.add_argument("--at-least", action="store_true", help="With --days: count level or worse")
+    h.add_argument("--json", action="store_true", help="Emit JSON")
+
+    tu = sub.add_parser("tune", help="Replay DNA history over (window, warn_k, block_k) settings")
+    tu.add_argument("path", nargs="?", default=".", help="Path to repo (default: .)")
+    tu.add_argument("--windows", default=None, help="Baseline windows, e.g. 10,30,60 or 10:90:10")
+    tu.add_argument("--warn-k", default=None, help="warn_k values, e.g. 1:3:0.25")
+    tu.add_argument("--block-k", default=None, help="block_k values, e.g. 2:6:0.5")
+    tu.add_argument("--branch", default=None, help="Only runs on this branch")
+    tu.add_argument("--since", default=None, help="YYYY-MM-DD (UTC, inclusive)")
+    tu.add_argument("--until", default=None, help="YYYY-MM-DD (UTC, inclusive)")
+    tu.add_argument("--baseline", default=None, help="Baseline whose window is 'current' (default: .gitcube/baseline.json)")
+    tu.add_argument("--top", type=int, default=10, help="Settings to print (default: 10)")
+    tu.add_argument("--json", action="store_true", help="Emit JSON (full grid)")
+
+    sn = sub.add_parser("snapshot", help="Open the stored graph snapshot of a git tree (or list snapshots)")
+    sn.add_argument("path", nargs="?", default=".", help="Path to repo (default: .)")
+    sw = sn.add_mutually_exclusive_group()
+    sw.add_argument("--commit", default="HEAD", help="Revision whose tree to open (default: HEAD)")
+    sw.add_argument("--tree", default=None, help="Tree hash to open")
+    sw.add_argument("--list", action="store_true", help="List stored snapshots, most recently used first")
+    sn.add_argument("--node", default=None, help="Also show a node's imports and cycle peers")
+    sn.add_argument("--granularity", choices=["module", "symbol"], default="module")
+    sn.add_argument("--externals", choices=["keep", "collapse", "exclude"], default="exclude")
+    sn.add_argument("--json", action="store_true", help="Emit JSON")
+
+    pt = sub.add_parser("partial", help="Analyze one top-level package into a mergeable partial result")
+    pt.add_argument("path", nargs="?", default=".", help="Path to repo (default: .)")
+    pt.add_argument("--package", action="append", default=[], help="Package (top-level dir, '.' for root files); repeatable")
+    pt.add_argument("--all", action="store_true", help="Every package")
+    pt.add_argument("--list", action="store_true", help="Print the package names (one per line) and exit")
+    pt.add_argument("--out", default=None, help="Output file, or directory with several packages (default: stdout)")
+    pt.add_argument("--externals", choices=["keep", "collapse", "exclude"], default="exclude")
+
+    mg = sub.add_parser("merge", help="Merge partial results (`gitcube partial`) into one report")
+    mg.add_argument("partials", nargs="+", help="Partial JSON files")
+    mg.add_argument("--path", default=".", help="Repo path for the baseline and report (default: .)")
+    mg.add_argument("--json", action="store_true", help="Emit a JSON report")
+    _add_baseline_args(mg)
+
+    s = sub.add_parser("serve", help="Re-analyze periodically and expose OpenMetrics on /metrics")
+    s.add_argument("path", nargs="?", default=".", help="Path to repo (default: .)")
+    _add_baseline_args(s)
+    s.add_argument("--host", default="0.0.0.0", help="Bind address (default: 0.0.0.0)")
+    s.add_argument("--port", type=int, default=9464, help="Port (default: 9464)")
+    s.add_argument("--interval", type=float, default=300.0, help="Seconds between analyses (0 = once)")
+
+    args = p.parse_args(argv)
+    from pathlib import Path
 
     if args.cmd == "analyze":
+        from .analyze import AnalysisOptions, analyze_repo_dict, analyze_repo_text
+        from .anytime import parse_duration
+        from .ingest import ReadAhead
+        from .report import print_profile, print_report_json
+
         path = Path(args.path)
+        try:
+            time_budget = parse_duration(args.time_budget) if args.time_budget else None
+        except ValueError as e:
+            p.error(str(e))
+        if args.granularity != "module" and (args.external or time_budget is not None or args.map_reduce):
+            p.error("--granularity symbol cannot be combined with --external, --time-budget or --map-reduce")
+        if (args.import_time or args.import_time_gate) and (
+            args.granularity != "module" or args.external or time_budget is not None or args.map_reduce
+        ):
+            p.error("--import-time needs the default in-memory pipeline at module granularity")
+        from .rules import load_rules
+
+        try:
+            rules = load_rules(path / "pyproject.toml")
+        except ValueError as e:
+            p.error(f"[tool.gitcube.rules]: {e}")
+        if rules is not None and (args.granularity != "module" or time_budget is not None or args.map_reduce):
+            print(
+                "[gitcube] [tool.gitcube.rules] is not checked with --granularity symbol, --time-budget "
+                "or --map-reduce",
+                file=sys.stderr,
+            )
+        # only the canonical analysis answers `gitcube gate` for a tree: sampled, partial or
+        # differently-scoped runs (which may also skip the rules) would pass as its verdict
+        cache_verdict = not args.no_verdict_cache and (
+            args.granularity == "module"
+            and args.externals == "exclude"
+            and time_budget is None
+            and not args.map_reduce
+            and not args.import_time_gate
+        )
+        tree = None
+        if cache_verdict or not args.no_snapshot:
+            from .gate import worktree_hash
+
+            tree = worktree_hash(str(path))  # what is analyzed: the working tree, not HEAD
+        profiler = None
+        if args.openmetrics:
+            # OpenMetrics needs stage timings; collect them without tracemalloc overhead.
+            from .profile import StageProfiler
+
+            profiler = StageProfiler(track_memory=bool(args.profile)).start()
+        kwargs = dict(
+            baseline_path=Path(args.baseline) if args.baseline else None,
+            update_baseline=bool(args.update_baseline),
+            disable_baseline=bool(args.no_baseline),
+            profile=bool(args.profile),
+            profiler=profiler,
+            options=AnalysisOptions(
+                jobs=max(0, int(args.jobs)),
+                external=bool(args.external),
+                ram_limit_mb=max(16, int(args.ram_limit_mb)),
+                time_budget_s=time_budget,
+                externals=args.externals,
+                granularity=args.granularity,
+                map_reduce=bool(args.map_reduce),
+                snapshot_tree=None if args.no_snapshot else tree,
+                snapshot_max_mb=max(1, int(args.snapshot_max_mb)),
+                import_time=bool(args.import_time),
+                import_time_gate=bool(args.import_time_gate),
+                read_ahead=ReadAhead(
+                    threads=int(args.read_threads),
+                    depth=max(1, int(args.read_depth)),
+                    max_bytes=max(1, int(args.read_ahead_mb)) << 20,
+                )
+                if args.read_threads > 0
+                else None,
+            ),
+        )
         if args.json:
-            report = analyze_repo_dict(path)
+            report = analyze_repo_dict(path, **kwargs)
+            if args.profile:
+                print_profile(report["profile"], file=sys.stderr)
             print_report_json(report)
         else:
-            analyze_repo_text(path)
+            report = analyze_repo_text(path, **kwargs)
+        if profiler is not None:
+            from .openmetrics import MetricsRegistry, record_report, write_textfile
+
+            registry = MetricsRegistry()
+            record_report(registry, report, profile=profiler.to_dict())
+            write_textfile(Path(args.openmetrics), registry)
+        if cache_verdict and tree is not None:
+            _store_verdict(path, tree, report)
+        if args.record_dna:
+            _record_dna(path, report, args.dna_branch)
+    elif args.cmd == "snapshot":
+        return _snapshot(args)
+    elif args.cmd == "partial":
+        return _partial(args)
+    elif args.cmd == "merge":
+        from .analyze import analyze_partials_dict, analyze_partials_text
+        from .mapreduce import read_partial
+        from .report import print_report_json
 
+        try:
+            partials = [read_partial(Path(f)) for f in args.partials]
+            kwargs = dict(
+                path=Path(args.path),
+                baseline_path=Path(args.baseline) if args.baseline else None,
+                update_baseline=bool(args.update_baseline),
+                disable_baseline=bool(args.no_baseline),
+            )
+            if args.json:
+                print_report_json(analyze_partials_dict(partials, **kwargs))
+            else:
+                analyze_partials_text(partials, **kwargs)
+        except (OSError, ValueError) as e:
+            print(f"gitcube merge: {e}", file=sys.stderr)
+            return 2
+    elif args.cmd == "dna-history":
+        return _dna_history(args)
+    elif args.cmd == "tune":
+        return _tune(args)
+    elif args.cmd == "serve":
+        _serve(args)
+    return None
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
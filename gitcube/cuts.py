@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+"""Suggested cuts: a small set of imports whose removal breaks every cycle.
+
+Each SCC is linearized with the Eades–Lin–Smyth greedy heuristic: sinks are
+peeled to the back, sources to the front, and otherwise the node with the
+largest out-degree minus in-degree goes to the front. Bucket queues keep
+this O(V + E) per component. Edges pointing backwards in the resulting
+order form a feedback arc set of at most m/2 - n/6 edges; removing them
+leaves the component acyclic. Self-imports are always cut.
+
+Removing one SCC's cut set frees exactly its members (other components are
+untouched), so suggestions are grouped per SCC and ranked by modules freed
+per removed import. Each group carries the exact projected metrics after
+applying it and every group ranked before it; within a group, the longest
+back-arcs (which close the widest loops) come first.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from .graph import EdgeProvenance, Graph
+from .metrics import Condensed, Metrics, condense
+
+if TYPE_CHECKING:
+    from .profile import StageProfiler
+
+
+def eades_order(out_adj: List[List[int]], in_adj: List[List[int]]) -> List[int]:
+    """Eades–Lin–Smyth vertex order for a graph on 0..k-1 without self-loops."""
+    k = len(out_adj)
+    outd = [len(r) for r in out_adj]
+    ind = [len(r) for r in in_adj]
+    removed = [False] * k
+    sinks: Set[int] = set()
+    sources: Set[int] = set()
+    bins: Dict[int, Set[int]] = {}
+    where: List[Optional[Set[int]]] = [None] * k
+    maxd = -k
+
+    def place(u: int) -> None:
+        nonlocal maxd
+        if outd[u] == 0:
+            s = sinks
+        elif ind[u] == 0:
+            s = sources
+        else:
+            d = outd[u] - ind[u]
+            s = bins.get(d)
+            if s is None:
+                s = bins[d] = set()
+            if d > maxd:
+                maxd = d
+        s.add(u)
+        where[u] = s
+
+    def move(u: int) -> None:
+        where[u].discard(u)  # type: ignore[union-attr]
+        place(u)
+
+    def take(u: int) -> None:
+        removed[u] = True
+        where[u].discard(u)  # type: ignore[union-attr]
+        for w in out_adj[u]:
+            if not removed[w]:
+                ind[w] -= 1
+                move(w)
+        for w in in_adj[u]:
+            if not removed[w]:
+                outd[w] -= 1
+                move(w)
+
+    for u in range(k):
+        place(u)
+    front: List[int] = []
+    back: List[int] = []
+    left = k
+    while left:
+        while sinks:
+            u = sinks.pop()
+            take(u)
+            back.append(u)
+            left -= 1
+        while sources:
+            u = sources.pop()
+            take(u)
+            front.append(u)
+            left -= 1
+        if left:
+            while not bins.get(maxd):
+                maxd -= 1
+            u = bins[maxd].pop()
+            take(u)
+            front.append(u)
+            left -= 1
+    back.reverse()
+    return front + back
+
+
+def feedback_arcs(adj: List[List[int]], members: List[int]) -> List[Tuple[int, int]]:
+    """Backward edges of the Eades–Lin–Smyth order of one component (plus self-loops)."""
+    local = {u: i for i, u in enumerate(members)}
+    out_adj: List[List[int]] = [[] for _ in members]
+    in_adj: List[List[int]] = [[] for _ in members]
+    loops: List[Tuple[int, int]] = []
+    for i, u in enumerate(members):
+        for v in set(adj[u]):
+            j = local.get(v)
+            if j is None:
+                continue
+            if j == i:
+                loops.append((u, u))
+            else:
+                out_adj[i].append(j)
+                in_adj[j].append(i)
+    pos = [0] * len(members)
+    for p, i in enumerate(eades_order(out_adj, in_adj)):
+        pos[i] = p
+    back = [(pos[i] - pos[j], members[i], members[j]) for i in range(len(members)) for j in out_adj[i] if pos[j] < pos[i]]
+    back.sort(key=lambda x: (-x[0], x[1], x[2]))
+    return loops + [(u, v) for _, u, v in back]
+
+
+def _projected(n: int, m: int, cyclic: int) -> Dict[str, Any]:
+    ci = cyclic / max(1, n)
+    density = m / max(1, n * (n - 1))
+    return {
+        "cycle_index": float(ci),
+        "density": float(density),
+        "entropy_score": float(min(1.0, 0.35 * density + 0.85 * ci)),
+        "n_edges": int(m),
+    }
+
+
+def suggest_cuts(
+    graph: Graph,
+    metrics: Metrics,
+    provenance: Optional[EdgeProvenance] = None,
+    *,
+    condensed: Optional[Condensed] = None,
+    profiler: Optional["StageProfiler"] = None,
+) -> Dict[str, Any]:
+    """Report section: ranked per-SCC cut sets with cumulative projected metrics."""
+    if profiler is not None:
+        t = profiler.clock()
+    names, adj, comp, n_comps = condensed or condense(graph)
+    members: List[List[int]] = [[] for _ in range(n_comps)]
+    for u, c in enumerate(comp):
+        members[c].append(u)
+
+    groups: List[Tuple[int, List[Tuple[int, int]]]] = []
+    for us in members:
+        if len(us) > 1 or us[0] in adj[us[0]]:
+            groups.append((len(us), feedback_arcs(adj, us)))
+    groups.sort(key=lambda g: (-g[0] / len(g[1]), -g[0], names[g[1][0][0]]))
+
+    where = provenance.lookup((names[u], names[v]) for _, arcs in groups for u, v in arcs) if provenance is not None else {}
+    n, m = metrics.n_nodes, metrics.n_edges
+    cyclic = int(round(metrics.cycle_index * n))
+    out_groups: List[Dict[str, Any]] = []
+    total = 0
+    for size, arcs in groups:
+        cyclic -= size
+        m -= len(arcs)
+        total += len(arcs)
+        cuts = []
+        for u, v in arcs:
+            cut: Dict[str, Any] = {"from": names[u], "to": names[v]}
+            loc = where.get((names[u], names[v]))
+            if loc is not None:
+                cut["at"] = f"{loc[0]}:{loc[1]}"
+            cuts.append(cut)
+        out_groups.append({"modules": size, "cuts": cuts, "after": _projected(n, m, cyclic)})
+    if profiler is not None:
+        profiler.charge("cuts", t, nodes=len(names), edges=total)
+    return {
+        "imports": total,
+        "groups": out_groups,
+        "projected": out_groups[-1]["after"] if out_groups else _projected(n, m, cyclic),
+    }
@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+"""Append-only, columnar history of Structural DNA signatures.
+
+Each analysis appends one row. Columns live in separate fixed-width files
+under .gitcube/dna/ so a query only reads what it needs:
+
+  ts.i64       int64 unix seconds
+  levels.u16   8 symbols x 2 bits: byte 0 = G,P,C,D  byte 1 = S,R,K,L
+  values.f32   5 x float32 (entropy_score, cycle_index, density,
+               change_score, churn_accel)
+  commit.bin   20-byte binary commit sha (zeros when unknown)
+  branch.u16   index into branches.txt (one branch name per line)
+  meta.json    {"sorted": bool} - whether ts is non-decreasing
+
+Rows are valid up to the shortest column, so a crash mid-append just
+drops the torn row. Symbol/branch filters run as bytes.translate masks
+combined with big-int AND, i.e. at C speed; millions of rows scan in well
+under a second. While ts is sorted, time windows and per-day boundaries are
+bisected and the per-row work (last run of each day, value series, most
+recent rows) stays on the mask and column arrays; an out-of-order history
+falls back to a row-by-row scan.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import compress
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import sys
+import time
+
+SYMBOLS = ["G", "P", "C", "D", "S", "R", "K", "L"]
+VALUE_KEYS = ["entropy_score", "cycle_index", "density", "change_score", "churn_accel"]
+_VALUE_SYMBOLS = ["P", "C", "D", "S", "R"]  # DNA symbol carrying each value
+
+_COLUMNS = {
+    "ts": ("ts.i64", 8),
+    "levels": ("levels.u16", 2),
+    "values": ("values.f32", 4 * len(VALUE_KEYS)),
+    "commit": ("commit.bin", 20),
+    "branch": ("branch.u16", 2),
+}
+
+
+def pack_levels(symbols: Dict[str, Any]) -> int:
+    """Pack per-symbol levels (0..3) into 16 bits in ``SYMBOLS`` order."""
+    v = 0
+    for i, s in enumerate(SYMBOLS):
+        lvl = int((symbols.get(s) or {}).get("level", 0) or 0)
+        v |= (max(0, min(lvl, 3)) & 3) << (2 * i)
+    return v
+
+
+def unpack_levels(v: int) -> Dict[str, int]:
+    return {s: (v >> (2 * i)) & 3 for i, s in enumerate(SYMBOLS)}
+
+
+def signature_from_levels(v: int) -> str:
+    lv = unpack_levels(v)
+    return " ".join(f"{s}{lv[s]}" for s in SYMBOLS[:7]) + (f" L{lv['L']}" if lv["L"] else "")
+
+
+@dataclass
+class DNARow:
+    index: int
+    ts: int
+    commit: str
+    branch: str
+    levels: int
+    values: Dict[str, float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "ts": self.ts,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.ts)),
+            "commit": self.commit,
+            "branch": self.branch,
+            "signature": signature_from_levels(self.levels),
+            "values": self.values,
+        }
+
+
+def _array(typecode: str, data: bytes) -> array:
+    a = array(typecode)
+    a.frombytes(data)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+
+def _to_le(a: array) -> bytes:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _match_table(pred) -> bytes:
+    return bytes(1 if pred(b) else 0 for b in range(256))
+
+
+def _and_masks(a: bytes, b: bytes) -> bytes:
+    n = len(a)
+    return (int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(n, "little")
+
+
+class DNAHistory:
+    """Column store rooted at ``root`` (normally ``<repo>/.gitcube/dna``)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self._cache: Dict[str, bytes] = {}
+
+    # ---- writing -------------------------------------------------------
+
+    def _branches(self) -> List[str]:
+        p = self.root / "branches.txt"
+        if not p.exists():
+            return []
+        return p.read_text(encoding="utf-8").splitlines()
+
+    def _meta(self) -> Dict[str, Any]:
+        p = self.root / "meta.json"
+        try:
+            return json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            return {"sorted": True}
+
+    def append(self, *, dna: Dict[str, Any], commit: str = "", branch: str = "", ts: Optional[int] = None) -> int:
+        """Append one DNA result; returns its row index."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._cache.clear()
+        n = len(self)
+        self._truncate(n)
+        ts = int(time.time() if ts is None else ts)
+
+        branches = self._branches()
+        if branch not in branches:
+            branches.append(branch)
+            (self.root / "branches.txt").write_text("".join(b + "\n" for b in branches), encoding="utf-8")
+        bid = branches.index(branch)
+
+        symbols = dna.get("symbols", {}) or {}
+        vals = [float((symbols.get(s) or {}).get("value", 0.0) or 0.0) for s in _VALUE_SYMBOLS]
+        try:
+            sha = bytes.fromhex(commit)[:20].ljust(20, b"\0") if commit else bytes(20)
+        except ValueError:
+            sha = bytes(20)
+
+        meta = self._meta()
+        if n and meta.get("sorted", True) and ts < self._last_ts(n):
+            meta["sorted"] = False
+            (self.root / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+        rows = {
+            "ts": _to_le(array("q", [ts])),
+            "levels": _to_le(array("H", [pack_levels(symbols)])),
+            "values": _to_le(array("f", vals)),
+            "commit": sha,
+            "branch": _to_le(array("H", [bid])),
+        }
+        for key, (fname, _) in _COLUMNS.items():
+            with open(self.root / fname, "ab") as f:
+                f.write(rows[key])
+        return n
+
+    def _last_ts(self, n: int) -> int:
+        with open(self.root / "ts.i64", "rb") as f:
+            f.seek((n - 1) * 8)
+            return _array("q", f.read(8))[0]
+
+    def _truncate(self, n: int) -> None:
+        # Drop a torn row left by an interrupted append.
+        for fname, width in _COLUMNS.values():
+            p = self.root / fname
+            if p.exists() and p.stat().st_size != n * width:
+                with open(p, "r+b") as f:
+                    f.truncate(n * width)
+
+    # ---- reading -------------------------------------------------------
+
+    def __len__(self) -> int:
+        sizes = []
+        for fname, width in _COLUMNS.values():
+            p = self.root / fname
+            sizes.append(p.stat().st_size // width if p.exists() else 0)
+        return min(sizes)
+
+    def _col(self, key: str) -> bytes:
+        data = self._cache.get(key)
+        if data is None:
+            fname, width = _COLUMNS[key]
+            p = self.root / fname
+            data = p.read_bytes() if p.exists() else b""
+            data = data[: len(self) * width]
+            self._cache[key] = data
+        return data
+
+    def row(self, i: int) -> DNARow:
+        ts = _array("q", self._col("ts")[i * 8 : i * 8 + 8])[0]
+        lv = _array("H", self._col("levels")[i * 2 : i * 2 + 2])[0]
+        w = 4 * len(VALUE_KEYS)
+        vals = _array("f", self._col("values")[i * w : i * w + w])
+        sha = self._col("commit")[i * 20 : i * 20 + 20]
+        bid = _array("H", self._col("branch")[i * 2 : i * 2 + 2])[0]
+        branches = self._branches()
+        return DNARow(
+            index=i,
+            ts=int(ts),
+            commit=sha.hex() if any(sha) else "",
+            branch=branches[bid] if bid < len(branches) else "",
+            levels=int(lv),
+            values={k: float(v) for k, v in zip(VALUE_KEYS, vals)},
+        )
+
+    def _time_range(self, since: Optional[int], until: Optional[int]) -> Tuple[int, int]:
+        n = len(self)
+        if since is None and until is None:
+            return 0, n
+        if not self._meta().get("sorted", True):
+            return 0, n  # callers still filter by ts per row
+        ts = _array("q", self._col("ts"))
+        lo = 0 if since is None else bisect_left(ts, since)
+        hi = n if until is None else bisect_right(ts, until)
+        return lo, hi
+
+    def _mask(self, *, symbol: Optional[str], level: int, exact: bool, branch: Optional[str]) -> Optional[bytes]:
+        """1 byte per row: 1 where the row matches. None if branch is unknown."""
+        n = len(self)
+        mask = b"\x01" * n
+        if symbol is not None:
+            i = SYMBOLS.index(symbol)
+            shift = 2 * (i % 4)
+            col = self._col("levels")[i // 4 :: 2]
+            if exact:
+                table = _match_table(lambda b: ((b >> shift) & 3) == level)
+            else:
+                table = _match_table(lambda b: ((b >> shift) & 3) >= level)
+            mask = col.translate(table)
+        if branch is not None:
+            branches = self._branches()
+            if branch not in branches:
+                return None
+            bid = branches.index(branch)
+            col = self._col("branch")
+            lo = col[0::2].translate(_match_table(lambda b: b == (bid & 0xFF)))
+            hi = col[1::2].translate(_match_table(lambda b: b == (bid >> 8)))
+            mask = _and_masks(mask, _and_masks(lo, hi))
+        return mask
+
+    def _selection(
+        self,
+        *,
+        symbol: Optional[str] = None,
+        level: int = 0,
+        exact: bool = False,
+        branch: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> Tuple[Optional[bytes], int, int]:
+        """``iter_matches`` filters as (mask, lo, hi); the time bounds are exact only when sorted."""
+        lo, hi = self._time_range(since, until)
+        return self._mask(symbol=symbol, level=level, exact=exact, branch=branch), lo, hi
+
+    def iter_matches(
+        self,
+        *,
+        symbol: Optional[str] = None,
+        level: int = 0,
+        exact: bool = False,
+        branch: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> Iterator[int]:
+        """Yield matching row indices in storage order."""
+        mask = self._mask(symbol=symbol, level=level, exact=exact, branch=branch)
+        if mask is None:
+            return
+        lo, hi = self._time_range(since, until)
+        check_ts = not self._meta().get("sorted", True) and (since is not None or until is not None)
+        ts = _array("q", self._col("ts")) if check_ts else None
+        i = mask.find(1, lo, hi)
+        while i != -1:
+            if ts is None or ((since is None or ts[i] >= since) and (until is None or ts[i] <= until)):
+                yield i
+            i = mask.find(1, i + 1, hi)
+
+    def first(self, **filters: Any) -> Optional[DNARow]:
+        """Earliest (by timestamp) row matching the filters."""
+        if self._meta().get("sorted", True):
+            for i in self.iter_matches(**filters):
+                return self.row(i)
+            return None
+        ts = _array("q", self._col("ts"))
+        best = min(self.iter_matches(**filters), key=lambda i: ts[i], default=None)
+        return None if best is None else self.row(best)
+
+    def days_at_level(
+        self,
+        *,
+        symbol: str,
+        level: int,
+        exact: bool = True,
+        branch: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> int:
+        """UTC days whose last run (on ``branch``) had ``symbol`` at ``level``."""
+        shift = 2 * SYMBOLS.index(symbol)
+        lv = _array("H", self._col("levels"))
+        ts = _array("q", self._col("ts"))
+        if self._meta().get("sorted", True):
+            mask, lo, hi = self._selection(branch=branch, since=since, until=until)
+            if mask is None:
+                return 0
+            # sorted ts: each day is one contiguous run, found by bisect; its
+            # last matching row is a single backwards scan of the mask
+            last: List[int] = []
+            while lo < hi:
+                end = bisect_left(ts, (ts[lo] // 86400 + 1) * 86400, lo, hi)
+                i = mask.rfind(1, lo, end)
+                if i != -1:
+                    last.append(i)
+                lo = end
+        else:
+            last_of_day: Dict[int, Tuple[int, int]] = {}
+            for i in self.iter_matches(branch=branch, since=since, until=until):
+                day = ts[i] // 86400
+                prev = last_of_day.get(day)
+                if prev is None or ts[i] >= prev[0]:
+                    last_of_day[day] = (ts[i], i)
+            last = [i for _, i in last_of_day.values()]
+        if exact:
+            return sum(1 for i in last if (lv[i] >> shift) & 3 == level)
+        return sum(1 for i in last if (lv[i] >> shift) & 3 >= level)
+
+    def find_commit(self, commit: str) -> List[int]:
+        """Row indices recorded for ``commit`` (full or abbreviated hex)."""
+        col = self._col("commit")
+        try:
+            needle = bytes.fromhex(commit[: len(commit) - len(commit) % 2])
+        except ValueError:
+            return []
+        if not needle:
+            return []
+        out: List[int] = []
+        i = col.find(needle)
+        while i != -1:
+            if i % 20 == 0 and col[i : i + 20].hex().startswith(commit.lower()):
+                out.append(i // 20)
+            i = col.find(needle, i + 1)
+        return out
+
+    def series(self, keys: List[str], **filters: Any) -> Dict[str, List[float]]:
+        """Value columns of the matching rows, oldest first (by timestamp)."""
+        width = len(VALUE_KEYS)
+        if self._meta().get("sorted", True):
+            # storage order is time order: slice each column and compress by the mask
+            mask, lo, hi = self._selection(**filters)
+            if mask is None:
+                return {k: [] for k in keys}
+            vals = _array("f", self._col("values")[lo * 4 * width : hi * 4 * width])
+            sel = mask[lo:hi]
+            return {k: list(compress(vals[VALUE_KEYS.index(k) :: width], sel)) for k in keys}
+        rows = list(self.iter_matches(**filters))
+        ts = _array("q", self._col("ts"))
+        rows.sort(key=lambda i: ts[i])
+        vals = _array("f", self._col("values"))
+        return {k: [float(vals[i * width + VALUE_KEYS.index(k)]) for i in rows] for k in keys}
+
+    def last(self, k: int = 10, *, branch: Optional[str] = None) -> List[DNARow]:
+        """The ``k`` most recently stored rows (on ``branch``), in storage order."""
+        mask = self._mask(symbol=None, level=0, exact=False, branch=branch)
+        if mask is None:
+            return []
+        idx: List[int] = []
+        i = len(mask)
+        while len(idx) < k:
+            i = mask.rfind(1, 0, i)
+            if i == -1:
+                break
+            idx.append(i)
+        return [self.row(i) for i in reversed(idx)]
+
+
+def default_history_path(repo_root: Path) -> Path:
+    return repo_root / ".gitcube" / "dna"
+
+
+def git_commit_and_branch(repo_root: Path) -> Tuple[str, str]:
+    """Best-effort HEAD commit sha and branch name ('' when unavailable)."""
+    import subprocess
+
+    def rev(*args: str) -> str:
+        try:
+            out = subprocess.run(
+                ["git", "-C", str(repo_root), "rev-parse", *args],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        except OSError:
+            return ""
+        return out.stdout.decode("utf-8", "ignore").strip()
+
+    return rev("HEAD"), rev("--abbrev-ref", "HEAD")
+
+
+def parse_day(s: Optional[str], *, end: bool = False) -> Optional[int]:
+    """'YYYY-MM-DD' (UTC) -> unix seconds; ``end`` gives the last second of that day."""
+    if not s:
+        return None
+    import calendar
+
+    t = calendar.timegm(time.strptime(s, "%Y-%m-%d"))
+    return t + 86399 if end else t
+
+
+def parse_symbol_level(s: str) -> Tuple[str, int]:
+    """'C2' or 'C:2' -> ('C', 2)."""
+    s = s.replace(":", "").strip().upper()
+    if len(s) != 2 or s[0] not in SYMBOLS or not s[1].isdigit():
+        raise ValueError(f"expected SYMBOL+LEVEL like 'C2', got {s!r}")
+    return s[0], int(s[1])
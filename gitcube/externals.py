@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+"""Internal / stdlib / third-party classification of imported names.
+
+``build_import_graph`` turns every imported top-level name into a node, so
+``os``, ``json`` or ``numpy`` become leaves that inflate ``n_nodes``, skew
+``density`` and slow every traversal. The pipeline classifies each node with
+an ``ImportIndex`` and then, per ``--externals``:
+
+  keep      leave the graph as built (previous behaviour)
+  collapse  fold externals into one node per kind (<stdlib>, <third-party>, <unknown>)
+  exclude   drop external nodes and the edges into them (default)
+
+The environment part of the index (``sys.stdlib_module_names`` plus the
+top-level names of installed distributions) is cached in
+.gitcube/import_index.json, keyed by interpreter and site directory mtimes;
+the internal part (module names and package directories) comes from the
+current tree on every run.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+import hashlib
+import json
+import os
+import sys
+
+from .graph import EXTRACTORS, Graph
+
+EXTERNAL_MODES = ("keep", "collapse", "exclude")
+DEFAULT_EXTERNALS = "exclude"
+EXTERNAL_KINDS = ("stdlib", "third_party", "unknown")
+COLLAPSED = {"stdlib": "<stdlib>", "third_party": "<third-party>", "unknown": "<unknown>"}
+
+INDEX_VERSION = 1
+
+
+@dataclass
+class ImportIndex:
+    stdlib: FrozenSet[str]
+    third_party: Dict[str, str]  # top-level import name -> distribution
+    internal: Set[str] = field(default_factory=set)
+
+    def classify(self, name: str) -> str:
+        if name in self.internal:
+            return "internal"
+        if ":" in name:  # namespaced js:/go: targets without a source file
+            return "unknown"
+        if name in self.stdlib:
+            return "stdlib"
+        if name in self.third_party:
+            return "third_party"
+        return "unknown"
+
+
+def _stdlib_names() -> FrozenSet[str]:
+    names = getattr(sys, "stdlib_module_names", None)
+    if names is not None:
+        return frozenset(names)
+    # Python < 3.10: builtins plus whatever lives in the stdlib directory
+    import sysconfig
+
+    out = set(sys.builtin_module_names)
+    stdlib = Path(sysconfig.get_paths()["stdlib"])
+    for p in stdlib.iterdir():
+        if p.name == "site-packages":
+            continue
+        if p.suffix == ".py" or (p.is_dir() and (p / "__init__.py").exists()):
+            out.add(p.stem)
+    dyn = stdlib / "lib-dynload"
+    if dyn.is_dir():
+        out.update(p.name.split(".")[0] for p in dyn.iterdir())
+    return frozenset(out)
+
+
+def _third_party_names() -> Dict[str, str]:
+    try:
+        from importlib.metadata import packages_distributions
+    except ImportError:  # Python < 3.10
+        return {}
+    return {top: dists[0] for top, dists in packages_distributions().items() if dists and top.isidentifier()}
+
+
+def _env_fingerprint() -> str:
+    parts = [INDEX_VERSION, sys.version, sys.prefix]
+    for d in sys.path:
+        try:
+            parts.append(f"{d}:{os.stat(d or '.').st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.sha1("\n".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def load_import_index(cache_path: Optional[Path] = None) -> ImportIndex:
+    """Environment classification, from ``cache_path`` when still valid."""
+    fp = _env_fingerprint()
+    if cache_path is not None:
+        try:
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+            if data.get("fingerprint") == fp:
+                return ImportIndex(stdlib=frozenset(data["stdlib"]), third_party=dict(data["third_party"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    index = ImportIndex(stdlib=_stdlib_names(), third_party=_third_party_names())
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps({"fingerprint": fp, "stdlib": sorted(index.stdlib), "third_party": index.third_party}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return index
+
+
+def internal_names(paths: Iterable[Path], root: Path) -> Set[str]:
+    """Module names of all source files plus the Python package directories."""
+    root = root.resolve()
+    out: Set[str] = set()
+    for p in paths:
+        ex = EXTRACTORS.get(p.suffix)
+        if ex is None:
+            continue
+        out.add(ex.module_name(p))
+        if ex.lang == "python":
+            try:
+                rel = p.parent.relative_to(root)
+            except ValueError:
+                continue
+            out.update(rel.parts)
+            out.add(root.name)
+    return out
+
+
+class ExternalFilter:
+    """Maps a node name to its replacement (None = drop) and tallies externals."""
+
+    def __init__(self, index: ImportIndex, mode: str = DEFAULT_EXTERNALS) -> None:
+        if mode not in EXTERNAL_MODES:
+            raise ValueError(f"externals mode must be one of {', '.join(EXTERNAL_MODES)}")
+        self.index = index
+        self.mode = mode
+        self.seen: Dict[str, Set[str]] = {k: set() for k in EXTERNAL_KINDS}
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def set_tree(self, paths: Iterable[Path], root: Path) -> "ExternalFilter":
+        self.index.internal = internal_names(paths, root)
+        self._memo.clear()
+        return self
+
+    def __call__(self, name: str) -> Optional[str]:
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        kind = self.index.classify(name)
+        if kind == "internal":
+            out: Optional[str] = name
+        else:
+            self.seen[kind].add(name)
+            out = name if self.mode == "keep" else COLLAPSED[kind] if self.mode == "collapse" else None
+        self._memo[name] = out
+        return out
+
+    def resolve_all(self, names: Iterable[str]) -> List[str]:
+        return [r for r in map(self, names) if r is not None]
+
+    def summary(self) -> Dict[str, object]:
+        return {"mode": self.mode, **{k: len(v) for k, v in self.seen.items()}}
+
+
+def filter_graph(graph: Graph, flt: ExternalFilter) -> Graph:
+    """Apply ``flt`` to every node and edge (externals never have out-edges)."""
+    nodes: Set[str] = set()
+    edges: Dict[str, Set[str]] = {}
+    for n in graph.nodes:
+        r = flt(n)
+        if r is not None:
+            nodes.add(r)
+            edges.setdefault(r, set())
+    for src, dsts in graph.edges.items():
+        if dsts and src in edges:
+            edges[src].update(flt.resolve_all(dsts))
+    return Graph(nodes=nodes, edges=edges, lang=graph.lang)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+"""Out-of-core import graph for repositories that do not fit in RAM.
+
+Files are streamed one at a time (``iter_files``) and their edges go straight
+into a SQLite store instead of ``Graph.edges`` dicts of sets:
+
+  nodes(id INTEGER PRIMARY KEY, name TEXT UNIQUE, lang TEXT)
+  edges(src, dst) PRIMARY KEY (src, dst) WITHOUT ROWID   -- deduplicated, sorted by src
+
+Metrics are then computed semi-externally (O(V) memory, edges on disk):
+
+- node/edge counts, degrees and self-loops come from SQL aggregates, which
+  SQLite evaluates with its own external sort;
+- SCCs reuse ``strongly_connected_components`` over an adjacency provider.
+  If a compact CSR copy of the edges (int32 arrays) fits under the RAM
+  ceiling it is loaded once; otherwise each node's row is read from the
+  primary-key index on demand, through a small LRU cache.
+
+The ceiling (``ram_limit_mb``) also bounds SQLite's page cache and the
+insert buffer. Results match the in-memory path exactly.
+"""
+
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import sqlite3
+
+from .graph import EXTRACTORS, _extract_located, extract_imports
+from .ingest import FileInfo
+from .metrics import Metrics, strongly_connected_components
+
+if TYPE_CHECKING:
+    from .externals import ExternalFilter
+    from .profile import StageProfiler
+    from .rules import RuleSet
+
+DEFAULT_RAM_LIMIT_MB = 512
+# Rough per-node cost of the Tarjan bookkeeping lists plus the name->id map.
+_NODE_BYTES = 200
+
+
+class ExternalGraph:
+    """SQLite-backed, deduplicated edge store with interned node ids."""
+
+    def __init__(self, path: Path, *, ram_limit_mb: int = DEFAULT_RAM_LIMIT_MB) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+        self.ram_limit = max(16, int(ram_limit_mb)) * 1024 * 1024
+        self.db = sqlite3.connect(str(self.path))
+        cache_kib = self.ram_limit // 4 // 1024
+        for pragma in (
+            "PRAGMA journal_mode=OFF",
+            "PRAGMA synchronous=OFF",
+            "PRAGMA temp_store=FILE",
+            f"PRAGMA cache_size=-{cache_kib}",
+        ):
+            self.db.execute(pragma)
+        self.db.execute("CREATE TABLE nodes(id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, lang TEXT)")
+        self.db.execute("CREATE TABLE edges(src INTEGER NOT NULL, dst INTEGER NOT NULL, PRIMARY KEY(src, dst)) WITHOUT ROWID")
+        self._ids: Dict[str, int] = {}
+        self._buf: List[Tuple[int, int]] = []
+        self._buf_max = max(1024, self.ram_limit // 16 // 64)  # ~64 B per buffered tuple
+        self.file_count = 0
+
+    # ---- building ------------------------------------------------------
+
+    def node_id(self, name: str, lang: Optional[str] = None) -> int:
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self._ids)
+            self.db.execute("INSERT INTO nodes(id, name, lang) VALUES (?, ?, ?)", (i, name, lang))
+        elif lang is not None:
+            self.db.execute("UPDATE nodes SET lang = ? WHERE id = ? AND lang IS NULL", (lang, i))
+        return i
+
+    def add_edges(self, src: int, dsts: Iterable[int]) -> None:
+        self._buf.extend((src, d) for d in dsts)
+        if len(self._buf) >= self._buf_max:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buf:
+            self.db.executemany("INSERT OR IGNORE INTO edges(src, dst) VALUES (?, ?)", self._buf)
+            self._buf.clear()
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    # ---- queries -------------------------------------------------------
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self._ids)
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.db.execute("SELECT COUNT(*) FROM edges").fetchone()[0])
+
+    def degree_stats(self) -> Dict[str, Any]:
+        out_max = self.db.execute("SELECT COALESCE(MAX(c), 0) FROM (SELECT COUNT(*) c FROM edges GROUP BY src)").fetchone()[0]
+        in_max = self.db.execute("SELECT COALESCE(MAX(c), 0) FROM (SELECT COUNT(*) c FROM edges GROUP BY dst)").fetchone()[0]
+        n = max(1, self.n_nodes)
+        return {
+            "max_out_degree": int(out_max),
+            "max_in_degree": int(in_max),
+            "mean_degree": float(self.n_edges) / n,
+        }
+
+    def self_loops(self) -> List[int]:
+        return [r[0] for r in self.db.execute("SELECT src FROM edges WHERE src = dst")]
+
+    def languages(self) -> Dict[str, int]:
+        rows = self.db.execute("SELECT lang, COUNT(*) FROM nodes WHERE lang IS NOT NULL GROUP BY lang ORDER BY lang")
+        return {str(lang): int(c) for lang, c in rows}
+
+    def csr_bytes(self) -> int:
+        return 4 * (self.n_nodes + 1) + 4 * self.n_edges
+
+    def csr_fits(self) -> bool:
+        return self.csr_bytes() + _NODE_BYTES * self.n_nodes <= self.ram_limit
+
+    def adjacency(self) -> Sequence[Sequence[int]]:
+        """CSR arrays if they fit under the RAM ceiling, else on-demand SQL rows."""
+        if self.csr_fits():
+            return CSRAdjacency.from_store(self)
+        budget = max(0, self.ram_limit - _NODE_BYTES * self.n_nodes)
+        return SQLiteAdjacency(self, cache_rows=max(1024, budget // 256))
+
+    def summary(self) -> Dict[str, Any]:
+        return {"nodes": self.n_nodes, "edges": self.n_edges, "languages": self.languages()}
+
+
+class CSRAdjacency:
+    """Compressed sparse rows: ``targets[offsets[u]:offsets[u + 1]]``."""
+
+    def __init__(self, offsets: array, targets: array) -> None:
+        self.offsets = offsets
+        self.targets = targets
+
+    @staticmethod
+    def from_store(store: ExternalGraph) -> "CSRAdjacency":
+        n = store.n_nodes
+        offsets = array("i", [0]) * (n + 1)
+        targets = array("i")
+        cur = store.db.execute("SELECT src, dst FROM edges ORDER BY src, dst")
+        while True:
+            rows = cur.fetchmany(65536)
+            if not rows:
+                break
+            for src, dst in rows:
+                offsets[src + 1] += 1
+                targets.append(dst)
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+        return CSRAdjacency(offsets, targets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, u: int) -> Sequence[int]:
+        return self.targets[self.offsets[u] : self.offsets[u + 1]]
+
+
+class SQLiteAdjacency:
+    """Row-at-a-time adjacency read from the (src, dst) primary key, LRU cached."""
+
+    def __init__(self, store: ExternalGraph, *, cache_rows: int = 4096) -> None:
+        self.store = store
+        self.cache: "OrderedDict[int, array]" = OrderedDict()
+        self.cache_rows = int(cache_rows)
+        self.reads = 0
+
+    def __len__(self) -> int:
+        return self.store.n_nodes
+
+    def __getitem__(self, u: int) -> Sequence[int]:
+        row = self.cache.get(u)
+        if row is not None:
+            self.cache.move_to_end(u)
+            return row
+        self.reads += 1
+        row = array("i", (r[0] for r in self.store.db.execute("SELECT dst FROM edges WHERE src = ?", (u,))))
+        self.cache[u] = row
+        if len(self.cache) > self.cache_rows:
+            self.cache.popitem(last=False)
+        return row
+
+
+def _extract_checked(f: FileInfo, rules: "RuleSet") -> Optional[Tuple[str, str, Optional[List[str]]]]:
+    """``extract_imports`` plus the architecture-rule check, from one located walk."""
+    ex = EXTRACTORS.get(f.path.suffix)
+    if ex is None:
+        return None
+    mod = ex.module_name(f.path)
+    located = _extract_located(f.path.suffix, f.text)
+    if located is None:
+        return mod, ex.lang, None
+    rules.check_file(f.path, None if ex.lang == "python" else mod, located)
+    node_of = ex.node_of or (lambda d: d)
+    return mod, ex.lang, [node_of(d) for d, _ in located]
+
+
+def build_external_graph(
+    files: Iterable[FileInfo],
+    store: ExternalGraph,
+    *,
+    profiler: Optional["StageProfiler"] = None,
+    externals: Optional["ExternalFilter"] = None,
+    rules: Optional["RuleSet"] = None,
+) -> ExternalGraph:
+    """Stream files into ``store``; mirrors build_import_graph's node/edge rules."""
+    for f in files:
+        if profiler is not None:
+            t = profiler.clock()
+        if rules is None:
+            got = extract_imports(f)
+        else:
+            got = _extract_checked(f, rules)
+        if profiler is not None:
+            profiler.charge("parse", t, files=1, bytes=len(f.text))
+        if got is None:
+            continue
+        store.file_count += 1
+        mod, lang, deps = got
+        src = store.node_id(mod, lang)
+        if deps and externals is not None:
+            deps = externals.resolve_all(deps)
+        if deps:
+            store.add_edges(src, {store.node_id(d) for d in deps})
+    store.flush()
+    return store
+
+
+def compute_metrics_external(store: ExternalGraph, *, profiler: Optional["StageProfiler"] = None) -> Metrics:
+    """Same formulas as compute_metrics, evaluated against the on-disk store."""
+    n = max(1, store.n_nodes)
+    m = store.n_edges
+    density = m / max(1, n * (n - 1))
+
+    if profiler is not None:
+        t = profiler.clock()
+    adj = store.adjacency()
+    comp, n_comps = strongly_connected_components(adj)
+    sizes = [0] * n_comps
+    for c in comp:
+        sizes[c] += 1
+    cyclic = sum(1 for c in comp if sizes[c] > 1)
+    cyclic += sum(1 for u in store.self_loops() if sizes[comp[u]] == 1)
+    if profiler is not None:
+        profiler.charge("cycles", t, nodes=store.n_nodes, edges=m)
+
+    cycle_index = cyclic / n
+    entropy = min(1.0, 0.35 * density + 0.85 * cycle_index)
+    return Metrics(
+        entropy_score=float(entropy),
+        cycle_index=float(cycle_index),
+        churn_accel=0.0,
+        density=float(density),
+        n_nodes=int(n),
+        n_edges=int(m),
+    )
+
+
+def external_octave_distribution(store: ExternalGraph) -> List[Dict[str, Any]]:
+    """Octave bands via Tarjan order: successors' components always finish first.
+
+    Needs only O(V) memory, unlike the Kahn pass which keeps condensed edges.
+    """
+    from .layers import OCTAVE_BANDS, OCTAVE_CELLS, _band
+
+    adj = store.adjacency()
+    comp, n_comps = strongly_connected_components(adj)
+    depth = [0] * n_comps
+    for u in sorted(range(len(comp)), key=comp.__getitem__):
+        cu = comp[u]
+        for v in adj[u]:
+            cv = comp[v]
+            if cv != cu and depth[cv] + 1 > depth[cu]:
+                depth[cu] = depth[cv] + 1
+    max_depth = max(depth, default=0)
+    counts = [0, 0, 0]
+    for c in comp:
+        counts[_band(depth[c], max_depth)] += 1
+    total = len(comp)
+    return [
+        {
+            "octave": octave,
+            "label": label,
+            "fill": int(round(OCTAVE_CELLS * (count / total if total else 0.0))),
+            "total": OCTAVE_CELLS,
+            "modules": count,
+            "share": float(count / total) if total else 0.0,
+        }
+        for (octave, label), count in zip(OCTAVE_BANDS, counts)
+    ]
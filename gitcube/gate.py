@@ -0,0 +1,232 @@
+"""Fast merge gate: answer ALLOW/WARN/BLOCK from a cached verdict.
+
+`gitcube analyze` stores a one-line verdict per analyzed git tree under
+.gitcube/verdicts/<tree-hash>. `gitcube gate` only resolves the tree hash and
+reads that line, so it never imports the analysis stack (or argparse/json).
+
+The analysis reads the working tree, so verdicts are keyed by the hash of
+what it read (``worktree_hash``): HEAD's tree when no source file (or
+pyproject.toml) is modified or untracked, otherwise the index's tree with
+those files as they are on disk. Only runs with the canonical analysis
+options are cached (module graph, externals excluded, no --time-budget,
+--map-reduce or --import-time-gate), so the gate never serves a sampled or
+partial verdict.
+
+Exit codes match ai_validator.py:
+- 0 on ALLOW/WARN
+- 3 on BLOCK
+- 2 when no verdict is cached for the tree (or on usage errors)
+
+Usage:
+  gitcube gate [PATH] [--commit REV | --tree HASH] [--analyze-missing] [--quiet]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+EXIT_OK = 0
+EXIT_MISSING = 2
+EXIT_BLOCK = 3
+
+VERDICT_DIR = os.path.join(".gitcube", "verdicts")
+
+
+def tree_hash(repo: str, rev: str = "HEAD") -> str | None:
+    """Return the git tree hash of ``rev`` in ``repo`` (None outside git)."""
+    import subprocess
+
+    try:
+        out = subprocess.run(
+            ["git", "-C", repo, "rev-parse", "--verify", "--quiet", f"{rev}^{{tree}}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+    except OSError:
+        return None
+    h = out.stdout.decode("ascii", "ignore").strip()
+    return h or None
+
+
+# What ingest skips: hidden files and directories (GitCube's own .gitcube/ state
+# among them) and vendored node_modules/.
+_SKIPPED_PATHSPECS = (":(glob,exclude)**/.*", ":(glob,exclude)**/.*/**", ":(glob,exclude)**/node_modules/**")
+
+
+def _input_pathspecs(suffixes) -> list[str]:
+    """Pathspecs (relative to the analyzed directory) of every file analysis reads."""
+    specs = [f":(glob)**/*{s}" for s in sorted(suffixes)]
+    specs.append("pyproject.toml")  # [tool.gitcube.rules]
+    specs.extend(_SKIPPED_PATHSPECS)
+    return specs
+
+
+def _git(repo: str, *args: str, env: dict | None = None, stdin: bytes | None = None) -> str | None:
+    import subprocess
+
+    try:
+        out = subprocess.run(
+            ["git", "-C", repo, *args],
+            input=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            check=False,
+        )
+    except OSError:
+        return None
+    return out.stdout.decode("utf-8", "ignore") if out.returncode == 0 else None
+
+
+def worktree_hash(repo: str, suffixes=None) -> str | None:
+    """Tree hash of the working tree as analyzed (None outside git).
+
+    Only the files analysis reads count: sources with a registered suffix
+    (``suffixes``, default: every extractor's) and pyproject.toml, under
+    ``repo``. When none of them differ from HEAD this is just HEAD's tree,
+    whatever else (reports, build output) lies around. Otherwise those
+    files are hashed into a throwaway copy of the index (``git add -A`` +
+    ``git write-tree``), so the real index is untouched and unchanged
+    files are not rehashed.
+    """
+    if suffixes is None:
+        from .graph import source_suffixes
+
+        suffixes = source_suffixes()
+    status = _git(repo, "status", "--porcelain", "-z", "--untracked-files=all", "--", *_input_pathspecs(suffixes))
+    if status is None:
+        return None
+    if not status:
+        return tree_hash(repo)
+    # "XY path" relative to the top (a staged rename is followed by its source); only
+    # files whose working copy differs from the index (Y) need adding, staged ones are in it
+    unstaged: list[str] = []
+    entries = iter(status.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        if entry[1] != " ":
+            unstaged.append(f":(top,literal){entry[3:]}\0")
+        if entry[0] in "RC":
+            next(entries, None)
+
+    import shutil
+    import tempfile
+
+    index = (_git(repo, "rev-parse", "--git-path", "index") or "").strip()
+    if index and not os.path.isabs(index):
+        index = os.path.join(repo, index)
+    with tempfile.TemporaryDirectory(prefix="gitcube-index-") as tmp:
+        tmp_index = os.path.join(tmp, "index")
+        if index and os.path.exists(index):
+            shutil.copyfile(index, tmp_index)
+        env = {**os.environ, "GIT_INDEX_FILE": tmp_index}
+        if unstaged:
+            stdin = "".join(unstaged).encode("utf-8")
+            if _git(repo, "add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul", env=env, stdin=stdin) is None:
+                return None
+        h = (_git(repo, "write-tree", env=env) or "").strip()
+    return h or None
+
+
+def _verdict_path(repo: str, tree: str) -> str:
+    return os.path.join(repo, VERDICT_DIR, tree)
+
+
+def store_verdict(repo: str, tree: str, report: dict) -> str:
+    """Write ``recommendation<TAB>dna<TAB>entropy_score`` for ``tree``."""
+    rec = str((report.get("action", {}) or {}).get("recommendation", "UNKNOWN")).upper()
+    dna = str((report.get("dna", {}) or {}).get("signature", ""))
+    entropy = (report.get("metrics", {}) or {}).get("entropy_score", "")
+    path = _verdict_path(repo, tree)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f"{rec}\t{dna}\t{entropy}\n")
+    os.replace(tmp, path)
+    return path
+
+
+def load_verdict(repo: str, tree: str) -> tuple[str, str, str] | None:
+    try:
+        with open(_verdict_path(repo, tree), encoding="utf-8") as f:
+            line = f.readline().rstrip("\n")
+    except OSError:
+        return None
+    rec, _, rest = line.partition("\t")
+    dna, _, entropy = rest.partition("\t")
+    return (rec, dna, entropy) if rec else None
+
+
+def exit_code(recommendation: str) -> int:
+    return EXIT_BLOCK if recommendation.upper() == "BLOCK" else EXIT_OK
+
+
+def _usage(msg: str = "") -> int:
+    if msg:
+        print(f"gitcube gate: {msg}", file=sys.stderr)
+    print(__doc__.split("Usage:", 1)[1].strip(), file=sys.stderr)
+    return EXIT_MISSING
+
+
+def gate_main(argv: list[str]) -> int:
+    # Hand-rolled parsing on purpose: argparse alone costs more than the lookup.
+    repo = "."
+    rev = "HEAD"
+    tree = None
+    analyze_missing = False
+    quiet = False
+    it = iter(argv)
+    for a in it:
+        if a in ("-h", "--help"):
+            print(__doc__)
+            return EXIT_OK
+        elif a in ("--commit", "--tree"):
+            v = next(it, None)
+            if v is None:
+                return _usage(f"{a} needs a value")
+            if a == "--commit":
+                rev = v
+            else:
+                tree = v
+        elif a == "--analyze-missing":
+            analyze_missing = True
+        elif a in ("-q", "--quiet"):
+            quiet = True
+        elif a.startswith("-"):
+            return _usage(f"unknown option {a}")
+        else:
+            repo = a
+
+    tree = tree or tree_hash(repo, rev)
+    if tree is None:
+        print(f"[GitCube] cannot resolve tree for {rev!r} in {repo} (not a git repo?)", file=sys.stderr)
+        return EXIT_MISSING
+
+    cached = load_verdict(repo, tree)
+    if cached is None and analyze_missing:
+        if worktree_hash(repo) != tree:
+            # the analysis reads the working tree: its verdict is not this tree's
+            print(
+                f"[GitCube] no cached verdict for tree {tree[:12]}, and the working tree differs from it; "
+                f"check it out (clean) to analyze it",
+                file=sys.stderr,
+            )
+            return EXIT_MISSING
+        from pathlib import Path
+
+        from .analyze import analyze_repo_dict
+
+        report = analyze_repo_dict(Path(repo))
+        store_verdict(repo, tree, report)
+        cached = load_verdict(repo, tree)
+    if cached is None:
+        print(f"[GitCube] no cached verdict for tree {tree[:12]}; run `gitcube analyze` first", file=sys.stderr)
+        return EXIT_MISSING
+
+    rec, dna, entropy = cached
+    if not quiet:
+        print(f"[GitCube] recommendation={rec} entropy_score={entropy} dna='{dna}' tree={tree[:12]}")
+    return exit_code(rec)
@@ -1,45 +1,388 @@
 from __future__ import annotations
 import ast
-from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple
+import os
+import re
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from .ingest import FileInfo
 
+if TYPE_CHECKING:
+    from .profile import StageProfiler
+    from .rules import RuleSet
+
 @dataclass
 class Graph:
     nodes: Set[str]
     edges: Dict[str, Set[str]]  # src -> {dst}
+    lang: Dict[str, str] = field(default_factory=dict)  # node -> language of its source files
 
 def _module_name_from_path(p) -> str:
     # very simple mapping: file name without suffix
     return p.stem
 
-def build_import_graph(files: List[FileInfo]) -> Graph:
+# ---- import extractors ------------------------------------------------------
+#
+# An extractor turns one source file into (module name, imported module names).
+# Scanner-based extractors work on the raw text; the Python one parses first
+# (``parse``) so the profiler can tell ast.parse apart from the import walk.
+# Non-Python module names carry a namespace prefix ("js:", "go:") so languages
+# never collide; Python names stay bare. ``locate`` is the same walk returning
+# (target as written, line) pairs, used for edge provenance and architecture
+# rules; ``node_of`` maps such a target to its graph node (default: itself).
+
+@dataclass
+class LanguageExtractor:
+    lang: str
+    suffixes: Tuple[str, ...]
+    module_name: Callable[[Path], str]
+    extract: Callable[[Any], List[str]]
+    parse: Optional[Callable[[str], Any]] = None
+    locate: Optional[Callable[[Any], List[Tuple[str, int]]]] = None
+    node_of: Optional[Callable[[str], str]] = None
+
+EXTRACTORS: Dict[str, LanguageExtractor] = {}  # suffix -> extractor
+
+def register_extractor(ex: LanguageExtractor) -> None:
+    for suffix in ex.suffixes:
+        EXTRACTORS[suffix] = ex
+
+def source_suffixes() -> Set[str]:
+    return set(EXTRACTORS)
+
+def _python_import_lines(tree: ast.AST) -> List[Tuple[str, int]]:
+    """Full dotted targets; relative ones keep their leading dots (``..db.models``)."""
+    out: List[Tuple[str, int]] = []
+    for n in ast.walk(tree):
+        if isinstance(n, ast.Import):
+            for alias in n.names:
+                out.append((alias.name, n.lineno))
+        elif isinstance(n, ast.ImportFrom):
+            if n.module:
+                out.append(("." * n.level + n.module, n.lineno))
+    return out
+
+def _python_node(target: str) -> str:
+    return target.lstrip(".").split(".")[0]
+
+def _python_imports(tree: ast.AST) -> List[str]:
+    return [_python_node(name) for name, _ in _python_import_lines(tree)]
+
+_JS_IMPORT = re.compile(
+    r"""(?:\bimport\s*(?:[\w*{}\s,$]+?\s*from\s*)?|\bexport\s*[\w*{}\s,$]+?\s*from\s*|\brequire\s*\(\s*|\bimport\s*\(\s*)["']([^"'\n]+)["']"""
+)
+
+def _js_module_name(p: Path) -> str:
+    stem = p.name.split(".")[0]
+    if stem == "index" and p.parent.name:
+        stem = p.parent.name
+    return "js:" + stem
+
+def _js_target(spec: str) -> str:
+    if spec.startswith("."):
+        # relative file import: resolve to the file/dir stem like Python does
+        last = spec.rstrip("/").rsplit("/", 1)[-1]
+        if last in ("", ".", ".."):
+            return ""
+        return "js:" + last.split(".")[0]
+    parts = spec.split("/")
+    pkg = "/".join(parts[:2]) if spec.startswith("@") else parts[0]
+    return "js:" + pkg
+
+def _js_import_lines(text: str) -> List[Tuple[str, int]]:
+    out: List[Tuple[str, int]] = []
+    line, pos = 1, 0
+    for m in _JS_IMPORT.finditer(text):
+        t = _js_target(m.group(1))
+        if t:
+            line += text.count("\n", pos, m.start())
+            pos = m.start()
+            out.append((t, line))
+    return out
+
+def _js_imports(text: str) -> List[str]:
+    return [name for name, _ in _js_import_lines(text)]
+
+_GO_IMPORT_BLOCK = re.compile(r"^import\s*\((.*?)\)", re.S | re.M)
+_GO_IMPORT_LINE = re.compile(r'^import\s+(?:[\w.]+\s+)?"([^"]+)"', re.M)
+_GO_SPEC = re.compile(r'(?:[\w.]+\s+)?"([^"]+)"')
+
+def _go_module_name(p: Path) -> str:
+    # Go imports name packages (directories), not files.
+    return "go:" + (p.parent.name or p.stem)
+
+def _go_import_lines(text: str) -> List[Tuple[str, int]]:
+    specs = [(m.group(1), m.start()) for m in _GO_IMPORT_LINE.finditer(text)]
+    for block in _GO_IMPORT_BLOCK.finditer(text):
+        specs.extend((m.group(1), block.start(1) + m.start()) for m in _GO_SPEC.finditer(block.group(1)))
+    return [("go:" + s.rstrip("/").rsplit("/", 1)[-1], text.count("\n", 0, at) + 1) for s, at in specs]
+
+def _go_imports(text: str) -> List[str]:
+    return [name for name, _ in _go_import_lines(text)]
+
+register_extractor(
+    LanguageExtractor(
+        "python", (".py",), _module_name_from_path, _python_imports, ast.parse, _python_import_lines, _python_node
+    )
+)
+register_extractor(
+    LanguageExtractor(
+        "javascript", (".js", ".jsx", ".mjs", ".cjs"), _js_module_name, _js_imports, locate=_js_import_lines
+    )
+)
+register_extractor(
+    LanguageExtractor(
+        "typescript", (".ts", ".tsx", ".mts", ".cts"), _js_module_name, _js_imports, locate=_js_import_lines
+    )
+)
+register_extractor(LanguageExtractor("go", (".go",), _go_module_name, _go_imports, locate=_go_import_lines))
+
+def _extract(suffix: str, text: str) -> Optional[List[str]]:
+    ex = EXTRACTORS[suffix]
+    try:
+        return ex.extract(ex.parse(text) if ex.parse is not None else text)
+    except SyntaxError:
+        return None
+
+def _extract_located(suffix: str, text: str) -> Optional[List[Tuple[str, int]]]:
+    """Like ``_extract`` but targets as written plus their line (0 if the extractor cannot tell)."""
+    ex = EXTRACTORS[suffix]
+    try:
+        tree = ex.parse(text) if ex.parse is not None else text
+    except SyntaxError:
+        return None
+    if ex.locate is None:
+        return [(d, 0) for d in ex.extract(tree)]
+    return ex.locate(tree)
+
+def extract_imports(f: FileInfo) -> Optional[Tuple[str, str, Optional[List[str]]]]:
+    """(module name, language, imports or None on syntax error); None if no extractor."""
+    ex = EXTRACTORS.get(f.path.suffix)
+    if ex is None:
+        return None
+    return ex.module_name(f.path), ex.lang, _extract(f.path.suffix, f.text)
+
+def _extract_batch(batch: List[Tuple[str, str]]) -> List[Optional[List[str]]]:
+    return [_extract(suffix, text) for suffix, text in batch]
+
+def _extract_located_batch(batch: List[Tuple[str, str]]) -> List[Optional[List[Tuple[str, int]]]]:
+    return [_extract_located(suffix, text) for suffix, text in batch]
+
+def _content_key(f: FileInfo) -> Optional[Tuple[str, bytes]]:
+    """Dedup key: byte-identical files with the same suffix extract identically."""
+    return (f.path.suffix, f.digest) if f.digest else None
+
+def _extract_parallel(files: List[FileInfo], jobs: int, *, located: bool = False) -> List[Optional[List[Any]]]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    # ship each distinct content to the workers once
+    slot: Dict[Tuple[str, bytes], int] = {}
+    where: List[int] = []
+    items: List[Tuple[str, str]] = []
+    for f in files:
+        key = _content_key(f)
+        i = slot.get(key) if key is not None else None
+        if i is None:
+            i = len(items)
+            items.append((f.path.suffix, f.text))
+            if key is not None:
+                slot[key] = i
+        where.append(i)
+    size = max(1, min(256, len(items) // (jobs * 4) or 1))
+    batches = [items[i : i + size] for i in range(0, len(items), size)]
+    unique: List[Optional[List[Any]]] = []
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        for res in ex.map(_extract_located_batch if located else _extract_batch, batches):
+            unique.extend(res)
+    return [unique[i] for i in where]
+
+class EdgeProvenance:
+    """Where each edge was first seen, as (file id, line) in parallel arrays.
+
+    Module names and file paths are interned once; every edge costs four
+    uint32s. Lookups scan the arrays, so ask for all needed edges at once.
+    """
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = root.resolve() if root is not None else None
+        self.files: List[str] = []
+        self.modules: List[str] = []
+        self._module_ids: Dict[str, int] = {}
+        self.src = array("I")
+        self.dst = array("I")
+        self.file = array("I")
+        self.line = array("I")
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.src, self.dst, self.file, self.line))
+
+    def _module(self, name: str) -> int:
+        i = self._module_ids.get(name)
+        if i is None:
+            i = self._module_ids[name] = len(self.modules)
+            self.modules.append(name)
+        return i
+
+    def add_file(self, path: Path) -> int:
+        name = str(path)
+        if self.root is not None:
+            root = str(self.root)
+            if name.startswith(root + os.sep):  # ingest hands out paths under the resolved root
+                name = name[len(root) + 1 :]
+        self.files.append(name.replace(os.sep, "/"))
+        return len(self.files) - 1
+
+    def record(self, src: str, located: List[Tuple[str, int]], known: Set[str], file_id: int) -> None:
+        """Record edges from ``src`` not yet in ``known`` (its current targets), lowest line first."""
+        first: Dict[str, int] = {}
+        for dst, line in located:
+            if dst not in known and (dst not in first or line < first[dst]):
+                first[dst] = line
+        if not first:
+            return
+        s = self._module(src)
+        for dst, line in first.items():
+            self.src.append(s)
+            self.dst.append(self._module(dst))
+            self.file.append(file_id)
+            self.line.append(line)
+
+    def lookup(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[str, int]]:
+        """(src, dst) -> (file, line) for the requested edges, in one pass."""
+        ids = self._module_ids
+        want: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        for a, b in pairs:
+            if a in ids and b in ids:
+                want[(ids[a], ids[b])] = (a, b)
+        out: Dict[Tuple[str, str], Tuple[str, int]] = {}
+        if not want:
+            return out
+        src, dst = self.src, self.dst
+        for i in range(len(src)):
+            key = want.get((src[i], dst[i]))
+            if key is not None and key not in out:
+                out[key] = (self.files[self.file[i]], self.line[i])
+                if len(out) == len(want):
+                    break
+        return out
+
+def build_import_graph(
+    files: List[FileInfo],
+    *,
+    profiler: Optional["StageProfiler"] = None,
+    jobs: int = 0,
+    provenance: Optional[EdgeProvenance] = None,
+    rules: Optional["RuleSet"] = None,
+) -> Graph:
     nodes: Set[str] = set()
     edges: Dict[str, Set[str]] = {}
+    lang: Dict[str, str] = {}
+    located = provenance is not None or rules is not None
+    seen: Dict[Tuple[str, bytes], Optional[List[Any]]] = {}  # content key -> raw extraction
 
-    for f in files:
-        mod = _module_name_from_path(f.path)
+    extracted: Optional[List[Optional[List[Any]]]] = None
+    if jobs > 1 and len(files) > 1:
+        if profiler is not None:
+            t = profiler.clock()
+        extracted = _extract_parallel(files, jobs, located=located)
+        if profiler is not None:
+            profiler.charge("parse", t, files=len(files), bytes=sum(len(f.text) for f in files))
+
+    for i, f in enumerate(files):
+        ex = EXTRACTORS.get(f.path.suffix)
+        if ex is None:
+            continue
+        mod = ex.module_name(f.path)
         nodes.add(mod)
         edges.setdefault(mod, set())
+        lang.setdefault(mod, ex.lang)
+        walk = (ex.locate or (lambda tree: [(d, 0) for d in ex.extract(tree)])) if located else ex.extract
 
-        try:
-            tree = ast.parse(f.text)
-        except SyntaxError:
-            continue
+        key = _content_key(f)
+        if key is not None and key in seen:  # byte-identical copy: reuse the first extraction
+            deps = seen[key]
+            if deps is None:
+                continue
+            if profiler is not None:
+                t = profiler.clock()
+        elif extracted is not None:
+            deps = extracted[i]
+            if key is not None:
+                seen[key] = deps
+            if deps is None:
+                continue
+            if profiler is not None:
+                t = profiler.clock()
+        elif ex.parse is not None:
+            if profiler is not None:
+                t = profiler.clock()
+            try:
+                tree = ex.parse(f.text)
+            except SyntaxError:
+                if key is not None:
+                    seen[key] = None
+                continue
+            finally:
+                if profiler is not None:
+                    profiler.charge("parse", t, files=1, bytes=len(f.text))
+            if profiler is not None:
+                t = profiler.clock()
+            deps = walk(tree)
+            if key is not None:
+                seen[key] = deps
+        else:
+            if profiler is not None:
+                t = profiler.clock()
+            deps = walk(f.text)
+            if key is not None:
+                seen[key] = deps
+            if profiler is not None:
+                profiler.charge("parse", t, files=1, bytes=len(f.text))
+                t = profiler.clock()
 
-        for n in ast.walk(tree):
-            if isinstance(n, ast.Import):
-                for alias in n.names:
-                    dst = alias.name.split(".")[0]
-                    edges[mod].add(dst)
-                    nodes.add(dst)
-            elif isinstance(n, ast.ImportFrom):
-                if n.module:
-                    dst = n.module.split(".")[0]
-                    edges[mod].add(dst)
-                    nodes.add(dst)
+        if located:
+            if rules is not None:
+                rules.check_file(f.path, None if ex.lang == "python" else mod, deps)
+            if ex.node_of is not None:
+                deps = [(ex.node_of(d), line) for d, line in deps]
+            if provenance is not None:
+                provenance.record(mod, deps, edges[mod], provenance.add_file(f.path))
+            deps = [d for d, _ in deps]
+        if profiler is not None:
+            before = len(edges[mod])
+        edges[mod].update(deps)
+        nodes.update(deps)
+        if profiler is not None:
+            profiler.charge("imports", t, files=1, edges=len(edges[mod]) - before)
 
     # ensure all nodes exist in edges dict
     for n in list(nodes):
         edges.setdefault(n, set())
-    return Graph(nodes=nodes, edges=edges)
+    if profiler is not None:
+        profiler.record("imports").nodes = len(nodes)
+    return Graph(nodes=nodes, edges=edges, lang=lang)
+
+def index_graph(graph: Graph) -> Tuple[List[str], List[List[int]]]:
+    """Intern node names to ints and return (names, adjacency lists).
+
+    Edges pointing outside ``graph.nodes`` are dropped, matching how the
+    metrics treat them. Names are sorted so the ids are deterministic.
+    """
+    names = sorted(graph.nodes)
+    ids = {n: i for i, n in enumerate(names)}
+    adj: List[List[int]] = [[] for _ in names]
+    for src, dsts in graph.edges.items():
+        i = ids.get(src)
+        if i is None:
+            continue
+        row = adj[i]
+        for d in dsts:
+            j = ids.get(d)
+            if j is not None:
+                row.append(j)
+    return names, adj
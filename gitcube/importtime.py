@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+"""Import-time fan-out: how much of the tree a module drags in when imported.
+
+Every Python import is classified by where it executes:
+
+  top_level      module body, class bodies, ``if``/``try`` at module level:
+                 runs when the module is imported
+  function       inside a ``def``: deferred until the function is called
+  type_checking  under ``if TYPE_CHECKING:``: never runs
+
+For each module the *eager closure* is everything reachable over top-level
+imports (what ``import mod`` actually loads), weighted by source size; the
+*deferred* part is what function-local imports add on top. Type-checking
+imports are only counted.
+
+Closures are computed on the SCC condensation: components are visited
+successors-first (Tarjan's numbering), each one's reach is the OR of its
+successors' bitsets, and a bitset is dropped once its last importer has
+consumed it. Byte totals come from per-bit-plane masks of the weights, so
+every closure costs a handful of big-int AND/popcount operations.
+
+Entry points are modules nothing imports eagerly; the report lists the
+worst of them, and ``worst_share`` (largest eager closure / total bytes)
+can be gated against the rolling baseline as ``import_closure``.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+import ast
+
+from .graph import EXTRACTORS, _extract
+from .ingest import FileInfo
+from .metrics import strongly_connected_components
+
+if TYPE_CHECKING:
+    from .profile import StageProfiler
+
+IMPORT_KINDS = ("top_level", "function", "type_checking")
+_RANK = {k: i for i, k in enumerate(IMPORT_KINDS)}  # lower = stronger
+TOP_ENTRY_POINTS = 10
+
+
+def _is_type_checking(test: ast.AST) -> bool:
+    if isinstance(test, ast.Name):
+        return test.id == "TYPE_CHECKING"
+    return isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+
+
+class _ImportKinds(ast.NodeVisitor):
+    def __init__(self) -> None:
+        self.kinds: Dict[str, str] = {}
+        self.in_function = 0
+        self.in_type_checking = 0
+
+    def _add(self, name: str) -> None:
+        if self.in_type_checking:
+            kind = "type_checking"
+        elif self.in_function:
+            kind = "function"
+        else:
+            kind = "top_level"
+        old = self.kinds.get(name)
+        if old is None or _RANK[kind] < _RANK[old]:
+            self.kinds[name] = kind
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self._add(alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module:
+            self._add(node.module.split(".")[0])
+
+    def visit_FunctionDef(self, node: ast.AST) -> None:
+        self.in_function += 1
+        self.generic_visit(node)
+        self.in_function -= 1
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_If(self, node: ast.If) -> None:
+        if not _is_type_checking(node.test):
+            self.generic_visit(node)
+            return
+        self.in_type_checking += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.in_type_checking -= 1
+        for stmt in node.orelse:
+            self.visit(stmt)
+
+
+def classify_imports(tree: ast.AST) -> Dict[str, str]:
+    """Imported top-level name -> strongest kind (top_level > function > type_checking)."""
+    v = _ImportKinds()
+    v.visit(tree)
+    return v.kinds
+
+
+@dataclass
+class ImportTimeGraph:
+    weights: Dict[str, int]  # source module -> bytes of source
+    edges: Dict[str, Dict[str, str]]  # module -> internal dep -> kind
+
+
+def build_import_time_graph(files: List[FileInfo], *, profiler: Optional["StageProfiler"] = None) -> ImportTimeGraph:
+    """Per-module classified imports between source modules (externals never matter here)."""
+    weights: Dict[str, int] = {}
+    raw: Dict[str, Dict[str, str]] = {}
+    seen: Dict[Tuple[str, bytes], Dict[str, str]] = {}  # byte-identical copies classify identically
+    for f in files:
+        ex = EXTRACTORS.get(f.path.suffix)
+        if ex is None:
+            continue
+        if profiler is not None:
+            t = profiler.clock()
+        mod = ex.module_name(f.path)
+        size = f.size or len(f.text.encode("utf-8"))  # FileInfo built without ingest has no size
+        weights[mod] = weights.get(mod, 0) + size
+        row = raw.setdefault(mod, {})
+        key = (f.path.suffix, f.digest)
+        kinds = seen.get(key) if f.digest else None
+        if kinds is None:
+            if ex.lang == "python":
+                try:
+                    kinds = classify_imports(ast.parse(f.text))
+                except SyntaxError:
+                    kinds = {}
+            else:  # other languages: every import resolves at load time
+                kinds = {d: "top_level" for d in _extract(f.path.suffix, f.text) or []}
+            if f.digest:
+                seen[key] = kinds
+        for dep, kind in kinds.items():
+            old = row.get(dep)
+            if old is None or _RANK[kind] < _RANK[old]:
+                row[dep] = kind
+        if profiler is not None:
+            profiler.charge("import_time", t, files=1, bytes=size)
+    edges = {m: {d: k for d, k in row.items() if d in weights and d != m} for m, row in raw.items()}
+    return ImportTimeGraph(weights=weights, edges=edges)
+
+
+def _closures(adj: List[List[int]], weights: List[int], wanted: Optional[Set[int]] = None) -> Dict[int, Tuple[int, int]]:
+    """(nodes, weight) of the forward closure (itself included) of ``wanted`` nodes (default: all)."""
+    n = len(adj)
+    comp, n_comps = strongly_connected_components(adj)
+    members: List[List[int]] = [[] for _ in range(n_comps)]
+    for u, c in enumerate(comp):
+        members[c].append(u)
+    succ: List[Set[int]] = [set() for _ in range(n_comps)]
+    importers = [0] * n_comps
+    for u, row in enumerate(adj):
+        cu = comp[u]
+        for v in row:
+            cv = comp[v]
+            if cv != cu and cv not in succ[cu]:
+                succ[cu].add(cv)
+                importers[cv] += 1
+
+    # bits laid out by component so each component is one contiguous run
+    start = [0] * n_comps
+    bit = [0] * n
+    pos = 0
+    for c, us in enumerate(members):
+        start[c] = pos
+        for u in us:
+            bit[u] = pos
+            pos += 1
+    planes: List[int] = []
+    for b in range(max(weights, default=0).bit_length()):
+        mask = bytearray((n + 7) // 8)
+        for u in range(n):
+            if weights[u] >> b & 1:
+                mask[bit[u] >> 3] |= 1 << (bit[u] & 7)
+        planes.append(int.from_bytes(mask, "little"))
+
+    want = [wanted is None] * n_comps
+    for u in wanted or ():
+        want[comp[u]] = True
+
+    out: Dict[int, Tuple[int, int]] = {}
+    reach: Dict[int, int] = {}
+    for c in range(n_comps):  # successors-first
+        r = ((1 << len(members[c])) - 1) << start[c]
+        for d in succ[c]:
+            r |= reach[d]
+            importers[d] -= 1
+            if importers[d] == 0:
+                del reach[d]
+        if importers[c]:
+            reach[c] = r
+        if want[c]:
+            size = (r.bit_count(), sum((r & p).bit_count() << b for b, p in enumerate(planes)))
+            for u in members[c]:
+                out[u] = size
+    return out
+
+
+def analyze_import_time(
+    g: ImportTimeGraph,
+    *,
+    top: int = TOP_ENTRY_POINTS,
+    profiler: Optional["StageProfiler"] = None,
+) -> Dict[str, Any]:
+    """Report section: per-kind import counts and the worst entry-point closures."""
+    if profiler is not None:
+        t = profiler.clock()
+    names = sorted(g.weights)
+    ix = {m: i for i, m in enumerate(names)}
+    weights = [g.weights[m] for m in names]
+    eager_adj: List[List[int]] = [[] for _ in names]
+    all_adj: List[List[int]] = [[] for _ in names]
+    counts = {k: 0 for k in IMPORT_KINDS}
+    type_only = [0] * len(names)
+    eager_in = [0] * len(names)
+    for m, deps in g.edges.items():
+        u = ix[m]
+        for d, kind in deps.items():
+            counts[kind] += 1
+            v = ix[d]
+            if kind == "top_level":
+                eager_adj[u].append(v)
+                all_adj[u].append(v)
+                eager_in[v] += 1
+            elif kind == "function":
+                all_adj[u].append(v)
+            else:
+                type_only[u] += 1
+
+    entries = [u for u in range(len(names)) if eager_in[u] == 0] or list(range(len(names)))
+    eager = _closures(eager_adj, weights, set(entries))
+    entries.sort(key=lambda u: (-eager[u][1], names[u]))
+    full = _closures(all_adj, weights, set(entries[:top]))
+    total = max(1, sum(weights))
+    rows = [
+        {
+            "module": names[u],
+            "eager_modules": eager[u][0],
+            "eager_bytes": eager[u][1],
+            "eager_share": eager[u][1] / total,
+            "deferred_modules": full[u][0] - eager[u][0],
+            "deferred_bytes": full[u][1] - eager[u][1],
+            "type_checking_imports": type_only[u],
+        }
+        for u in entries[:top]
+    ]
+    if profiler is not None:
+        profiler.charge("import_time", t, nodes=len(names), edges=sum(counts.values()))
+    return {
+        "modules": len(names),
+        "total_bytes": sum(weights),
+        "imports": counts,
+        "entry_points": len(entries),
+        "worst_share": rows[0]["eager_share"] if rows else 0.0,
+        "worst": rows,
+    }
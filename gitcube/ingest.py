@@ -1,21 +1,252 @@
 from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .profile import StageProfiler
 
 @dataclass
 class FileInfo:
     path: Path
     text: str
+    digest: bytes = b""  # content hash from ingest; b"" = unknown (never deduplicated)
+    size: int = 0  # raw byte length (``text`` drops undecodable bytes)
 
-def ingest_files(root: Path) -> List[FileInfo]:
-    root = root.resolve()
-    out: List[FileInfo] = []
-    for p in root.rglob("*.py"):
-        if any(part.startswith(".") for part in p.parts):
-            continue
+    @classmethod
+    def from_bytes(cls, path: Path, data: bytes) -> "FileInfo":
+        return cls(path=path, text=data.decode("utf-8", errors="ignore"), digest=content_digest(data), size=len(data))
+
+def content_digest(data: bytes) -> bytes:
+    """128-bit BLAKE2b of raw file bytes: equal digests mean byte-identical files."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+# Directories never worth scanning (vendored JS dependencies).
+SKIP_DIRS = {"node_modules"}
+
+def _walk(root: Path, suffixes: Optional[Set[str]] = None) -> List[Path]:
+    """Source files under root with a registered suffix, skipping hidden dirs."""
+    if suffixes is None:
+        from .graph import source_suffixes
+
+        suffixes = source_suffixes()
+    out: List[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+        base = Path(dirpath)
+        for name in sorted(filenames):
+            if name.startswith("."):
+                continue
+            dot = name.rfind(".")
+            if dot > 0 and name[dot:] in suffixes:
+                out.append(base / name)
+    return out
+
+@dataclass
+class ReadAhead:
+    """Threaded read-ahead for filesystems where per-file latency dominates (NFS, CI volumes).
+
+    ``threads`` workers keep up to ``depth`` reads in flight ahead of the
+    consumer. Bytes read but not yet consumed stay under ``max_bytes``
+    (a single larger file is still read, alone). ``opener`` returns a binary
+    file object; tests and the benchmark wrap it to inject latency. Files
+    without a usable ``fileno()`` are reserved after the read, so up to
+    ``threads`` of them may sit outside the cap while waiting their turn.
+    """
+
+    threads: int = 8
+    depth: int = 64
+    max_bytes: int = 64 << 20
+    opener: Optional[Callable[[Path], BinaryIO]] = None
+
+    def __post_init__(self) -> None:
+        if self.threads < 1 or self.depth < 1 or self.max_bytes < 1:
+            raise ValueError("read-ahead threads, depth and memory cap must be positive")
+
+class _ByteBudget:
+    """Memory cap for read-ahead, granted strictly in path order.
+
+    In-order grants mean the file the consumer waits for is always first
+    in line, so the cap can never deadlock the pipeline.
+    """
+
+    def __init__(self, cap: int) -> None:
+        self.cap = cap
+        self.used = 0
+        self.turn = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def acquire(self, ticket: int, n: int) -> int:
+        n = min(n, self.cap)
+        with self.cond:
+            while not self.closed and (self.turn != ticket or (self.used and self.used + n > self.cap)):
+                self.cond.wait()
+            self.used += n
+            self.turn += 1
+            self.cond.notify_all()
+        return n
+
+    def release(self, n: int) -> None:
+        with self.cond:
+            self.used -= n
+            self.cond.notify_all()
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+def _open_binary(p: Path) -> BinaryIO:
+    return open(p, "rb")
+
+def read_ahead(paths: Iterable[Path], cfg: ReadAhead) -> Iterator[Tuple[Path, Optional[bytes]]]:
+    """``(path, bytes)`` in input order (``None`` if unreadable), read by a thread pool.
+
+    Reads release the GIL, so workers overlap their latency with each other
+    and with whatever the consumer does (decode, hash, parse). Decoding is
+    left to the consumer.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    opener = cfg.opener or _open_binary
+    budget = _ByteBudget(cfg.max_bytes)
+
+    def read(ticket: int, p: Path) -> Tuple[Optional[bytes], int]:
+        granted = -1
         try:
-            out.append(FileInfo(path=p, text=p.read_text(encoding="utf-8", errors="ignore")))
+            with opener(p) as f:
+                try:
+                    size = os.fstat(f.fileno()).st_size
+                except Exception:  # wrapped / in-memory files: size unknown until read
+                    size = -1
+                if size >= 0:
+                    granted = budget.acquire(ticket, size)
+                data = f.read()
+            if granted < 0:
+                granted = budget.acquire(ticket, len(data))  # reserve before handing off
+            return data, granted
         except Exception:
+            return None, max(0, granted)
+        finally:
+            if granted < 0:
+                budget.acquire(ticket, 0)  # keep the turn order moving
+
+    it = iter(paths)
+    pending: deque = deque()
+    ticket = 0
+    pool = ThreadPoolExecutor(max_workers=cfg.threads, thread_name_prefix="gitcube-read")
+    try:
+        for p in it:
+            pending.append((p, pool.submit(read, ticket, p)))
+            ticket += 1
+            if len(pending) >= cfg.depth:
+                break
+        while pending:
+            p, fut = pending.popleft()
+            data, granted = fut.result()
+            budget.release(granted)
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(read, ticket, nxt)))
+                ticket += 1
+            yield p, data
+    finally:
+        budget.close()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _blobs(paths: Iterable[Path], read: Optional[ReadAhead]) -> Iterator[Tuple[Path, Optional[bytes]]]:
+    if read is not None:
+        yield from read_ahead(paths, read)
+        return
+    for p in paths:
+        try:
+            yield p, p.read_bytes()
+        except Exception:
+            yield p, None
+
+def iter_files(
+    root: Path, paths: Optional[List[Path]] = None, *, read: Optional[ReadAhead] = None
+) -> Iterator[FileInfo]:
+    """Like ingest_files, but yields one file at a time (nothing is retained)."""
+    for p, data in _blobs(_walk(root.resolve()) if paths is None else paths, read):
+        if data is None:
             continue
+        yield FileInfo.from_bytes(p, data)
+
+def ingest_files(
+    root: Path, *, profiler: Optional["StageProfiler"] = None, read: Optional[ReadAhead] = None
+) -> List[FileInfo]:
+    root = root.resolve()
+    out: List[FileInfo] = []
+    if profiler is None:
+        for p, data in _blobs(_walk(root), read):
+            if data is None:
+                continue
+            out.append(FileInfo.from_bytes(p, data))
+        return out
+
+    with profiler.stage("walk") as rec:
+        paths = _walk(root)
+        rec.files += len(paths)
+    blobs = _blobs(paths, read)
+    while True:
+        t = profiler.clock()  # with read-ahead: time spent waiting on the readers
+        item = next(blobs, None)
+        if item is None:
+            break
+        p, data = item
+        if data is None:
+            continue
+        profiler.charge("read", t, files=1, bytes=len(data))
+        t = profiler.clock()
+        digest = content_digest(data)
+        profiler.charge("hash", t, files=1, bytes=len(data))
+        t = profiler.clock()
+        text = data.decode("utf-8", errors="ignore")
+        profiler.charge("decode", t, files=1, bytes=len(data))
+        out.append(FileInfo(path=p, text=text, digest=digest, size=len(data)))
     return out
+
+TOP_DUPLICATE_CLUSTERS = 10
+
+def duplicate_clusters(files: List[FileInfo], root: Path, *, top: int = TOP_DUPLICATE_CLUSTERS) -> Dict[str, Any]:
+    """Report section: groups of byte-identical source files and what dedup saved.
+
+    Every copy after the first is neither parsed nor walked for imports
+    (``build_import_graph`` reuses the first copy's extraction), so
+    ``parses_saved`` counts those copies and ``bytes_saved`` their size.
+    Clusters are listed by bytes saved, largest first.
+    """
+    groups: Dict[Tuple[str, bytes], List[FileInfo]] = {}
+    for f in files:
+        if f.digest:
+            groups.setdefault((f.path.suffix, f.digest), []).append(f)
+    prefix = str(root.resolve()) + os.sep
+    clusters: List[Dict[str, Any]] = []
+    parses = saved = 0
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        size = members[0].size
+        parses += len(members) - 1
+        saved += size * (len(members) - 1)
+        paths = [str(f.path) for f in members]
+        clusters.append(
+            {
+                "copies": len(members),
+                "bytes": size,
+                "paths": sorted((p[len(prefix) :] if p.startswith(prefix) else p).replace(os.sep, "/") for p in paths),
+            }
+        )
+    clusters.sort(key=lambda c: (-c["bytes"] * (c["copies"] - 1), c["paths"][0]))
+    return {
+        "clusters": len(clusters),
+        "parses_saved": parses,
+        "bytes_saved": saved,
+        "top": clusters[:top],
+    }
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+"""Layered topology for the 1/4/7 octave view.
+
+The import graph is condensed into its SCC DAG and every component gets a
+topological depth with Kahn's algorithm (O(V+E)):
+
+  depth 0      = modules that import nothing inside the graph (Base)
+  depth d + 1  = modules whose deepest dependency sits at depth d
+
+Depths are then split into three bands: Base (1), Actuator (4), Apex (7).
+"""
+
+from collections import deque
+from typing import Any, Dict, List
+
+from .graph import Graph, index_graph
+from .metrics import strongly_connected_components
+
+OCTAVE_BANDS = [
+    (1, "RED (Base)"),
+    (4, "GREEN (Actuator)"),
+    (7, "VIOLET (Apex)"),
+]
+OCTAVE_CELLS = 6
+
+
+def layer_depths(adj: List[List[int]]) -> List[int]:
+    """Return the topological depth of every node (SCC members share a depth)."""
+    comp, n_comps = strongly_connected_components(adj)
+
+    # Condensed reverse edges: dependency component -> importer components.
+    importers: List[List[int]] = [[] for _ in range(n_comps)]
+    pending = [0] * n_comps  # distinct dependencies not yet settled
+    seen_pair = set()
+    for u, row in enumerate(adj):
+        cu = comp[u]
+        for v in row:
+            cv = comp[v]
+            if cu == cv:
+                continue
+            key = cu * n_comps + cv
+            if key in seen_pair:
+                continue
+            seen_pair.add(key)
+            importers[cv].append(cu)
+            pending[cu] += 1
+
+    depth = [0] * n_comps
+    queue = deque(c for c in range(n_comps) if pending[c] == 0)
+    while queue:
+        c = queue.popleft()
+        d = depth[c] + 1
+        for imp in importers[c]:
+            if depth[imp] < d:
+                depth[imp] = d
+            pending[imp] -= 1
+            if pending[imp] == 0:
+                queue.append(imp)
+
+    return [depth[c] for c in comp]
+
+
+def _band(depth: int, max_depth: int) -> int:
+    if max_depth <= 0:
+        return 0
+    return int(2 * depth / max_depth + 0.5)
+
+
+def compute_octave_distribution(graph: Graph) -> List[Dict[str, Any]]:
+    """Bucket modules into the Base/Actuator/Apex bands by topological depth."""
+    _, adj = index_graph(graph)
+    depths = layer_depths(adj)
+    max_depth = max(depths, default=0)
+
+    counts = [0, 0, 0]
+    for d in depths:
+        counts[_band(d, max_depth)] += 1
+    total_nodes = len(depths)
+
+    out: List[Dict[str, Any]] = []
+    for (octave, label), count in zip(OCTAVE_BANDS, counts):
+        share = (count / total_nodes) if total_nodes else 0.0
+        out.append(
+            {
+                "octave": octave,
+                "label": label,
+                "fill": int(round(OCTAVE_CELLS * share)),
+                "total": OCTAVE_CELLS,
+                "modules": count,
+                "share": float(share),
+            }
+        )
+    return out
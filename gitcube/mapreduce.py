@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+"""Map-reduce analysis: per-package partial results merged into exact metrics.
+
+The tree is partitioned by top-level directory (files directly under the
+root form the package "."). Each package is analyzed on its own into a
+small JSON partial, possibly on another machine, and ``merge_partials``
+combines them into exactly the metrics a single run would produce.
+
+A module name is *owned* by a package when all of its source files live
+there. Names with files in several packages (module nodes are file stems,
+so e.g. ``utils`` or ``__init__``) are *shared*. Their edges are listed
+explicitly and unioned at merge time.
+
+A partial holds:
+
+  owned / edges_owned     counts only; owned nodes are unique per package
+  shared_edges            {shared name: [targets]} contributed by this package
+  extra_nodes             referenced names without source (externals, package dirs)
+  cyclic_closed           cyclic nodes in local SCCs that cannot reach another
+                          package: their status is already final
+  open                    the remaining local SCCs: member names, size, local
+                          cyclicity, condensation successors and exit targets
+
+Merging builds the quotient graph of all open SCCs plus shared nodes and
+runs Tarjan on it. A local SCC is cyclic if it is cyclic on its own or if
+its quotient SCC is non-trivial.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set
+import json
+
+from .externals import DEFAULT_EXTERNALS, ExternalFilter, filter_graph, load_import_index
+from .graph import EXTRACTORS, build_import_graph
+from .ingest import FileInfo, _walk
+from .metrics import Metrics, strongly_connected_components
+
+if TYPE_CHECKING:
+    from .profile import StageProfiler
+
+PARTIAL_FORMAT = "gitcube-partial"
+PARTIAL_VERSION = 1
+ROOT_PACKAGE = "."
+_SHARED = ""  # owner marker for names with files in several packages
+
+
+@dataclass
+class Partition:
+    """Everything a map task needs; cheap to build (walk only, no reads)."""
+
+    root: Path
+    packages: Dict[str, List[Path]]
+    owner: Dict[str, str]  # source module name -> package, or _SHARED
+    externals: ExternalFilter
+
+
+def package_of(path: Path, root: Path) -> str:
+    parts = path.relative_to(root).parts
+    return parts[0] if len(parts) > 1 else ROOT_PACKAGE
+
+
+def partition(
+    root: Path,
+    *,
+    externals: str = DEFAULT_EXTERNALS,
+    import_index_path: Optional[Path] = None,
+) -> Partition:
+    root = root.resolve()
+    paths = _walk(root)
+    packages: Dict[str, List[Path]] = {}
+    owner: Dict[str, str] = {}
+    for p in paths:
+        pkg = package_of(p, root)
+        packages.setdefault(pkg, []).append(p)
+        mod = EXTRACTORS[p.suffix].module_name(p)
+        prev = owner.setdefault(mod, pkg)
+        if prev != pkg:
+            owner[mod] = _SHARED
+    cache = import_index_path or (root / ".gitcube" / "import_index.json")
+    flt = ExternalFilter(load_import_index(cache), externals).set_tree(paths, root)
+    return Partition(root=root, packages=dict(sorted(packages.items())), owner=owner, externals=flt)
+
+
+def build_partial(part: Partition, package: str) -> Dict[str, Any]:
+    """Analyze one package into a mergeable partial (JSON-serializable dict)."""
+    files: List[FileInfo] = []
+    for p in part.packages.get(package, []):
+        try:
+            data = p.read_bytes()
+        except Exception:
+            continue
+        files.append(FileInfo.from_bytes(p, data))
+    graph = filter_graph(build_import_graph(files), part.externals)
+
+    owned = sorted(n for n in graph.lang if part.owner.get(n) == package)
+    ids = {n: i for i, n in enumerate(owned)}
+    adj: List[List[int]] = [[] for _ in owned]
+    exits: List[Set[str]] = [set() for _ in owned]
+    extra: Set[str] = set()
+    edges_owned = 0
+    for u, name in enumerate(owned):
+        for d in graph.edges.get(name, ()):
+            edges_owned += 1
+            if d in ids:
+                adj[u].append(ids[d])
+            elif d in part.owner:
+                exits[u].add(d)
+            else:
+                extra.add(d)
+    shared = {n: sorted(graph.edges.get(n, ())) for n in graph.lang if part.owner.get(n) == _SHARED}
+    for dsts in shared.values():
+        extra.update(d for d in dsts if d not in part.owner)
+
+    comp, n_comps = strongly_connected_components(adj)
+    members: List[List[int]] = [[] for _ in range(n_comps)]
+    for u, c in enumerate(comp):
+        members[c].append(u)
+    # components are numbered successors-first, so one ascending pass settles "open"
+    is_open = [False] * n_comps
+    succ: List[Set[int]] = [set() for _ in range(n_comps)]
+    comp_exits: List[Set[str]] = [set() for _ in range(n_comps)]
+    self_loop = [False] * n_comps
+    for c in range(n_comps):
+        for u in members[c]:
+            comp_exits[c].update(exits[u])
+            for v in adj[u]:
+                cv = comp[v]
+                if cv == c:
+                    self_loop[c] = self_loop[c] or u == v
+                else:
+                    succ[c].add(cv)
+        is_open[c] = bool(comp_exits[c]) or any(is_open[s] for s in succ[c])
+
+    open_ids = {c: i for i, c in enumerate(c for c in range(n_comps) if is_open[c])}
+    cyclic_closed = 0
+    open_out: List[Dict[str, Any]] = []
+    for c in range(n_comps):
+        cyclic = len(members[c]) > 1 or self_loop[c]
+        if c not in open_ids:
+            cyclic_closed += len(members[c]) if cyclic else 0
+            continue
+        open_out.append(
+            {
+                "members": [owned[u] for u in members[c]],
+                "cyclic": cyclic,
+                "succ": sorted(open_ids[s] for s in succ[c] if s in open_ids),
+                "exits": sorted(comp_exits[c]),
+            }
+        )
+
+    return {
+        "format": PARTIAL_FORMAT,
+        "version": PARTIAL_VERSION,
+        "package": package,
+        "packages": sorted(part.packages),
+        "externals": part.externals.mode,
+        "files": len(files),
+        "owned": len(owned),
+        "edges_owned": edges_owned,
+        "languages": _language_counts(graph.lang, owned),
+        "shared_edges": dict(sorted(shared.items())),
+        "shared_lang": {n: graph.lang[n] for n in sorted(shared)},
+        "extra_nodes": sorted(extra),
+        "cyclic_closed": cyclic_closed,
+        "open": open_out,
+    }
+
+
+def _language_counts(lang: Dict[str, str], owned: List[str]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for n in owned:
+        out[lang[n]] = out.get(lang[n], 0) + 1
+    return out
+
+
+_CTX: Optional[Partition] = None
+
+
+def _init_worker(part: Partition) -> None:
+    global _CTX
+    _CTX = part
+
+
+def _map_one(package: str) -> Dict[str, Any]:
+    assert _CTX is not None
+    return build_partial(_CTX, package)
+
+
+def map_packages(part: Partition, *, jobs: int = 0) -> List[Dict[str, Any]]:
+    """Build every package's partial, in a process pool when ``jobs > 1``."""
+    names = list(part.packages)
+    if jobs <= 1 or len(names) <= 1:
+        return [build_partial(part, p) for p in names]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(part,)) as ex:
+        return list(ex.map(_map_one, names))
+
+
+@dataclass
+class MergeResult:
+    metrics: Metrics
+    files: int
+    languages: Dict[str, int]
+    packages: List[str]
+
+    def summary(self) -> Dict[str, Any]:
+        """Graph section for the report (duck-typed like extmem.ExternalGraph)."""
+        return {"nodes": self.metrics.n_nodes, "edges": self.metrics.n_edges, "languages": self.languages}
+
+
+def merge_partials(partials: Iterable[Dict[str, Any]]) -> MergeResult:
+    """Combine one partial per package into exact global metrics."""
+    parts = sorted(partials, key=lambda p: p["package"])
+    if not parts:
+        raise ValueError("no partials to merge")
+    for p in parts:
+        if p.get("format") != PARTIAL_FORMAT or p.get("version") != PARTIAL_VERSION:
+            raise ValueError(f"not a {PARTIAL_FORMAT} v{PARTIAL_VERSION} file: package {p.get('package')!r}")
+    expected = parts[0]["packages"]
+    got = [p["package"] for p in parts]
+    if got != expected or any(p["packages"] != expected or p["externals"] != parts[0]["externals"] for p in parts):
+        missing = sorted(set(expected) - set(got))
+        raise ValueError(f"partials do not cover one partition (missing: {', '.join(missing) or '-'}; got: {', '.join(got)})")
+
+    # quotient graph: open local SCCs, then shared nodes
+    vertex: Dict[str, int] = {}  # member / shared name -> quotient vertex
+    sizes: List[int] = []
+    local_cyclic: List[bool] = []
+    offsets: List[int] = []
+    for p in parts:
+        offsets.append(len(sizes))
+        for scc in p["open"]:
+            for name in scc["members"]:
+                vertex[name] = len(sizes)
+            sizes.append(len(scc["members"]))
+            local_cyclic.append(bool(scc["cyclic"]))
+    shared_edges: Dict[str, Set[str]] = {}
+    for p in parts:
+        for name, dsts in p["shared_edges"].items():
+            shared_edges.setdefault(name, set()).update(dsts)
+    for name in sorted(shared_edges):
+        vertex[name] = len(sizes)
+        sizes.append(1)
+        local_cyclic.append(name in shared_edges[name])
+
+    adj: List[List[int]] = [[] for _ in sizes]
+    for p, base in zip(parts, offsets):
+        for i, scc in enumerate(p["open"]):
+            row = adj[base + i]
+            row.extend(base + s for s in scc["succ"])
+            row.extend(vertex[e] for e in scc["exits"] if e in vertex)
+    for name, dsts in shared_edges.items():
+        adj[vertex[name]].extend(vertex[d] for d in dsts if d in vertex)
+
+    comp, n_comps = strongly_connected_components(adj)
+    comp_size = [0] * n_comps
+    for c in comp:
+        comp_size[c] += 1
+    cyclic = sum(p["cyclic_closed"] for p in parts)
+    cyclic += sum(sizes[v] for v in range(len(sizes)) if local_cyclic[v] or comp_size[comp[v]] > 1)
+
+    extra: Set[str] = set()
+    for p in parts:
+        extra.update(p["extra_nodes"])
+    n_real = sum(p["owned"] for p in parts) + len(shared_edges) + len(extra)
+    m = sum(p["edges_owned"] for p in parts) + sum(len(v) for v in shared_edges.values())
+
+    n = max(1, n_real)
+    density = m / max(1, n * (n - 1))
+    cycle_index = cyclic / n
+    entropy = min(1.0, 0.35 * density + 0.85 * cycle_index)
+    languages: Dict[str, int] = {}
+    shared_lang: Dict[str, str] = {}
+    for p in parts:
+        for k, v in p["languages"].items():
+            languages[k] = languages.get(k, 0) + v
+        for name, lang in p["shared_lang"].items():
+            shared_lang.setdefault(name, lang)
+    for lang in shared_lang.values():
+        languages[lang] = languages.get(lang, 0) + 1
+    return MergeResult(
+        metrics=Metrics(
+            entropy_score=float(entropy),
+            cycle_index=float(cycle_index),
+            churn_accel=0.0,
+            density=float(density),
+            n_nodes=int(n),
+            n_edges=int(m),
+        ),
+        files=sum(p["files"] for p in parts),
+        languages=dict(sorted(languages.items())),
+        packages=expected,
+    )
+
+
+def write_partial(path: Path, partial: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(partial, separators=(",", ":"), sort_keys=True), encoding="utf-8")
+
+
+def read_partial(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def run_map_reduce(
+    root: Path,
+    *,
+    jobs: int = 0,
+    externals: str = DEFAULT_EXTERNALS,
+    import_index_path: Optional[Path] = None,
+    profiler: Optional["StageProfiler"] = None,
+) -> MergeResult:
+    if profiler is not None:
+        with profiler.stage("walk") as rec:
+            part = partition(root, externals=externals, import_index_path=import_index_path)
+            rec.files += sum(len(v) for v in part.packages.values())
+        with profiler.stage("map") as rec:
+            partials = map_packages(part, jobs=jobs)
+            rec.files += sum(p["files"] for p in partials)
+        with profiler.stage("merge") as rec:
+            result = merge_partials(partials)
+            rec.nodes, rec.edges = result.metrics.n_nodes, result.metrics.n_edges
+        return result
+    part = partition(root, externals=externals, import_index_path=import_index_path)
+    return merge_partials(map_packages(part, jobs=jobs))
@@ -1,56 +1,116 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Set, List
-from .graph import Graph
+from typing import TYPE_CHECKING, Set, List, Optional, Tuple
+from .graph import Graph, index_graph
 from .ingest import FileInfo
 
+if TYPE_CHECKING:
+    from .profile import StageProfiler
+
 @dataclass
 class Metrics:
     entropy_score: float
     cycle_index: float
     churn_accel: float
+    density: float
+    n_nodes: int
+    n_edges: int
 
 @dataclass
 class Action:
     recommendation: str  # ALLOW/WARN/BLOCK
     note: str
 
+def strongly_connected_components(adj: List[List[int]]) -> Tuple[List[int], int]:
+    """Iterative Tarjan SCC over an interned adjacency list.
+
+    Returns (comp_of_node, n_comps). Components are numbered in reverse
+    topological order: every edge u->v has comp[u] >= comp[v].
+    """
+    n = len(adj)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    comp = [-1] * n
+    stack: List[int] = []
+    n_comps = 0
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        # frames hold their adjacency row so disk-backed ``adj`` is read once per node
+        work = [(root, 0, None)]
+        while work:
+            u, i, row = work[-1]
+            if row is None:
+                index[u] = low[u] = counter
+                counter += 1
+                stack.append(u)
+                on_stack[u] = True
+                row = adj[u]
+            while i < len(row):
+                v = row[i]
+                i += 1
+                if index[v] == -1:
+                    work[-1] = (u, i, row)
+                    work.append((v, 0, None))
+                    break
+                if on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                work.pop()
+                if work:
+                    p = work[-1][0]
+                    if low[u] < low[p]:
+                        low[p] = low[u]
+                if low[u] == index[u]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp[w] = n_comps
+                        if w == u:
+                            break
+                    n_comps += 1
+    return comp, n_comps
+
+
+Condensed = Tuple[List[str], List[List[int]], List[int], int]  # names, adj, comp, n_comps
+
+
+def condense(graph: Graph) -> Condensed:
+    """Interned graph plus its SCCs, for stages that share one Tarjan pass."""
+    names, adj = index_graph(graph)
+    comp, n_comps = strongly_connected_components(adj)
+    return names, adj, comp, n_comps
+
+
+def _cyclic_nodes(adj: List[List[int]], comp: List[int], n_comps: int) -> List[int]:
+    """Nodes in a non-trivial SCC or carrying a self-loop."""
+    sizes = [0] * n_comps
+    for c in comp:
+        sizes[c] += 1
+    return [u for u in range(len(comp)) if sizes[comp[u]] > 1 or u in adj[u]]
+
+
 def _dfs_cycles(graph: Graph) -> Set[str]:
-    # Return nodes that are part of at least one cycle (simple DFS back-edge detection)
-    visiting: Set[str] = set()
-    visited: Set[str] = set()
-    in_cycle: Set[str] = set()
-
-    def dfs(u: str, stack: List[str]) -> None:
-        visiting.add(u)
-        stack.append(u)
-        for v in graph.edges.get(u, set()):
-            if v not in graph.nodes:
-                continue
-            if v in visiting:
-                # mark cycle nodes in current stack from v onward
-                if v in stack:
-                    idx = stack.index(v)
-                    in_cycle.update(stack[idx:])
-            elif v not in visited:
-                dfs(v, stack)
-        stack.pop()
-        visiting.remove(u)
-        visited.add(u)
-
-    for n in graph.nodes:
-        if n not in visited:
-            dfs(n, [])
-    return in_cycle
-
-def compute_metrics(graph: Graph, files: List[FileInfo]) -> Metrics:
+    # Return nodes that are part of at least one cycle (SCC based, no recursion)
+    names, adj = index_graph(graph)
+    comp, n_comps = strongly_connected_components(adj)
+    return {names[u] for u in _cyclic_nodes(adj, comp, n_comps)}
+
+def compute_metrics(graph: Graph, files: List[FileInfo], *, profiler: Optional["StageProfiler"] = None) -> Metrics:
     n = max(1, len(graph.nodes))
     m = sum(len(v) for v in graph.edges.values())
 
     # density (0..1-ish) for directed graph without self edges
     density = m / max(1, n*(n-1))
 
-    cyc_nodes = _dfs_cycles(graph)
+    if profiler is not None:
+        with profiler.stage("cycles", nodes=len(graph.nodes), edges=m):
+            cyc_nodes = _dfs_cycles(graph)
+    else:
+        cyc_nodes = _dfs_cycles(graph)
     cycle_index = len(cyc_nodes) / n
 
     # entropy_score: simple, explainable weighting
@@ -58,7 +118,14 @@ def compute_metrics(graph: Graph, files: List[FileInfo]) -> Metrics:
 
     # placeholder: in v0.2 compute from git history
     churn_accel = 0.0
-    return Metrics(entropy_score=entropy, cycle_index=cycle_index, churn_accel=churn_accel)
+    return Metrics(
+        entropy_score=float(entropy),
+        cycle_index=float(cycle_index),
+        churn_accel=float(churn_accel),
+        density=float(density),
+        n_nodes=int(n),
+        n_edges=int(m),
+    )
 
 def decide_action(metrics: Metrics, *, warn=0.40, block=0.65) -> Action:
     if metrics.entropy_score >= block:
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+"""OpenMetrics exposition for GitCube runs.
+
+A tiny in-process registry (counters, gauges, histograms) that is fed once
+per analysis from the finished report, so the hot path never touches it.
+It can be rendered to an OpenMetrics text file (node_exporter textfile
+collector) or served over HTTP by ``gitcube serve``.
+
+Exposed families:
+  gitcube_analysis_duration_seconds        histogram
+  gitcube_stage_duration_seconds{stage}    histogram
+  gitcube_analyses_total                   counter
+  gitcube_files_scanned_total              counter
+  gitcube_verdicts_total{verdict}          counter
+  gitcube_graph_nodes / gitcube_graph_edges gauge
+  gitcube_metric{metric}                   gauge
+  gitcube_baseline_samples{metric}         gauge
+  gitcube_last_analysis_timestamp_seconds  gauge
+"""
+
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**kw: str) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == int(v) and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help: str, unit: str = "") -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.unit = unit
+        self.values: Dict[Labels, float] = {}
+
+    def header(self) -> List[str]:
+        out = [f"# TYPE {self.name} {self.kind}"]
+        if self.unit:
+            out.append(f"# UNIT {self.name} {self.unit}")
+        out.append(f"# HELP {self.name} {self.help}")
+        return out
+
+    def render(self) -> List[str]:
+        suffix = "_total" if self.kind == "counter" else ""
+        out = self.header()
+        for labels, v in sorted(self.values.items()):
+            out.append(f"{self.name}{suffix}{_fmt_labels(labels)} {_fmt_value(v)}")
+        return out
+
+
+class _Histogram(_Family):
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...], unit: str = "") -> None:
+        super().__init__(name, "histogram", help, unit)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Labels, List[float]] = {}  # per-bucket counts + [count, sum]
+
+    def observe(self, labels: Labels, value: float) -> None:
+        s = self.series.get(labels)
+        if s is None:
+            s = self.series[labels] = [0.0] * (len(self.buckets) + 2)
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            s[i] += 1
+        s[-2] += 1
+        s[-1] += value
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for labels, s in sorted(self.series.items()):
+            cum = 0.0
+            for b, c in zip(self.buckets, s):
+                cum += c
+                out.append(f"{self.name}_bucket{_fmt_labels(labels, ('le', repr(float(b))))} {_fmt_value(cum)}")
+            out.append(f"{self.name}_bucket{_fmt_labels(labels, ('le', '+Inf'))} {_fmt_value(s[-2])}")
+            out.append(f"{self.name}_count{_fmt_labels(labels)} {_fmt_value(s[-2])}")
+            out.append(f"{self.name}_sum{_fmt_labels(labels)} {_fmt_value(s[-1])}")
+        return out
+
+
+class MetricsRegistry:
+    """Thread-safe collection of metric families, rendered in registration order."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+
+    def _family(self, name: str, kind: str, help: str, unit: str = "") -> _Family:
+        f = self._families.get(name)
+        if f is None:
+            f = self._families[name] = _Family(name, kind, help, unit)
+        return f
+
+    def inc(self, name: str, help: str, value: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            f = self._family(name, "counter", help)
+            key = _labels(**labels)
+            f.values[key] = f.values.get(key, 0.0) + value
+
+    def set(self, name: str, help: str, value: float, *, unit: str = "", **labels: str) -> None:
+        with self._lock:
+            self._family(name, "gauge", help, unit).values[_labels(**labels)] = float(value)
+
+    def observe(
+        self,
+        name: str,
+        help: str,
+        value: float,
+        *,
+        buckets: Tuple[float, ...] = DURATION_BUCKETS,
+        unit: str = "",
+        **labels: str,
+    ) -> None:
+        with self._lock:
+            f = self._families.get(name)
+            if f is None:
+                f = self._families[name] = _Histogram(name, help, buckets, unit)
+            f.observe(_labels(**labels), float(value))  # type: ignore[attr-defined]
+
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = []
+            for f in self._families.values():
+                lines.extend(f.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def record_report(
+    registry: MetricsRegistry,
+    report: Dict[str, Any],
+    *,
+    profile: Optional[Dict[str, Any]] = None,
+    now: Optional[float] = None,
+) -> None:
+    """Fold one finished analysis report (and its stage profile) into the registry."""
+    profile = profile or report.get("profile") or {}
+    if profile:
+        registry.observe(
+            "gitcube_analysis_duration_seconds",
+            "Wall time of a full analysis.",
+            float(profile.get("wall_s", 0.0)),
+            unit="seconds",
+        )
+        for s in profile.get("stages", []):
+            registry.observe(
+                "gitcube_stage_duration_seconds",
+                "Wall time per pipeline stage.",
+                float(s.get("wall_s", 0.0)),
+                unit="seconds",
+                stage=str(s.get("stage", "")),
+            )
+
+    registry.inc("gitcube_analyses", "Completed analyses.")
+    registry.inc("gitcube_files_scanned", "Source files ingested.", float(report.get("file_count", 0)))
+    verdict = str((report.get("action", {}) or {}).get("recommendation", "UNKNOWN")).upper()
+    registry.inc("gitcube_verdicts", "Meru gate verdicts.", verdict=verdict)
+
+    graph = report.get("graph", {}) or {}
+    registry.set("gitcube_graph_nodes", "Nodes in the import graph.", float(graph.get("nodes", 0)))
+    registry.set("gitcube_graph_edges", "Edges in the import graph.", float(graph.get("edges", 0)))
+
+    metrics = report.get("metrics", {}) or {}
+    for k in ("entropy_score", "cycle_index", "density"):
+        if k in metrics:
+            registry.set("gitcube_metric", "Latest structural metric value.", float(metrics[k]), metric=k)
+
+    samples = (report.get("baseline", {}) or {}).get("samples", {}) or {}
+    for k, n in samples.items():
+        registry.set("gitcube_baseline_samples", "Samples in the rolling baseline.", float(n), metric=k)
+
+    registry.set(
+        "gitcube_last_analysis_timestamp_seconds",
+        "Unix time of the last analysis.",
+        time.time() if now is None else now,
+        unit="seconds",
+    )
+
+
+def write_textfile(path: Path, registry: MetricsRegistry) -> None:
+    """Atomically write the exposition (textfile collectors may read at any time)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def make_server(registry: MetricsRegistry, host: str = "0.0.0.0", port: int = 9464) -> ThreadingHTTPServer:
+    """HTTP server exposing ``/metrics``; caller runs ``serve_forever()``."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 (http.server API)
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+    return ThreadingHTTPServer((host, port), _Handler)
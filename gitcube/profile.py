@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+"""Stage profiler for the analysis pipeline.
+
+Records wall/CPU time and work counters (files, bytes, nodes, edges) per
+pipeline stage, plus peak traced memory. Pipeline functions accept an
+optional ``profiler``; when it is ``None`` they skip all timing calls, so
+the disabled path costs a single ``is None`` check per hook.
+
+Two ways to charge a stage:
+
+    with profiler.stage("walk") as rec:
+        ...
+        rec.files += 1
+
+    t = profiler.clock()
+    tree = ast.parse(text)
+    profiler.charge("parse", t, files=1, bytes=len(text))
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import time
+import tracemalloc
+
+
+@dataclass
+class StageRecord:
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+    files: int = 0
+    bytes: int = 0
+    nodes: int = 0
+    edges: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "wall_s": float(self.wall),
+            "cpu_s": float(self.cpu),
+            "calls": int(self.calls),
+            "files": int(self.files),
+            "bytes": int(self.bytes),
+            "nodes": int(self.nodes),
+            "edges": int(self.edges),
+        }
+
+
+class StageProfiler:
+    """Accumulates per-stage timings in first-seen order."""
+
+    def __init__(self, *, track_memory: bool = True) -> None:
+        self.track_memory = bool(track_memory)
+        self.stages: Dict[str, StageRecord] = {}
+        self._started_tracemalloc = False
+        self._t0 = 0.0
+        self._c0 = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_memory = 0
+
+    def start(self) -> "StageProfiler":
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        return self
+
+    def stop(self) -> None:
+        self.wall = time.perf_counter() - self._t0
+        self.cpu = time.process_time() - self._c0
+        if self.track_memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def record(self, name: str) -> StageRecord:
+        rec = self.stages.get(name)
+        if rec is None:
+            rec = self.stages[name] = StageRecord(name)
+        return rec
+
+    @staticmethod
+    def clock() -> Tuple[float, float]:
+        return time.perf_counter(), time.process_time()
+
+    def charge(self, name: str, start: Tuple[float, float], **counts: int) -> StageRecord:
+        """Add elapsed time since ``start`` (from ``clock()``) plus counters to a stage."""
+        rec = self.record(name)
+        rec.wall += time.perf_counter() - start[0]
+        rec.cpu += time.process_time() - start[1]
+        rec.calls += 1
+        for k, v in counts.items():
+            setattr(rec, k, getattr(rec, k) + int(v))
+        return rec
+
+    @contextmanager
+    def stage(self, name: str, **counts: int) -> Iterator[StageRecord]:
+        start = self.clock()
+        rec = self.record(name)
+        try:
+            yield rec
+        finally:
+            self.charge(name, start, **counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_s": float(self.wall),
+            "cpu_s": float(self.cpu),
+            "peak_memory_bytes": int(self.peak_memory),
+            "memory_tracked": self.track_memory,
+            "stages": [r.to_dict() for r in self.stages.values()],
+        }
+
+
+def format_profile_table(profile: Dict[str, Any]) -> List[str]:
+    """Render a profile dict as a compact fixed-width table."""
+    lines = [f"{'stage':<10} {'wall ms':>9} {'cpu ms':>9} {'files':>7} {'bytes':>11} {'nodes':>8} {'edges':>8}"]
+    for s in profile.get("stages", []):
+        lines.append(
+            f"{s['stage']:<10} {s['wall_s'] * 1000:>9.1f} {s['cpu_s'] * 1000:>9.1f} "
+            f"{s['files']:>7} {s['bytes']:>11} {s['nodes']:>8} {s['edges']:>8}"
+        )
+    lines.append(f"{'total':<10} {profile.get('wall_s', 0.0) * 1000:>9.1f} {profile.get('cpu_s', 0.0) * 1000:>9.1f}")
+    if profile.get("memory_tracked"):
+        lines.append(f"peak traced memory: {profile.get('peak_memory_bytes', 0) / (1024 * 1024):.1f} MiB")
+    return lines
+
+
+def maybe_profiler(enabled: bool) -> Optional[StageProfiler]:
+    return StageProfiler().start() if enabled else None
@@ -1,11 +1,44 @@
 from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
 from typing import Any, Dict, List
 from .ingest import FileInfo
 from .graph import Graph
-from .metrics import Metrics, Action
+from .metrics import Metrics
+from .layers import compute_octave_distribution
+from .profile import format_profile_table
+
+
+def _octave_distribution(graph: Graph, extra: Dict[str, Any]) -> List[Dict[str, Any]]:
+    octaves = extra.get("octave_distribution")
+    if octaves is None:
+        octaves = compute_octave_distribution(graph)
+    return octaves
+
+
+def _language_counts(graph: Graph) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for lang in getattr(graph, "lang", {}).values():
+        counts[lang] = counts.get(lang, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def _graph_summary(graph: Graph) -> Dict[str, Any]:
+    summary = getattr(graph, "summary", None)
+    if summary is not None:  # out-of-core stores (extmem.ExternalGraph) count on disk
+        return summary()
+    return {
+        "nodes": int(len(getattr(graph, "nodes", []))),
+        "edges": int(sum(len(v) for v in getattr(graph, "edges", {}).values())),
+        "languages": _language_counts(graph),
+    }
+
+
+def _octave_bar(fill: int, total: int) -> str:
+    fill = max(0, min(int(fill), int(total)))
+    return "⬢" * fill + "⬡" * (int(total) - fill)
 
 
 def build_report_dict(
@@ -13,64 +46,77 @@ def build_report_dict(
     files: List[FileInfo],
     graph: Graph,
     metrics: Metrics,
-    action: Action,
+    extra: Dict[str, Any],
 ) -> Dict[str, Any]:
     """Return a machine-readable report.
 
     Notes:
-    - This MVP keeps the 1/4/7 "octave" visualization as a conceptual proxy.
+    - The 1/4/7 "octave" view buckets modules by topological depth of the
+      SCC-condensed import graph (see ``layers.py``).
     - Later versions can replace this with a real 42-state lattice (V-CORE).
     """
 
-    octave_distribution = [
-        {"octave": 1, "label": "RED (Base)", "fill": 6, "total": 6},
-        {"octave": 4, "label": "GREEN (Actuator)", "fill": 2, "total": 6},
-        {"octave": 7, "label": "VIOLET (Apex)", "fill": 0, "total": 6},
-    ]
+    octave_distribution = _octave_distribution(graph, extra)
+
+    action = extra.get("action", {})
+    recommendation = action.get("recommendation", "UNKNOWN")
 
     warnings: List[str] = []
-    if action.recommendation == "BLOCK":
+    if recommendation == "BLOCK":
         warnings.append("MERU GATE WARNING: Apex is starved. Base is heavy.")
         warnings.append("Axis 1-4-7 Ready: FALSE (Bindu is CLOSED)")
 
-    return {
+    out: Dict[str, Any] = {
         "tool": "gitcube-core",
         "engine": "V-CORE SriYantra Engine",
         "path": str(path),
-        "file_count": len(files),
-        "graph": {
-            "nodes": int(len(getattr(graph, "nodes", []))),
-            "edges": int(sum(len(v) for v in getattr(graph, "edges", {}).values())),
-        },
+        "file_count": int(extra.get("file_count", len(files))),
+        "graph": _graph_summary(graph),
         "octave_distribution": octave_distribution,
         "bindu": {
-            "axis_1_4_7_ready": action.recommendation != "BLOCK",
-            "state": "OPEN" if action.recommendation != "BLOCK" else "CLOSED",
+            "axis_1_4_7_ready": recommendation != "BLOCK",
+            "state": "OPEN" if recommendation != "BLOCK" else "CLOSED",
         },
         "metrics": {
             "entropy_score": float(metrics.entropy_score),
             "cycle_index": float(metrics.cycle_index),
             "churn_accel": float(metrics.churn_accel),
+            "density": float(metrics.density),
+            "n_nodes": int(metrics.n_nodes),
+            "n_edges": int(metrics.n_edges),
             "shadow_level": "HIGH" if metrics.entropy_score >= 0.65 else "OK",
         },
-        "action": {
-            "recommendation": action.recommendation,
-            "note": action.note,
-            "required": "Refactor cyclic dependencies (imports)."
-            if action.recommendation != "ALLOW" and metrics.cycle_index > 0
-            else "",
-        },
+        "action": action,
+        "thresholds": extra.get("thresholds", {}),
+        "dna": extra.get("dna", {}),
+        "baseline": extra.get("baseline", {}),
         "warnings": warnings,
     }
+    for key in ("externals", "granularity"):
+        if key in extra:
+            out["graph"][key] = extra[key]
+    for key in ("external", "estimates", "sampling", "map_reduce", "import_time", "cycles", "cuts", "rules", "duplicates"):
+        if key in extra:
+            out[key] = extra[key]
+    return out
 
 
 def print_report_json(report: Dict[str, Any]) -> None:
     print(json.dumps(report, ensure_ascii=False, indent=2, sort_keys=False))
 
-def print_report(path: Path, files: List[FileInfo], graph: Graph, metrics: Metrics, action: Action) -> None:
+def print_profile(profile: Dict[str, Any], *, file=None) -> None:
+    out = file or sys.stdout
+    print("Profile:", file=out)
+    for line in format_profile_table(profile):
+        print(" " + line, file=out)
+    print(file=out)
+
+def print_report(path: Path, files: List[FileInfo], graph: Graph, metrics: Metrics, extra: Dict[str, Any]) -> None:
+    action = extra.get("action", {})
+    recommendation = action.get("recommendation", "UNKNOWN")
     print()
     print("[V-CORE SriYantra Engine] Scanning topology...")
-    print(f"[+] Ingesting {len(files)} files...")
+    print(f"[+] Ingesting {extra.get('file_count', len(files))} files...")
     print("[+] Building dependency graph...")
     print("[+] Calculating Shadow & Coherence...")
     print()
@@ -78,23 +124,86 @@ def print_report(path: Path, files: List[FileInfo], graph: Graph, metrics: Metri
     print(" GitCube Structural Report")
     print("="*52)
     print()
-    # very lightweight "octave" placeholder: show 1,4,7 as in screenshot concept
     print("Octave Distribution:")
-    print(" 1 RED (Base)        : ⬢⬢⬢⬢⬢⬢ (6/6)")
-    print(" 4 GREEN (Actuator)  : ⬢⬢⬡⬡⬡⬡ (2/6)")
-    print(" 7 VIOLET (Apex)     : ⬡⬡⬡⬡⬡⬡ (0/6)")
+    octaves = _octave_distribution(graph, extra)
+    if not octaves:
+        print(" (not computed for merged partials)")
+    for o in octaves:
+        label = f"{o['octave']} {o['label']}"
+        print(f" {label:<20}: {_octave_bar(o['fill'], o['total'])} ({o['fill']}/{o['total']}) {o.get('modules', 0)} modules")
     print()
-    if action.recommendation == "BLOCK":
-        print("[!] " + action.note)
+    if recommendation == "BLOCK":
+        print("[!] MERU GATE WARNING: Apex is starved. Base is heavy.")
         print("[!] Axis 1-4-7 Ready: FALSE (Bindu is CLOSED)")
         print()
     print("Metrics:")
     print(f" -> EntropyScore : {metrics.entropy_score:.2f} ({'HIGH SHADOW' if metrics.entropy_score>=0.65 else 'OK'})")
     print(f" -> CycleIndex   : {metrics.cycle_index:.2f} ({'Topological Knots Detected' if metrics.cycle_index>0 else 'No cycles detected'})")
     print(f" -> ChurnAccel   : {metrics.churn_accel:.2f}")
+    print(f" -> Density      : {metrics.density:.2f}")
+    sampling = extra.get("sampling")
+    if sampling and not sampling.get("complete"):
+        print(
+            f" -> Sampled      : {sampling['modules_parsed']}/{sampling['modules_total']} modules parsed, "
+            f"{sampling['seeds']} seeds within {sampling['time_budget_s']:g}s"
+        )
+        for k, e in extra.get("estimates", {}).items():
+            lo, hi = e["ci95"]
+            print(f"    ~ {k:<13}: {e['value']:.4f} (95% CI {lo:.4f}..{hi:.4f}, {e['mode']})")
+    dna = extra.get("dna", {})
+    if isinstance(dna, dict) and dna.get("signature"):
+        print(f" -> DNA          : {dna['signature']}")
+    dups = extra.get("duplicates")
+    if dups and dups["clusters"]:
+        print(
+            f" -> Duplicates   : {dups['clusters']} cluster(s) of identical files, "
+            f"{dups['parses_saved']} parse(s) / {dups['bytes_saved']} bytes skipped"
+        )
+        for c in dups["top"][:3]:
+            print(f"    {c['copies']} x {c['bytes']} bytes: {', '.join(c['paths'][:3])}{', ...' if c['copies'] > 3 else ''}")
     print()
+    import_time = extra.get("import_time")
+    if import_time:
+        counts = import_time["imports"]
+        print(
+            f"Import time ({counts['top_level']} top-level, {counts['function']} function-local, "
+            f"{counts['type_checking']} TYPE_CHECKING imports):"
+        )
+        for row in import_time["worst"][:5]:
+            print(
+                f" -> {row['module']:<24} loads {row['eager_modules']} modules "
+                f"({row['eager_share']:.0%} of source), +{row['deferred_modules']} deferred"
+            )
+        print()
     print("Action:")
-    print(f" -> Recommendation: [ {action.recommendation} MERGE ]")
-    if action.recommendation != "ALLOW" and metrics.cycle_index > 0:
+    print(f" -> Recommendation: [ {recommendation} MERGE ]")
+    if recommendation != "ALLOW" and metrics.cycle_index > 0:
         print(" -> Required: Refactor cyclic dependencies (imports).")
+        cycles = extra.get("cycles") or {}
+        witnesses = cycles.get("witnesses", [])
+        for w in witnesses[:3]:
+            print(f"    cycle ({w['size']} module{'s' if w['size'] != 1 else ''}): {w['path']}")
+        if len(witnesses) > 3:
+            print(f"    ... {len(witnesses) - 3} more cyclic components (see --json)")
+        cuts = extra.get("cuts")
+        if cuts and cuts["groups"]:
+            print(
+                f" -> Suggested cuts: {cuts['imports']} import(s) take CycleIndex "
+                f"{metrics.cycle_index:.2f} -> {cuts['projected']['cycle_index']:.2f}"
+            )
+            for g in cuts["groups"][:5]:
+                first = g["cuts"][0]
+                more = f" (+{len(g['cuts']) - 1} more)" if len(g["cuts"]) > 1 else ""
+                print(
+                    f"    remove {first['from']} -> {first['to']}"
+                    f"{' at ' + first['at'] if 'at' in first else ''}{more}: "
+                    f"frees {g['modules']}, CycleIndex -> {g['after']['cycle_index']:.2f}"
+                )
+    rules = extra.get("rules")
+    if rules and rules["violations"]:
+        print(f" -> Required: Remove forbidden imports ({rules['violations']} {rules['severity']}-level violation(s)).")
+        for v in rules["items"][:10]:
+            print(f"    {v['at']}: {v['from']} -> {v['to']}  [forbid {v['rule']}]")
+        if rules["violations"] > 10:
+            print(f"    ... {rules['violations'] - 10} more (see --json)")
     print()
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+"""Architecture rules: forbidden dependencies checked while the graph is built.
+
+Rules live in the repository's pyproject.toml:
+
+  [tool.gitcube.rules]
+  severity = "block"          # or "warn" (default: block)
+  forbid = [
+    "api.* -> db.*",          # the API layer never touches the database
+    "* -> legacy",            # nothing imports legacy
+  ]
+
+Patterns are dotted module names. A pattern matches that module and all of
+its submodules (``api`` and ``api.*`` are the same); ``*`` as a segment
+matches exactly one segment, and a lone ``*`` matches everything. Sources
+are the fully qualified name of the importing file (``api/v1/views.py`` ->
+``api.v1.views``), targets the imported module as written, with relative
+imports resolved against the source.
+
+All rules are compiled into two segment tries (one for sources, one for
+targets) whose nodes carry bitmasks of rule ids. A file's source mask is
+computed once; each import then costs one memoized trie walk and an AND,
+so hundreds of rules add next to nothing per edge. Files matching no
+source pattern skip the check entirely.
+"""
+
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import warnings
+
+SEVERITIES = ("warn", "block")
+_STAR = "*"
+
+
+@dataclass
+class Rule:
+    source: str
+    target: str
+
+    def __str__(self) -> str:
+        return f"{self.source} -> {self.target}"
+
+
+@dataclass
+class Violation:
+    rule: int
+    source: str  # importing module (dotted)
+    target: str  # imported module (dotted, relative imports resolved)
+    file: str
+    line: int
+
+
+class _Trie:
+    """Dotted-segment trie; ``mask`` at a node = rules whose pattern ends there."""
+
+    __slots__ = ("children", "mask")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Trie"] = {}
+        self.mask = 0
+
+    def add(self, pattern: str, bit: int) -> None:
+        node = self
+        parts = pattern.split(".")
+        if parts[-1] == _STAR:
+            parts.pop()  # trailing ``.*`` == the prefix itself
+        for seg in parts:
+            node = node.children.setdefault(seg, _Trie())
+        node.mask |= bit
+
+    def match(self, parts: List[str]) -> int:
+        """Rules whose pattern is a (wildcard-aware) prefix of ``parts``."""
+        out = self.mask
+        frontier = [self]
+        for seg in parts:
+            nxt: List[_Trie] = []
+            for node in frontier:
+                for key in (seg, _STAR):
+                    child = node.children.get(key)
+                    if child is not None:
+                        out |= child.mask
+                        nxt.append(child)
+            if not nxt:
+                break
+            frontier = nxt
+        return out
+
+
+def _check_pattern(p: str, rule: str) -> str:
+    p = p.strip()
+    if not p or any(not seg for seg in p.split(".")):
+        raise ValueError(f"bad rule {rule!r}: empty module pattern")
+    return p
+
+
+def parse_rule(text: str) -> Rule:
+    src, sep, dst = str(text).partition("->")
+    if not sep:
+        raise ValueError(f"bad rule {text!r}: expected 'SOURCE -> TARGET'")
+    return Rule(_check_pattern(src, text), _check_pattern(dst, text))
+
+
+@dataclass
+class RuleSet:
+    rules: List[Rule]
+    severity: str = "block"
+    root: Optional[Path] = None  # resolved repo root, for dotted names and report paths
+    violations: List[Violation] = field(default_factory=list)
+    checked: int = 0  # imports tested against a non-empty source mask
+
+    def __post_init__(self) -> None:
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"rules severity must be one of {', '.join(SEVERITIES)}")
+        self._src = _Trie()
+        self._dst = _Trie()
+        for i, r in enumerate(self.rules):
+            self._src.add(r.source, 1 << i)
+            self._dst.add(r.target, 1 << i)
+        self._dst_memo: Dict[str, int] = {}
+
+    def source_mask(self, module: str) -> int:
+        return self._src.match(module.split("."))
+
+    def _target_mask(self, target: str) -> int:
+        m = self._dst_memo.get(target)
+        if m is None:
+            m = self._dst_memo[target] = self._dst.match(target.split("."))
+        return m
+
+    def check(self, module: str, is_package: bool, located: List[Tuple[str, int]], file: str) -> None:
+        """Test one file's imports (as written, with lines) against every rule."""
+        smask = self.source_mask(module)
+        if not smask:
+            return
+        self.checked += len(located)
+        for target, line in located:
+            if target.startswith("."):
+                target = _absolute(module, is_package, target)
+            hit = smask & self._target_mask(target)
+            while hit:
+                low = hit & -hit
+                self.violations.append(Violation(low.bit_length() - 1, module, target, file, line))
+                hit ^= low
+
+    def check_file(self, path: Path, module: Optional[str], located: List[Tuple[str, int]]) -> None:
+        """``check`` for a source file; ``module=None`` derives the dotted Python name."""
+        rel = str(path)
+        if self.root is not None:
+            root = str(self.root) + os.sep
+            if rel.startswith(root):  # ingest hands out paths under the resolved root
+                rel = rel[len(root) :]
+        rel = rel.replace(os.sep, "/")
+        is_package = path.name == "__init__.py"
+        if module is None:
+            stem = rel.rpartition(".")[0] if rel.endswith(".py") else rel
+            module = stem.replace("/", ".")
+            if is_package:
+                module = module[: -len("__init__")].rstrip(".") or (self.root.name if self.root else "")
+        self.check(module, is_package, located, rel)
+
+    def summary(self) -> Dict[str, Any]:
+        items = [
+            {"rule": str(self.rules[v.rule]), "from": v.source, "to": v.target, "at": f"{v.file}:{v.line}"}
+            for v in sorted(self.violations, key=lambda v: (v.file, v.line, v.rule))
+        ]
+        return {
+            "rules": len(self.rules),
+            "severity": self.severity,
+            "checked": self.checked,
+            "violations": len(items),
+            "items": items,
+        }
+
+
+def _absolute(module: str, is_package: bool, target: str) -> str:
+    rest = target.lstrip(".")
+    level = len(target) - len(rest)
+    parts = module.split(".")
+    if not is_package:
+        parts = parts[:-1]
+    if level > 1:
+        parts = parts[: max(0, len(parts) - (level - 1))]
+    return ".".join(p for p in (*parts, rest) if p)
+
+
+_HEADER = re.compile(r"^[ \t]*\[[ \t]*tool\.gitcube\.rules[ \t]*\]", re.M)
+
+
+def _toml_parser() -> Any:
+    try:
+        import tomllib  # Python 3.11+
+    except ImportError:
+        try:
+            import tomli as tomllib  # type: ignore[no-redef]
+        except ImportError:
+            return None
+    return tomllib
+
+
+def load_rules(pyproject: Path, root: Optional[Path] = None) -> Optional[RuleSet]:
+    """Compile ``[tool.gitcube.rules]`` from ``pyproject`` (None if absent or empty).
+
+    Raises ValueError for a malformed file or rule. Without a TOML parser
+    (Python 3.10 and no ``tomli``) the rules are skipped with a warning.
+    """
+    try:
+        text = pyproject.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    if not _HEADER.search(text):  # skip the TOML parse (and tomli) for unrelated projects
+        return None
+    toml = _toml_parser()
+    if toml is None:
+        warnings.warn(
+            f"{pyproject.name} has [tool.gitcube.rules] but reading it needs Python 3.11+ "
+            "or the 'tomli' package; rules are not checked",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return None
+    try:
+        data = toml.loads(text)
+    except toml.TOMLDecodeError as e:
+        raise ValueError(f"{pyproject}: {e}") from None
+    section = data.get("tool", {}).get("gitcube", {}).get("rules")
+    if not section:
+        return None
+    forbid = section.get("forbid", [])
+    if isinstance(forbid, str):
+        forbid = [forbid]
+    rules = [parse_rule(r) for r in forbid]
+    if not rules:
+        return None
+    return RuleSet(
+        rules=rules,
+        severity=str(section.get("severity", "block")).lower(),
+        root=(root or pyproject.parent).resolve(),
+    )
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+"""Symbol-level dependency graph (``--granularity symbol``).
+
+Nodes are fully qualified Python modules, classes, functions and methods
+(``pkg.mod``, ``pkg.mod.Class``, ``pkg.mod.Class.method``), so same-stem
+files in different packages stay apart and a catch-all ``utils`` module
+splits into the functions that are actually used. Edges come from imports
+and from references that can be resolved statically:
+
+- names bound by an import, or defined at module level, and attribute
+  chains on them (``mod.func``, ``Class.method``, re-exports via
+  ``from .x import y`` in a package ``__init__``);
+- ``self.x`` / ``cls.x`` inside a method, when the class defines ``x``.
+
+Everything else (locals, builtins, dynamic attributes) is ignored. Code at
+module level and in nested functions is charged to the module node or the
+enclosing top-level def / method.
+
+Symbol tables are built lazily: one ``ast.parse`` plus one walk per file,
+the first time the file is needed either as a source or as an import
+target, and memoized for the rest of the run. Non-Python files keep their
+module-level nodes.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+import ast
+
+from .graph import EXTRACTORS, Graph, _extract
+from .ingest import FileInfo
+
+if TYPE_CHECKING:
+    from .profile import StageProfiler
+
+GRANULARITIES = ("module", "symbol")
+_MAX_REEXPORT_DEPTH = 8
+
+
+@dataclass
+class SymbolTable:
+    module: str
+    is_package: bool
+    defs: Set[str] = field(default_factory=set)  # qualnames relative to the module
+    imports: Dict[str, str] = field(default_factory=dict)  # bound name -> absolute dotted target
+    refs: Dict[str, Set[str]] = field(default_factory=dict)  # owner qualname ("" = module) -> dotted refs
+
+
+def module_qualname(path: Path, root: Path) -> str:
+    """``pkg/sub/mod.py`` -> ``pkg.sub.mod``; ``pkg/__init__.py`` -> ``pkg``."""
+    try:
+        parts = list(path.relative_to(root).with_suffix("").parts)
+    except ValueError:
+        parts = [path.stem]
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts) or root.name
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    parts: List[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class _TableBuilder(ast.NodeVisitor):
+    def __init__(self, table: SymbolTable) -> None:
+        self.t = table
+        self.owner = ""
+        self.depth = 0  # 0 = module body, 1 = top-level def, 2 = method
+        self.classes: Set[str] = set()  # top-level classes, whose defs become methods
+
+    def _ref(self, dotted: str) -> None:
+        self.t.refs.setdefault(self.owner, set()).add(dotted)
+
+    def _package(self, level: int) -> str:
+        parts = self.t.module.split(".") if self.t.module else []
+        if not self.t.is_package:
+            parts = parts[:-1]
+        if level > 1:
+            parts = parts[: max(0, len(parts) - (level - 1))]
+        return ".".join(parts)
+
+    def _scope(self, node: ast.AST, name: str) -> None:
+        saved = (self.owner, self.depth)
+        if self.depth == 0 or (self.depth == 1 and self.owner in self.classes):
+            self.owner = f"{self.owner}.{name}" if self.owner else name
+            self.depth += 1
+            self.t.defs.add(self.owner)
+        for d in getattr(node, "decorator_list", []):
+            self.visit(d)
+        for b in getattr(node, "bases", []):
+            self.visit(b)
+        for stmt in node.body:  # type: ignore[attr-defined]
+            self.visit(stmt)
+        args = getattr(node, "args", None)
+        if args is not None:
+            for a in args.args + args.kwonlyargs + args.posonlyargs:
+                if a.annotation is not None:
+                    self.visit(a.annotation)
+        returns = getattr(node, "returns", None)
+        if returns is not None:
+            self.visit(returns)
+        self.owner, self.depth = saved
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        if self.depth == 0:
+            self.classes.add(node.name)
+        self._scope(node, node.name)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._scope(node, node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef  # type: ignore[assignment]
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.asname:
+                self.t.imports[alias.asname] = alias.name
+                self._ref(alias.asname)
+            else:
+                head = alias.name.split(".")[0]
+                self.t.imports.setdefault(head, head)
+                self._ref(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.level:
+            base = self._package(node.level)
+            mod = ".".join(p for p in (base, node.module or "") if p)
+        else:
+            mod = node.module or ""
+        for alias in node.names:
+            if alias.name == "*":
+                if mod:
+                    self._ref(mod)
+                continue
+            target = f"{mod}.{alias.name}" if mod else alias.name
+            bound = alias.asname or alias.name
+            self.t.imports[bound] = target
+            self._ref(bound)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        d = _dotted(node)
+        if d is None:
+            self.generic_visit(node)
+        elif isinstance(node.ctx, ast.Load):
+            self._ref(d)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self._ref(node.id)
+
+
+def build_symbol_table(module: str, is_package: bool, tree: ast.AST) -> SymbolTable:
+    t = SymbolTable(module=module, is_package=is_package)
+    _TableBuilder(t).visit(tree)
+    return t
+
+
+class SymbolIndex:
+    """Lazily built, memoized symbol tables for the Python files of one tree."""
+
+    def __init__(self, root: Path, files: List[FileInfo], *, profiler: Optional["StageProfiler"] = None) -> None:
+        self.root = root.resolve()
+        self.profiler = profiler
+        self._files: Dict[str, FileInfo] = {}
+        self._by_stem: Dict[str, List[str]] = {}
+        for f in files:
+            if f.path.suffix != ".py":
+                continue
+            mod = module_qualname(f.path, self.root)
+            self._files.setdefault(mod, f)
+            self._by_stem.setdefault(mod.rsplit(".", 1)[-1], []).append(mod)
+        self._tables: Dict[str, Optional[SymbolTable]] = {}
+
+    @property
+    def modules(self) -> List[str]:
+        return sorted(self._files)
+
+    def table(self, module: str) -> Optional[SymbolTable]:
+        """Symbol table of ``module`` (None if unknown or unparsable), built on first use."""
+        try:
+            return self._tables[module]
+        except KeyError:
+            pass
+        f = self._files.get(module)
+        t: Optional[SymbolTable] = None
+        if f is not None:
+            p = self.profiler
+            if p is not None:
+                start = p.clock()
+            try:
+                tree = ast.parse(f.text)
+            except SyntaxError:
+                tree = None
+            if p is not None:
+                p.charge("parse", start, files=1, bytes=len(f.text))
+                start = p.clock()
+            if tree is not None:
+                t = build_symbol_table(module, f.path.name == "__init__.py", tree)
+            if p is not None:
+                p.charge("symbols", start, files=1)
+        self._tables[module] = t
+        return t
+
+    def _module_prefix(self, parts: List[str]) -> Tuple[Optional[str], int]:
+        """Longest module named by a prefix of ``parts`` and how many parts it used."""
+        for i in range(len(parts), 0, -1):
+            cand = ".".join(parts[:i])
+            if cand in self._files:
+                return cand, i
+        # bare ``import m`` of a nested module (the module-level graph's stem rule)
+        hits = self._by_stem.get(parts[0], [])
+        return (hits[0], 1) if len(hits) == 1 else (None, 0)
+
+    def resolve(self, dotted: str, _depth: int = 0) -> str:
+        """Absolute dotted reference -> graph node (internal symbol or external top-level name)."""
+        parts = dotted.split(".")
+        mod, used = self._module_prefix(parts)
+        if mod is None:
+            return parts[0]
+        rest = parts[used:]
+        if not rest:
+            return mod
+        t = self.table(mod)
+        if t is None:
+            return mod
+        for i in range(min(2, len(rest)), 0, -1):
+            q = ".".join(rest[:i])
+            if q in t.defs:
+                return f"{mod}.{q}"
+        target = t.imports.get(rest[0])
+        if target is not None and _depth < _MAX_REEXPORT_DEPTH:
+            return self.resolve(".".join([target] + rest[1:]), _depth + 1)
+        return mod
+
+    def _local(self, t: SymbolTable, owner: str, ref: str) -> Optional[str]:
+        head, _, tail = ref.partition(".")
+        if head in ("self", "cls") and "." in owner:
+            cls = owner.split(".")[0]
+            attr = tail.split(".")[0]
+            if attr and f"{cls}.{attr}" in t.defs:
+                return f"{t.module}.{cls}.{attr}"
+            return None
+        if head in t.imports:
+            return self.resolve(".".join(filter(None, (t.imports[head], tail))))
+        if head in t.defs:
+            return self.resolve(f"{t.module}.{ref}")
+        return None
+
+    def edges_of(self, module: str) -> Dict[str, Set[str]]:
+        """Outgoing edges per owner node of ``module`` (module node and its defs)."""
+        t = self.table(module)
+        out: Dict[str, Set[str]] = {module: set()}
+        if t is None:
+            return out
+        for d in t.defs:
+            out[f"{module}.{d}"] = set()
+        for owner, refs in t.refs.items():
+            src = f"{module}.{owner}" if owner else module
+            row = out[src]
+            for ref in refs:
+                dst = self._local(t, owner, ref)
+                if dst is not None and dst != src:
+                    row.add(dst)
+        return out
+
+
+def build_symbol_graph(
+    root: Path,
+    files: List[FileInfo],
+    *,
+    profiler: Optional["StageProfiler"] = None,
+) -> Graph:
+    """Fine-grained graph for Python files; other languages stay module-level."""
+    index = SymbolIndex(root, files, profiler=profiler)
+    nodes: Set[str] = set()
+    edges: Dict[str, Set[str]] = {}
+    lang: Dict[str, str] = {}
+    for mod in index.modules:
+        for src, dsts in index.edges_of(mod).items():
+            edges.setdefault(src, set()).update(dsts)
+            nodes.add(src)
+            nodes.update(dsts)
+            lang[src] = "python"
+
+    for f in files:
+        ex = EXTRACTORS.get(f.path.suffix)
+        if ex is None or ex.lang == "python":
+            continue
+        mod = ex.module_name(f.path)
+        nodes.add(mod)
+        lang.setdefault(mod, ex.lang)
+        deps = _extract(f.path.suffix, f.text) or []
+        edges.setdefault(mod, set()).update(deps)
+        nodes.update(deps)
+
+    for n in nodes:
+        edges.setdefault(n, set())
+    if profiler is not None:
+        profiler.record("symbols").nodes = len(nodes)
+    return Graph(nodes=nodes, edges=edges, lang=lang)
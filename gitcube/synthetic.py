@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+"""Parameterized synthetic repositories for demos and benchmarks.
+
+Modules are numbered m0..m{N-1} and spread over a package tree of the given
+depth. Regular imports only point to lower-numbered modules (a DAG); a
+``cycle_density`` fraction of modules gets one extra import to a
+higher-numbered module, which closes a cycle.
+
+Imports use bare module names (``import m12``) so they map onto gitcube's
+stem-based module nodes regardless of the package layout.
+"""
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+import random
+
+FANOUT_DISTRIBUTIONS = ("fixed", "uniform", "powerlaw")
+
+
+@dataclass
+class SynthConfig:
+    modules: int = 1000
+    package_depth: int = 2
+    packages_per_level: int = 8
+    fanout: str = "powerlaw"  # fixed | uniform | powerlaw
+    mean_fanout: float = 3.0
+    max_fanout: int = 64
+    cycle_density: float = 0.02
+    file_size: int = 512  # approximate bytes per module
+    seed: int = 0
+
+
+def _fanout(rng: random.Random, cfg: SynthConfig) -> int:
+    if cfg.fanout == "fixed":
+        k = int(round(cfg.mean_fanout))
+    elif cfg.fanout == "uniform":
+        k = rng.randint(0, max(0, int(round(2 * cfg.mean_fanout))))
+    elif cfg.fanout == "powerlaw":
+        # Pareto with alpha=2 has mean 2*xm; scale so the mean is ~mean_fanout.
+        k = int(rng.paretovariate(2.0) * cfg.mean_fanout / 2.0)
+    else:
+        raise ValueError(f"unknown fanout distribution: {cfg.fanout!r}")
+    return max(0, min(k, cfg.max_fanout))
+
+
+def _package_dir(i: int, cfg: SynthConfig) -> Path:
+    parts: List[str] = []
+    x = i
+    for level in range(cfg.package_depth):
+        x //= max(1, cfg.packages_per_level)
+        parts.append(f"pkg{level}_{x % max(1, cfg.packages_per_level)}")
+    return Path(*parts) if parts else Path()
+
+
+def _body(i: int, size: int) -> str:
+    # Padding functions so parse cost scales with file_size.
+    chunks: List[str] = []
+    n = 0
+    k = 0
+    while n < size:
+        s = f"\n\ndef f{i}_{k}(x):\n    return x + {k}\n"
+        chunks.append(s)
+        n += len(s)
+        k += 1
+    return "".join(chunks)
+
+
+def generate_repo(out: Path, cfg: SynthConfig) -> Dict[str, Any]:
+    """Write a synthetic repo under ``out`` and return what was generated."""
+    rng = random.Random(cfg.seed)
+    out.mkdir(parents=True, exist_ok=True)
+    n_edges = 0
+    n_back = 0
+    n_bytes = 0
+    made_dirs = set()
+
+    for i in range(cfg.modules):
+        deps = set()
+        if i > 0:
+            for _ in range(_fanout(rng, cfg)):
+                deps.add(rng.randrange(i))
+        if i < cfg.modules - 1 and rng.random() < cfg.cycle_density:
+            deps.add(rng.randrange(i + 1, cfg.modules))
+            n_back += 1
+        n_edges += len(deps)
+
+        head = "".join(f"import m{j}\n" for j in sorted(deps))
+        text = f'"""Synthetic module {i}."""\n' + head
+        text += _body(i, cfg.file_size - len(text))
+
+        d = out / _package_dir(i, cfg)
+        if d not in made_dirs:
+            d.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(d)
+        (d / f"m{i}.py").write_text(text, encoding="utf-8")
+        n_bytes += len(text)
+
+    return {
+        "config": asdict(cfg),
+        "modules": cfg.modules,
+        "edges": n_edges,
+        "back_edges": n_back,
+        "bytes": n_bytes,
+        "packages": len(made_dirs),
+    }
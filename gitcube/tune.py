@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+"""Threshold tuning: replay recorded metric history over a settings grid.
+
+``thresholds_for_metric`` gates each metric at median + k * MAD of the
+rolling baseline (``RepoBaseline``, ``window`` samples). Which window and
+which (warn_k, block_k) suit a repository is an empirical question, so
+``tune_grid`` replays the DNA history (one row per recorded run) as if
+every run had updated the baseline, for every combination at once, and
+reports how often the verdict would have flipped between consecutive runs
+alongside the WARN and BLOCK rates.
+
+The replay is shaped so the grid is nearly free:
+
+- Rolling median and MAD depend only on the window, so they are computed
+  once per window (sorted window maintained with bisect; MAD from the two
+  already-sorted deviation runs) and shared by every (warn_k, block_k).
+- For a fixed window a run's verdict depends only on its largest robust
+  z-score across the gated metrics, (value - median) / MAD, plus the
+  MAD == 0 special case, which does not depend on k.
+- Each threshold turns the z-scores into a one-byte-per-run mask held in
+  a big int; a grid point is then a handful of OR/XOR/shift/popcount
+  operations over all runs at once.
+
+Runs before ``MIN_SAMPLES`` recorded samples fall back to the size
+heuristic in the live gate and are not scored here.
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+GATED = ("entropy_score", "cycle_index", "density")
+MIN_SAMPLES = 8  # thresholds_for_metric switches to the baseline at this many samples
+DEFAULT_WINDOWS = (10, 20, 30, 45, 60, 90)
+DEFAULT_WARN_K = (1.0, 1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0)
+DEFAULT_BLOCK_K = (2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0)
+CURRENT = (30, 1.5, 3.0)  # RepoBaseline / thresholds_for_metric defaults
+_INF = float("inf")
+
+
+def parse_grid(text: str) -> List[float]:
+    """``"1,1.5,2"`` or ``"1:3:0.5"`` (start:stop:step, inclusive)."""
+    text = text.strip()
+    if ":" in text:
+        parts = [float(x) for x in text.split(":")]
+        if len(parts) != 3 or parts[2] <= 0 or parts[1] < parts[0]:
+            raise ValueError(f"bad range {text!r}: expected START:STOP:STEP")
+        start, stop, step = parts
+        n = int(round((stop - start) / step))
+        return [round(start + i * step, 10) for i in range(n + 1)]
+    try:
+        return [float(x) for x in text.split(",") if x.strip()]
+    except ValueError:
+        raise ValueError(f"bad list {text!r}: expected comma-separated numbers") from None
+
+
+def rolling_median_mad(xs: Sequence[float], window: int) -> Tuple[List[float], List[float]]:
+    """Median and MAD of ``xs[max(0, t - window):t]`` for every t >= MIN_SAMPLES.
+
+    Index i of the result is run ``MIN_SAMPLES + i``; matches
+    ``RepoBaseline.stats`` on the samples the live gate would hold.
+    """
+    med: List[float] = []
+    mad: List[float] = []
+    win: List[float] = []
+    for t, x in enumerate(xs):
+        if t >= MIN_SAMPLES:
+            n = len(win)
+            h = n // 2
+            m = win[h] if n % 2 else (win[h - 1] + win[h]) / 2
+            # deviations are two sorted runs; timsort merges them in linear time
+            dev = [m - v for v in win[h - 1 :: -1]] if h else []
+            dev += [v - m for v in win[h:]]
+            dev.sort()
+            med.append(m)
+            mad.append(dev[h] if n % 2 else (dev[h - 1] + dev[h]) / 2)
+        insort(win, x)
+        if len(win) > window:
+            del win[bisect_left(win, xs[t - window])]
+    return med, mad
+
+
+def _scores(series: Dict[str, Sequence[float]], window: int) -> Tuple[List[float], bytes, bytes]:
+    """Per scored run: max z-score over metrics, and MAD == 0 warn/block lanes."""
+    n = max((len(v) for v in series.values()), default=0) - MIN_SAMPLES
+    z = [-_INF] * max(0, n)
+    warn0 = bytearray(max(0, n))
+    block0 = bytearray(max(0, n))
+    for xs in series.values():
+        med, mad = rolling_median_mad(xs, window)
+        for i, (m, d) in enumerate(zip(med, mad)):
+            diff = xs[MIN_SAMPLES + i] - m
+            if d > 0.0:
+                s = diff / d
+                if s > z[i]:
+                    z[i] = s
+            elif diff >= 2e-6:  # mirrors the flat-baseline thresholds (med + 1e-6 / 2e-6)
+                block0[i] = 1
+            elif diff >= 1e-6:
+                warn0[i] = 1
+    return z, bytes(warn0), bytes(block0)
+
+
+def _lanes(z: List[float], k: float) -> int:
+    return int.from_bytes(bytes(s >= k for s in z), "little")
+
+
+def tune_grid(
+    series: Dict[str, Sequence[float]],
+    *,
+    windows: Iterable[int] = DEFAULT_WINDOWS,
+    warn_ks: Iterable[float] = DEFAULT_WARN_K,
+    block_ks: Iterable[float] = DEFAULT_BLOCK_K,
+) -> List[Dict[str, Any]]:
+    """Replay ``series`` (metric -> values, oldest first) for every setting with block_k >= warn_k."""
+    warn_ks = sorted(set(warn_ks))
+    block_ks = sorted(set(block_ks))
+    out: List[Dict[str, Any]] = []
+    for w in sorted(set(int(x) for x in windows)):
+        if w < MIN_SAMPLES:
+            raise ValueError(f"window {w} is below the {MIN_SAMPLES} samples the baseline needs")
+        z, warn0, block0 = _scores(series, w)
+        n = len(z)
+        if n == 0:
+            continue
+        f1 = int.from_bytes(warn0, "little") | int.from_bytes(block0, "little")
+        f2 = int.from_bytes(block0, "little")
+        pairs = (1 << (8 * (n - 1))) - 1  # lane i compares run i with run i + 1
+        warn_masks = {k: _lanes(z, k) | f1 for k in warn_ks}
+        block_masks = {k: _lanes(z, k) | f2 for k in block_ks}
+        for wk in warn_ks:
+            for bk in block_ks:
+                if bk < wk:
+                    continue
+                l2 = block_masks[bk]
+                l1 = warn_masks[wk] | l2
+                flips = (((l1 ^ (l1 >> 8)) | (l2 ^ (l2 >> 8))) & pairs).bit_count()
+                blocks = l2.bit_count()
+                warns = l1.bit_count() - blocks
+                out.append(
+                    {
+                        "window": w,
+                        "warn_k": wk,
+                        "block_k": bk,
+                        "runs": n,
+                        "flips": flips,
+                        "flip_rate": flips / max(1, n - 1),
+                        "warn_rate": warns / n,
+                        "block_rate": blocks / n,
+                    }
+                )
+    out.sort(key=lambda r: (r["flip_rate"], r["block_rate"], r["warn_rate"], r["window"], r["warn_k"], r["block_k"]))
+    return out
+
+
+def tune_history(
+    series: Dict[str, Sequence[float]],
+    *,
+    windows: Iterable[int] = DEFAULT_WINDOWS,
+    warn_ks: Iterable[float] = DEFAULT_WARN_K,
+    block_ks: Iterable[float] = DEFAULT_BLOCK_K,
+    current: Optional[Tuple[int, float, float]] = CURRENT,
+) -> Dict[str, Any]:
+    """``tune_grid`` plus the row for the ``current`` setting (always evaluated)."""
+    windows, warn_ks, block_ks = list(windows), list(warn_ks), list(block_ks)
+    if current is not None:
+        windows.append(current[0])
+        warn_ks.append(current[1])
+        block_ks.append(current[2])
+    rows = tune_grid(series, windows=windows, warn_ks=warn_ks, block_ks=block_ks)
+    cur = None
+    if current is not None:
+        cur = next((r for r in rows if (r["window"], r["warn_k"], r["block_k"]) == current), None)
+    return {
+        "runs": max((len(v) for v in series.values()), default=0),
+        "metrics": sorted(series),
+        "settings": len(rows),
+        "current": cur,
+        "grid": rows,
+    }
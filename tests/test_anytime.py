@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.anytime import estimate_metrics, parse_duration, sample_graph
+from gitcube.synthetic import SynthConfig, generate_repo
+
+
+def test_parse_duration():
+    assert parse_duration("30s") == 30.0
+    assert parse_duration("2m") == 120.0
+    assert parse_duration("500ms") == 0.5
+    assert parse_duration("1.5") == 1.5
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_generous_budget_is_exact(tmp_path: Path):
+    repo = tmp_path / "repo"
+    generate_repo(repo, SynthConfig(modules=200, cycle_density=0.05, seed=1))
+    plain = analyze_repo_dict(repo, disable_baseline=True)
+    timed = analyze_repo_dict(repo, disable_baseline=True, options=AnalysisOptions(time_budget_s=600))
+    assert timed["metrics"] == plain["metrics"]
+    assert timed["sampling"]["complete"]
+    assert {e["mode"] for e in timed["estimates"].values()} == {"exact"}
+
+
+def test_sampled_estimates_bracket_truth(tmp_path: Path):
+    repo = tmp_path / "repo"
+    generate_repo(repo, SynthConfig(modules=600, cycle_density=0.1, seed=2))
+    truth = analyze_repo_dict(repo, disable_baseline=True)["metrics"]
+
+    import time
+
+    s = sample_graph(repo, deadline=time.perf_counter() - 1)
+    assert not s.sampled and not s.complete
+    _, est = estimate_metrics(s)
+    assert est["cycle_index"].low <= truth["cycle_index"] <= est["cycle_index"].high
+
+    s = sample_graph(repo, deadline=float("inf"), max_seeds=40)
+    assert len(s.sampled) == 40 and not s.complete
+    metrics, est = estimate_metrics(s)
+    for k in ("density", "cycle_index"):
+        e = est[k]
+        assert not e.exact
+        assert e.low <= getattr(metrics, k) <= e.high
+        assert e.low <= truth[k] <= e.high
+
+
+def test_gate_uses_upper_bound_and_skips_baseline(tmp_path: Path):
+    from gitcube.analyze import _action_with_dynamic_thresholds
+    from gitcube.anytime import Estimate
+    from gitcube.metrics import Metrics
+
+    m = Metrics(entropy_score=0.0, cycle_index=0.0, churn_accel=0.0, density=0.0, n_nodes=100, n_edges=10)
+    est = {
+        "entropy_score": Estimate(0.0, 0.0, 0.9, exact=False),
+        "cycle_index": Estimate(0.0, 0.0, 0.9, exact=False),
+        "density": Estimate(0.0, 0.0, 0.0, exact=False),
+    }
+    bp = tmp_path / "baseline.json"
+    out = _action_with_dynamic_thresholds(
+        metrics=m, repo_root=tmp_path, baseline_path=bp, update_baseline=True, disable_baseline=False, estimates=est
+    )
+    assert out["action"]["recommendation"] == "BLOCK"
+    assert not bp.exists()
+
+
+@pytest.mark.parametrize("degrees", [[], [3]])
+def test_density_interval_is_uninformative_below_two_seeds(degrees):
+    from gitcube.anytime import SampleResult, _density_estimate
+    from gitcube.graph import Graph
+
+    s = SampleResult(
+        graph=Graph(nodes=set(), edges={}), files=[], modules_total=50, modules_parsed=5, out_degree=degrees
+    )
+    est = _density_estimate(s, 60, m_seen=4)
+    assert est.low == 4 / (60 * 59) and est.high == 1.0
+    assert est.low <= est.value < est.high
+
+    s.out_degree = [3, 5]  # two seeds: a real (finite-width) interval
+    est = _density_estimate(s, 60, m_seen=4)
+    assert est.low < est.value < est.high < 1.0
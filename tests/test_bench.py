@@ -0,0 +1,25 @@
+from pathlib import Path
+from gitcube.bench import check_budget, run_benchmarks
+from gitcube.synthetic import SynthConfig, generate_repo
+
+
+def test_generator_respects_config(tmp_path: Path):
+    cfg = SynthConfig(modules=200, package_depth=3, fanout="fixed", mean_fanout=2, cycle_density=0.0, file_size=300)
+    stats = generate_repo(tmp_path, cfg)
+    files = list(tmp_path.rglob("*.py"))
+    assert len(files) == 200
+    assert all(len(f.relative_to(tmp_path).parts) == 4 for f in files)
+    assert stats["back_edges"] == 0
+    assert min(f.stat().st_size for f in files) >= 250
+
+
+def test_budget_check_flags_regressions(tmp_path: Path):
+    results = run_benchmarks([100], workdir=tmp_path, base=SynthConfig(cycle_density=0.2))
+    run = results["runs"][0]
+    assert run["n_nodes"] == 100 and "parse" in run["stages"]
+
+    fake = {"runs": [{"modules": 100, "total_s": 1.4, "stages": {"parse": 0.9, "walk": 0.001}}]}
+    budget = {"margin": 0.5, "budgets": {"100": {"total_s": 1.0, "stages": {"parse": 0.5, "walk": 0.0001}}}}
+    failures = check_budget(fake, budget)
+    assert len(failures) == 1 and "parse" in failures[0]
+    assert len(check_budget(fake, budget, margin=0.2)) == 2
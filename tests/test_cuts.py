@@ -0,0 +1,52 @@
+import random
+from pathlib import Path
+
+from gitcube.analyze import analyze_repo_dict
+from gitcube.cuts import feedback_arcs, suggest_cuts
+from gitcube.graph import Graph
+from gitcube.metrics import compute_metrics
+
+
+def test_feedback_arcs_break_every_cycle():
+    rng = random.Random(7)
+    for _ in range(20):
+        n = rng.randrange(2, 40)
+        edges = {str(i): {str(rng.randrange(n)) for _ in range(rng.randrange(1, 5))} for i in range(n)}
+        g = Graph(nodes=set(edges), edges=edges)
+        m = compute_metrics(g, [])
+        if m.cycle_index == 0:
+            continue
+        out = suggest_cuts(g, m)
+        cut = {(c["from"], c["to"]) for grp in out["groups"] for c in grp["cuts"]}
+        rest = {a: {b for b in bs if (a, b) not in cut} for a, bs in edges.items()}
+        assert compute_metrics(Graph(nodes=set(edges), edges=rest), []).cycle_index == 0
+        assert out["projected"]["cycle_index"] == 0
+        assert out["projected"]["n_edges"] == m.n_edges - len(cut)
+
+
+def test_two_cycle_needs_one_cut():
+    adj = [[1], [0, 2], [0]]
+    assert len(feedback_arcs(adj, [0, 1, 2])) == 1
+
+
+def test_groups_ranked_by_modules_freed_per_cut(tmp_path: Path):
+    # 3-cycle x->y->z->x (one cut frees 3) and a dense 2-node knot plus a self-import
+    files = {
+        "x.py": "import y\n",
+        "y.py": "import z\n",
+        "z.py": "import x\n",
+        "p.py": "import q\n",
+        "q.py": "import p\n",
+        "s.py": "import s\n",
+        "ok.py": "import x\n",
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    report = analyze_repo_dict(tmp_path, disable_baseline=True)
+    cuts = report["cuts"]
+    assert [g["modules"] for g in cuts["groups"]] == [3, 2, 1]
+    assert cuts["imports"] == 3
+    n = report["metrics"]["n_nodes"]
+    assert [g["after"]["cycle_index"] for g in cuts["groups"]] == [3 / n, 1 / n, 0.0]
+    assert cuts["groups"][2]["cuts"] == [{"from": "s", "to": "s", "at": "s.py:1"}]
+    assert cuts["projected"]["entropy_score"] < report["metrics"]["entropy_score"]
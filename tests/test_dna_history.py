@@ -0,0 +1,90 @@
+from pathlib import Path
+from gitcube.dna_history import DNAHistory, pack_levels, signature_from_levels, unpack_levels
+
+DAY = 86400
+
+
+def _dna(**levels):
+    return {"symbols": {s: {"level": l, "value": 0.1 * l} for s, l in levels.items()}}
+
+
+def test_pack_roundtrip():
+    v = pack_levels(_dna(G=2, P=1, C=2, K=3)["symbols"])
+    assert unpack_levels(v) == {"G": 2, "P": 1, "C": 2, "D": 0, "S": 0, "R": 0, "K": 3, "L": 0}
+    assert signature_from_levels(v) == "G2 P1 C2 D0 S0 R0 K3"
+
+
+def test_history_queries(tmp_path: Path):
+    h = DNAHistory(tmp_path / "dna")
+    h.append(dna=_dna(C=1), branch="main", commit="aa" * 20, ts=0 * DAY)
+    h.append(dna=_dna(C=2), branch="feature", commit="bb" * 20, ts=1 * DAY)
+    h.append(dna=_dna(C=2, P=1), branch="main", commit="cc" * 20, ts=2 * DAY)
+    h.append(dna=_dna(P=1), branch="main", commit="dd" * 20, ts=3 * DAY)
+    h.append(dna=_dna(P=0), branch="main", commit="ee" * 20, ts=3 * DAY + 10)
+    assert len(h) == 5
+
+    first = h.first(symbol="C", level=2, branch="main")
+    assert first.commit == "cc" * 20 and first.ts == 2 * DAY
+    assert h.first(symbol="C", level=2).branch == "feature"
+    assert h.first(symbol="C", level=2, branch="nope") is None
+
+    # day 3's last run dropped back to P0
+    assert h.days_at_level(symbol="P", level=1, branch="main") == 1
+    assert h.days_at_level(symbol="P", level=1, branch="main", since=3 * DAY) == 0
+    assert h.find_commit("dddd") == [3]
+    assert abs(h.row(1).values["cycle_index"] - 0.2) < 1e-6
+
+
+def test_torn_append_is_dropped(tmp_path: Path):
+    h = DNAHistory(tmp_path)
+    h.append(dna=_dna(C=1), ts=1)
+    with open(tmp_path / "ts.i64", "ab") as f:
+        f.write(b"\x01\x02\x03")
+    assert len(DNAHistory(tmp_path)) == 1
+    h.append(dna=_dna(C=2), ts=2)
+    assert [r.ts for r in DNAHistory(tmp_path).last(10)] == [1, 2]
+
+
+def _naive_days(runs, symbol, level, exact, branch, since, until):
+    last = {}
+    for ts, lv, br, _ in runs:
+        if (branch is None or br == branch) and (since is None or ts >= since) and (until is None or ts <= until):
+            if ts // DAY not in last or ts >= last[ts // DAY][0]:
+                last[ts // DAY] = (ts, lv[symbol])
+    return sum(1 for _, l in last.values() if (l == level if exact else l >= level))
+
+
+def test_vectorized_queries_match_row_scan(tmp_path: Path):
+    import random
+
+    r = random.Random(11)
+    runs = []
+    t = 0
+    for _ in range(400):
+        t += r.choice([0, 60, 3600, 5 * 3600, DAY])
+        runs.append((t, {"C": r.randrange(3), "P": r.randrange(2)}, r.choice(["main", "dev"]), r.random()))
+    shuffled = runs[:]
+    r.shuffle(shuffled)
+    for name, order in (("sorted", runs), ("unsorted", shuffled)):
+        h = DNAHistory(tmp_path / name)
+        for ts, lv, br, x in order:
+            dna = _dna(**lv)
+            dna["symbols"]["P"]["value"] = x
+            h.append(dna=dna, branch=br, ts=ts)
+        for branch in (None, "main"):
+            for since, until in ((None, None), (3 * DAY, None), (DAY, 20 * DAY)):
+                for exact in (True, False):
+                    got = h.days_at_level(symbol="C", level=1, exact=exact, branch=branch, since=since, until=until)
+                    assert got == _naive_days(order, "C", 1, exact, branch, since, until), (name, branch, since)
+                want = sorted(
+                    ((ts, x) for ts, _, br, x in order if branch is None or br == branch),
+                    key=lambda p: p[0],  # stable: ties stay in storage order
+                )
+                want = [p for p in want if (since is None or p[0] >= since) and (until is None or p[0] <= until)]
+                got = h.series(["entropy_score"], branch=branch, since=since, until=until)["entropy_score"]
+                assert len(got) == len(want) and all(abs(a - b) < 1e-6 for a, (_, b) in zip(got, want))
+            assert [r.ts for r in h.last(7, branch=branch)] == [
+                ts for ts, _, br, _ in order if branch is None or br == branch
+            ][-7:]
+        assert h.last(3, branch="nope") == []
+        assert h.series(["density"], branch="nope") == {"density": []}
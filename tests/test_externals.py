@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.externals import ExternalFilter, ImportIndex, load_import_index
+
+
+def _repo(root: Path) -> Path:
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "a.py").write_text("import os, json\nimport numpy_like, b\nfrom pkg import b\n", encoding="utf-8")
+    (root / "pkg" / "b.py").write_text("import a\nimport typing\n", encoding="utf-8")
+    return root
+
+
+def test_classify():
+    index = ImportIndex(stdlib=frozenset({"os"}), third_party={"numpy": "numpy"}, internal={"a"})
+    assert [index.classify(n) for n in ("a", "os", "numpy", "nope", "js:react")] == [
+        "internal", "stdlib", "third_party", "unknown", "unknown"
+    ]
+
+
+def test_externals_modes(tmp_path: Path):
+    repo = _repo(tmp_path / "repo")
+    run = lambda mode: analyze_repo_dict(repo, disable_baseline=True, options=AnalysisOptions(externals=mode))
+
+    keep, collapse, exclude = run("keep"), run("collapse"), run("exclude")
+    assert keep["graph"]["nodes"] == 7  # a b pkg os json typing numpy_like
+    assert collapse["graph"]["nodes"] == 5  # a b pkg <stdlib> <unknown>
+    assert exclude["graph"]["nodes"] == 3
+    assert keep["graph"]["externals"] == {"mode": "keep", "stdlib": 3, "third_party": 0, "unknown": 1}
+    assert exclude["metrics"]["cycle_index"] == 2 / 3
+    assert exclude["metrics"]["density"] > keep["metrics"]["density"]
+
+    ext = analyze_repo_dict(
+        repo, disable_baseline=True, options=AnalysisOptions(external=True, store_path=tmp_path / "g.sqlite")
+    )
+    assert ext["metrics"] == exclude["metrics"]
+
+
+def test_index_cache_roundtrip(tmp_path: Path):
+    cache = tmp_path / "import_index.json"
+    first = load_import_index(cache)
+    assert cache.exists() and "os" in first.stdlib
+    again = load_import_index(cache)
+    assert again.stdlib == first.stdlib and again.third_party == first.third_party
+    assert ExternalFilter(again, "exclude")("sys") is None
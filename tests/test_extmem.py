@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.synthetic import SynthConfig, generate_repo
+
+
+def _analyze(repo: Path, **opts):
+    report = analyze_repo_dict(repo, disable_baseline=True, options=AnalysisOptions(**opts))
+    return report
+
+
+@pytest.mark.parametrize("fits", [True, False])  # CSR in RAM, or row-at-a-time from SQLite
+def test_external_mode_matches_in_memory(tmp_path: Path, monkeypatch, fits: bool):
+    from gitcube.extmem import ExternalGraph
+
+    repo = tmp_path / "repo"
+    generate_repo(repo, SynthConfig(modules=300, cycle_density=0.05, seed=3))
+    (repo / "self.py").write_text("import self\nimport os\n", encoding="utf-8")
+
+    mem = _analyze(repo)
+    monkeypatch.setattr(ExternalGraph, "csr_fits", lambda self: fits)
+    ext = _analyze(repo, external=True, store_path=tmp_path / "g.sqlite")
+    assert ext["external"]["adjacency"] == ("csr" if fits else "sqlite")
+    assert ext["metrics"] == mem["metrics"]
+    assert ext["graph"] == mem["graph"]
+    assert ext["file_count"] == mem["file_count"]
+    assert ext["octave_distribution"] == mem["octave_distribution"]
+    assert ext["action"] == mem["action"]
+    assert ext["external"]["max_out_degree"] >= 1
+
+
+def test_sqlite_rows_match_csr(tmp_path: Path):
+    from gitcube.extmem import CSRAdjacency, ExternalGraph, SQLiteAdjacency, build_external_graph
+    from gitcube.ingest import iter_files
+
+    repo = tmp_path / "repo"
+    generate_repo(repo, SynthConfig(modules=200, seed=5))
+    store = build_external_graph(iter_files(repo), ExternalGraph(tmp_path / "g.sqlite"))
+    csr = CSRAdjacency.from_store(store)
+    rows = SQLiteAdjacency(store, cache_rows=8)
+    assert len(csr) == len(rows) == store.n_nodes
+    assert all(list(csr[u]) == list(rows[u]) for u in range(store.n_nodes))
+    assert len(rows.cache) == 8
@@ -0,0 +1,38 @@
+from pathlib import Path
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.graph import build_import_graph
+from gitcube.ingest import ingest_files
+
+
+def _mixed_repo(root: Path) -> None:
+    (root/"svc.py").write_text("import util\n", encoding="utf-8")
+    (root/"util.py").write_text("import os\n", encoding="utf-8")
+    web = root/"web"
+    web.mkdir()
+    (web/"app.ts").write_text("import { api } from './api';\nimport React from 'react';\n", encoding="utf-8")
+    (web/"api.ts").write_text("const h = require('./app');\nexport * from '@acme/http/client';\n", encoding="utf-8")
+    (root/"node_modules").mkdir()
+    (root/"node_modules"/"react.js").write_text("import x from './y';\n", encoding="utf-8")
+    gosvc = root/"gosvc"
+    gosvc.mkdir()
+    (gosvc/"main.go").write_text('package main\n\nimport (\n\t"fmt"\n\tdb "example.com/x/store"\n)\n', encoding="utf-8")
+
+
+def test_mixed_language_graph(tmp_path: Path):
+    _mixed_repo(tmp_path)
+    files = ingest_files(tmp_path)
+    assert sorted(f.path.name for f in files) == ["api.ts", "app.ts", "main.go", "svc.py", "util.py"]
+
+    g = build_import_graph(files)
+    assert g.edges["svc"] == {"util"}
+    assert g.edges["js:app"] == {"js:api", "js:react"}
+    assert g.edges["js:api"] == {"js:app", "js:@acme/http"}
+    assert g.edges["go:gosvc"] == {"go:fmt", "go:store"}
+    assert g.lang == {"svc": "python", "util": "python", "js:app": "typescript", "js:api": "typescript", "go:gosvc": "go"}
+
+    par = build_import_graph(files, jobs=2)
+    assert par.edges == g.edges and par.lang == g.lang
+
+    r = analyze_repo_dict(tmp_path, disable_baseline=True, options=AnalysisOptions(jobs=2))
+    assert r["graph"]["languages"] == {"go": 1, "python": 2, "typescript": 2}
+    assert r["metrics"]["cycle_index"] > 0  # app <-> api
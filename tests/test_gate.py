@@ -0,0 +1,103 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from gitcube.cli import main
+from gitcube.gate import EXIT_BLOCK, EXIT_MISSING, EXIT_OK, load_verdict, store_verdict
+
+
+def test_cli_import_is_lazy():
+    code = "import sys, gitcube.cli; print(any(m in sys.modules for m in ('gitcube.analyze', 'argparse', 'json')))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_gate_exit_codes_from_cache(tmp_path: Path, capsys):
+    tree = "ab" * 20
+    assert main(["gate", str(tmp_path), "--tree", tree]) == EXIT_MISSING
+
+    store_verdict(str(tmp_path), tree, {"action": {"recommendation": "BLOCK"}, "dna": {"signature": "G2 C2"}})
+    assert load_verdict(str(tmp_path), tree) == ("BLOCK", "G2 C2", "")
+    assert main(["gate", str(tmp_path), "--tree", tree]) == EXIT_BLOCK
+    assert "recommendation=BLOCK" in capsys.readouterr().out
+
+    store_verdict(str(tmp_path), tree, {"action": {"recommendation": "WARN"}})
+    assert main(["gate", str(tmp_path), "--tree", tree, "-q"]) == EXIT_OK
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_analyze_caches_verdict_by_tree_hash(tmp_path: Path, capsys):
+    (tmp_path/"a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path/"b.py").write_text("import a\n", encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+
+    assert main(["gate", str(tmp_path)]) == EXIT_MISSING
+    main(["analyze", str(tmp_path), "--json", "--no-baseline"])
+    rec = __import__("json").loads(capsys.readouterr().out)["action"]["recommendation"]
+    expected = EXIT_BLOCK if rec == "BLOCK" else EXIT_OK
+    assert main(["gate", str(tmp_path)]) == expected
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_dirty_tree_verdict_is_not_served_for_head(tmp_path: Path, capsys):
+    from gitcube.gate import tree_hash, worktree_hash
+
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    head = tree_hash(str(tmp_path))
+    assert worktree_hash(str(tmp_path)) == head
+
+    # uncommitted cycle: the verdict belongs to the dirty tree only
+    (tmp_path / "a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("import a\n", encoding="utf-8")
+    dirty = worktree_hash(str(tmp_path))
+    assert dirty not in (None, head)
+    main(["analyze", str(tmp_path), "--json", "--no-baseline", "--no-snapshot"])
+    capsys.readouterr()
+    assert worktree_hash(str(tmp_path)) == dirty  # .gitcube/ state does not count
+    assert load_verdict(str(tmp_path), dirty) is not None
+    assert load_verdict(str(tmp_path), head) is None
+    assert subprocess.run(git + ["status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+
+    # --analyze-missing must not store the working tree's verdict under HEAD
+    assert main(["gate", str(tmp_path), "--analyze-missing"]) == EXIT_MISSING
+    assert load_verdict(str(tmp_path), head) is None
+    assert "working tree differs" in capsys.readouterr().err
+
+    subprocess.run(git + ["checkout", "-q", "--", "a.py"], check=True)
+    (tmp_path / "b.py").unlink()
+    main(["gate", str(tmp_path), "--analyze-missing"])
+    assert load_verdict(str(tmp_path), head) is not None
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_untracked_non_sources_keep_head_key_and_only_canonical_runs_cache(tmp_path: Path, capsys):
+    from gitcube.gate import tree_hash
+
+    (tmp_path / "a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("import a\n", encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    head = tree_hash(str(tmp_path))
+    (tmp_path / "report.json").write_text("{}\n", encoding="utf-8")  # e.g. the CI step's redirect
+
+    for opts in (["--granularity", "symbol"], ["--externals", "keep"], ["--time-budget", "10s"], ["--map-reduce"]):
+        main(["analyze", str(tmp_path), "--json", "--no-baseline", *opts])
+        assert load_verdict(str(tmp_path), head) is None, opts
+    capsys.readouterr()
+
+    main(["analyze", str(tmp_path), "--json", "--no-baseline"])
+    capsys.readouterr()
+    assert load_verdict(str(tmp_path), head) is not None
+    assert main(["gate", str(tmp_path), "-q"]) in (EXIT_OK, EXIT_BLOCK)
@@ -0,0 +1,85 @@
+import ast
+from pathlib import Path
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.importtime import _closures, classify_imports
+
+
+def test_classify_imports():
+    src = """
+from typing import TYPE_CHECKING
+import eager
+if TYPE_CHECKING:
+    import typed
+    import both
+else:
+    import fallback
+try:
+    import guarded
+except ImportError:
+    pass
+class C:
+    import in_class
+def f():
+    import lazy
+    import both
+"""
+    kinds = classify_imports(ast.parse(src))
+    assert kinds["eager"] == kinds["fallback"] == kinds["guarded"] == kinds["in_class"] == "top_level"
+    assert kinds["typed"] == "type_checking"
+    assert kinds["lazy"] == kinds["both"] == "function"
+
+
+def test_closures_over_condensation():
+    # 0 -> 1 <-> 2 -> 3, 4 isolated
+    adj = [[1], [2], [1, 3], [], []]
+    got = _closures(adj, [1, 10, 100, 1000, 5])
+    assert got == {0: (4, 1111), 1: (3, 1110), 2: (3, 1110), 3: (1, 1000), 4: (1, 5)}
+    assert _closures(adj, [1, 10, 100, 1000, 5], {2}) == {1: (3, 1110), 2: (3, 1110)}
+
+
+def _write(root: Path, rel: str, text: str) -> None:
+    (root / rel).write_text(text, encoding="utf-8")
+
+
+def test_report_and_gate(tmp_path: Path):
+    _write(tmp_path, "app.py", "import core\n\ndef main():\n    import heavy\n")
+    _write(tmp_path, "cli.py", "import heavy\nfrom typing import TYPE_CHECKING\nif TYPE_CHECKING:\n    import app\n")
+    _write(tmp_path, "core.py", "import os\n")
+    _write(tmp_path, "heavy.py", "import core\n" + "x = 1\n" * 200)
+    opts = AnalysisOptions(import_time=True)
+    report = analyze_repo_dict(tmp_path, disable_baseline=True, options=opts)
+    it = report["import_time"]
+    assert it["imports"] == {"top_level": 3, "function": 1, "type_checking": 1}
+    worst = {r["module"]: r for r in it["worst"]}
+    assert list(worst) == ["cli", "app"]
+    assert worst["cli"]["eager_modules"] == 3 and worst["cli"]["type_checking_imports"] == 1
+    assert worst["app"]["eager_modules"] == 2 and worst["app"]["deferred_modules"] == 1
+    assert it["worst_share"] == worst["cli"]["eager_share"] > 0.9
+    assert "import_closure" not in report["thresholds"]
+
+    bp = tmp_path / "baseline.json"
+    gate = AnalysisOptions(import_time_gate=True)
+    for _ in range(8):
+        analyze_repo_dict(tmp_path, baseline_path=bp, update_baseline=True, options=gate)
+    _write(tmp_path, "cli.py", "import core\n")  # the heavy module is no longer eager
+    report = analyze_repo_dict(tmp_path, baseline_path=bp, options=gate)
+    th = report["thresholds"]["import_closure"]
+    assert th["method"] == "baseline" and report["import_time"]["worst_share"] < th["warn"]
+    _write(tmp_path, "core.py", "import heavy\n" + "y = 2\n" * 50)
+    report = analyze_repo_dict(tmp_path, baseline_path=bp, options=gate)
+    assert report["import_time"]["worst_share"] >= report["thresholds"]["import_closure"]["block"]
+    assert report["action"]["recommendation"] == "BLOCK"
+
+
+def test_weights_are_source_bytes(tmp_path: Path):
+    from gitcube.importtime import build_import_time_graph
+    from gitcube.ingest import FileInfo, ingest_files
+
+    _write(tmp_path, "app.py", "import core\nNAME = 'résumé – naïve'\n")
+    (tmp_path / "core.py").write_bytes(b"# \xff\xfe stray bytes\nx = 1\n")
+    g = build_import_time_graph(ingest_files(tmp_path))
+    assert g.weights == {"app": (tmp_path / "app.py").stat().st_size, "core": (tmp_path / "core.py").stat().st_size}
+    report = analyze_repo_dict(tmp_path, disable_baseline=True, options=AnalysisOptions(import_time=True))
+    assert report["import_time"]["total_bytes"] == sum(g.weights.values())
+    assert build_import_time_graph([FileInfo(tmp_path / "app.py", "é")]).weights == {"app": 2}
@@ -0,0 +1,139 @@
+from pathlib import Path
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.graph import build_import_graph
+from gitcube.ingest import content_digest, duplicate_clusters, ingest_files
+
+
+VENDORED = "import json\nimport requests\n\ndef get(url):\n    return requests.get(url)\n"
+
+
+def _repo(root: Path) -> None:
+    for svc in ("billing", "orders", "search"):
+        (root / svc / "vendor").mkdir(parents=True)
+        (root / svc / "__init__.py").write_text("", encoding="utf-8")
+        (root / svc / "vendor" / "http.py").write_text(VENDORED, encoding="utf-8")
+        (root / svc / "app.py").write_text(f"import http\nNAME = {svc!r}\n", encoding="utf-8")
+    (root / "broken.py").write_text("def (:\n", encoding="utf-8")
+    (root / "broken2.py").write_text("def (:\n", encoding="utf-8")
+
+
+def test_duplicate_clusters(tmp_path: Path):
+    _repo(tmp_path)
+    files = ingest_files(tmp_path)
+    assert all(f.digest == content_digest(f.text.encode("utf-8")) for f in files)
+    d = duplicate_clusters(files, tmp_path)
+    assert d["clusters"] == 3  # vendored http.py, empty __init__.py, broken.py
+    assert d["parses_saved"] == 2 + 2 + 1
+    assert d["bytes_saved"] == 2 * len(VENDORED) + len("def (:\n")
+    assert d["top"][0] == {
+        "copies": 3,
+        "bytes": len(VENDORED),
+        "paths": ["billing/vendor/http.py", "orders/vendor/http.py", "search/vendor/http.py"],
+    }
+
+
+def test_duplicate_bytes_count_undecodable_content(tmp_path: Path):
+    blob = b"# \xff\xfe latin-1 leftovers \xe9\n" + VENDORED.encode("utf-8")
+    for name in ("a.py", "b.py"):
+        (tmp_path / name).write_bytes(blob)
+    files = ingest_files(tmp_path)
+    assert [f.size for f in files] == [len(blob)] * 2
+    d = duplicate_clusters(files, tmp_path)
+    assert d["bytes_saved"] == d["top"][0]["bytes"] == len(blob)
+
+
+def test_duplicates_are_parsed_once(tmp_path: Path):
+    from gitcube.profile import StageProfiler
+
+    _repo(tmp_path)
+    files = ingest_files(tmp_path)
+    prof = StageProfiler()
+    deduped = build_import_graph(files, profiler=prof)
+    assert prof.record("parse").files == len(files) - 5
+    for f in files:
+        f.digest = b""
+    assert build_import_graph(files) == deduped
+    assert build_import_graph(ingest_files(tmp_path), jobs=2) == deduped
+
+    report = analyze_repo_dict(tmp_path, disable_baseline=True, options=AnalysisOptions(import_time=True))
+    assert report["duplicates"]["parses_saved"] == 5
+
+
+def test_read_ahead_keeps_order_and_memory_cap(tmp_path: Path):
+    import threading
+    import time
+
+    from gitcube.bench import SlowOpener
+    from gitcube.ingest import ReadAhead, _walk, read_ahead
+
+    for i in range(40):
+        (tmp_path / f"m{i:02d}.py").write_bytes(b"x" * 1000 + bytes([65 + i % 26]))
+    (tmp_path / "gone.py").write_text("", encoding="utf-8")
+    paths = _walk(tmp_path)
+    (tmp_path / "gone.py").unlink()
+
+    lock = threading.Lock()
+    state = {"read": 0, "consumed": 0, "peak": 0}
+    slow = SlowOpener(0.002)
+
+    class Counting:
+        def __call__(self, p):
+            f = slow(p)
+            read = f.read
+
+            def counted(n=-1):
+                data = read(n)
+                with lock:
+                    state["read"] += len(data)
+                    state["peak"] = max(state["peak"], state["read"] - state["consumed"])
+                return data
+
+            f.read = counted
+            return f
+
+    cfg = ReadAhead(threads=8, depth=16, max_bytes=3 * 1001, opener=Counting())
+    got = []
+    for p, data in read_ahead(paths, cfg):
+        if data is not None:
+            with lock:
+                state["consumed"] += len(data)
+            time.sleep(0.001)  # slow consumer: readers must wait on the cap
+        got.append((p, data))
+    assert [p for p, _ in got] == paths
+    assert got[0][1] is None and all(d == p.read_bytes() for p, d in got[1:])
+    assert 0 < state["peak"] <= 3 * 1001
+
+    serial = ingest_files(tmp_path, read=ReadAhead(threads=1, depth=1))
+    assert ingest_files(tmp_path, read=ReadAhead(threads=4)) == serial
+
+    it = read_ahead(paths, ReadAhead(threads=4, depth=8, max_bytes=1, opener=slow))
+    next(it)
+    it.close()  # abandoning the generator must not leave readers blocked
+
+
+def test_read_ahead_caps_openers_without_fileno(tmp_path: Path, monkeypatch):
+    import io
+    import time
+
+    import gitcube.ingest as ingest
+    from gitcube.ingest import ReadAhead, _walk, read_ahead
+
+    for i in range(30):
+        (tmp_path / f"m{i:02d}.py").write_bytes(b"y" * 1000)
+    peak = [0]
+
+    class Recording(ingest._ByteBudget):
+        def acquire(self, ticket, n):
+            granted = super().acquire(ticket, n)
+            peak[0] = max(peak[0], self.used)
+            return granted
+
+    monkeypatch.setattr(ingest, "_ByteBudget", Recording)
+    cfg = ReadAhead(threads=6, depth=16, max_bytes=3 * 1000, opener=lambda p: io.BytesIO(p.read_bytes()))
+    got = []
+    for p, data in read_ahead(_walk(tmp_path), cfg):
+        time.sleep(0.001)
+        got.append(data)
+    assert all(d == b"y" * 1000 for d in got) and len(got) == 30
+    assert 1000 <= peak[0] <= 3 * 1000
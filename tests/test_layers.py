@@ -0,0 +1,32 @@
+from gitcube.graph import Graph, index_graph
+from gitcube.layers import compute_octave_distribution, layer_depths
+from gitcube.metrics import _dfs_cycles
+
+
+def _graph(edges):
+    nodes = set(edges) | {d for v in edges.values() for d in v}
+    return Graph(nodes=nodes, edges={n: set(edges.get(n, ())) for n in nodes})
+
+
+def test_layers_follow_topological_depth():
+    # app -> svc -> {a <-> b} -> util
+    g = _graph({"app": {"svc"}, "svc": {"a"}, "a": {"b"}, "b": {"a", "util"}})
+    names, adj = index_graph(g)
+    depth = dict(zip(names, layer_depths(adj)))
+    assert depth["util"] == 0
+    assert depth["a"] == depth["b"] == 1
+    assert depth["svc"] == 2
+    assert depth["app"] == 3
+    assert _dfs_cycles(g) == {"a", "b"}
+
+    octaves = compute_octave_distribution(g)
+    assert [o["modules"] for o in octaves] == [1, 3, 1]
+    assert [o["fill"] for o in octaves] == [1, 4, 1]
+
+
+def test_layers_scale_to_long_chains():
+    n = 200_000
+    g = _graph({f"m{i}": {f"m{i + 1}"} for i in range(n - 1)})
+    octaves = compute_octave_distribution(g)
+    assert sum(o["modules"] for o in octaves) == n
+    assert not _dfs_cycles(g)
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.cli import main
+from gitcube.mapreduce import build_partial, merge_partials, partition
+
+
+def _write(root: Path, rel: str, text: str) -> None:
+    p = root / rel
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text, encoding="utf-8")
+
+
+def _monorepo(root: Path) -> Path:
+    # a1 -> b1 -> a2 -> a1 crosses packages; `utils` exists in both a and b
+    _write(root, "a/a1.py", "import b1\nimport os\n")
+    _write(root, "a/a2.py", "import a1\n")
+    _write(root, "a/utils.py", "import c1\n")
+    _write(root, "a/leaf.py", "import leaf2\n")
+    _write(root, "a/leaf2.py", "import leaf\n")  # local cycle, never leaves a
+    _write(root, "b/b1.py", "import a2\nimport utils\n")
+    _write(root, "b/utils.py", "import b1\n")
+    _write(root, "c/c1.py", "import utils\n")
+    _write(root, "c/self.py", "import self\n")
+    _write(root, "top.py", "import a1\n")
+    return root
+
+
+def test_merge_is_exact(tmp_path: Path):
+    root = _monorepo(tmp_path / "repo")
+    for mode in ("exclude", "keep"):
+        plain = analyze_repo_dict(root, disable_baseline=True, options=AnalysisOptions(externals=mode))
+        merged = analyze_repo_dict(root, disable_baseline=True, options=AnalysisOptions(externals=mode, map_reduce=True))
+        assert merged["metrics"] == plain["metrics"]
+        assert merged["graph"]["languages"] == plain["graph"]["languages"]
+        assert merged["file_count"] == plain["file_count"]
+    assert plain["metrics"]["cycle_index"] > 0.5
+
+    serial = analyze_repo_dict(root, disable_baseline=True, options=AnalysisOptions(map_reduce=True))
+    parallel = analyze_repo_dict(root, disable_baseline=True, options=AnalysisOptions(map_reduce=True, jobs=2))
+    assert parallel["metrics"] == serial["metrics"]
+
+
+def test_partials_are_compact_and_checked(tmp_path: Path):
+    root = _monorepo(tmp_path / "repo")
+    part = partition(root)
+    assert list(part.packages) == [".", "a", "b", "c"]
+    a = build_partial(part, "a")
+    # leaf/leaf2 cannot reach another package: settled locally, not shipped
+    assert a["cyclic_closed"] == 2
+    assert all("leaf" not in scc["members"] for scc in a["open"])
+    assert a["shared_edges"] == {"utils": ["c1"]}
+
+    with pytest.raises(ValueError, match="missing: c"):
+        merge_partials([build_partial(part, p) for p in (".", "a", "b")])
+
+
+def test_cli_partial_merge_roundtrip(tmp_path: Path, capsys):
+    root = _monorepo(tmp_path / "repo")
+    out = tmp_path / "partials"
+    out.mkdir()
+    assert main(["partial", str(root), "--all", "--out", str(out)]) == 0
+    files = sorted(str(p) for p in out.glob("*.partial.json"))
+    assert len(files) == 4
+    capsys.readouterr()
+    main(["merge", *files, "--path", str(tmp_path), "--json", "--no-baseline"])
+    report = json.loads(capsys.readouterr().out)
+    plain = analyze_repo_dict(root, disable_baseline=True)
+    assert report["metrics"] == plain["metrics"]
+    assert report["action"] == plain["action"]
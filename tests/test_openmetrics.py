@@ -0,0 +1,44 @@
+import threading
+import urllib.request
+from pathlib import Path
+from gitcube.analyze import analyze_repo_dict
+from gitcube.openmetrics import CONTENT_TYPE, MetricsRegistry, make_server, record_report, write_textfile
+from gitcube.profile import StageProfiler
+
+
+def test_textfile_exposition(tmp_path: Path):
+    (tmp_path/"a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path/"b.py").write_text("import a\n", encoding="utf-8")
+    prof = StageProfiler(track_memory=False).start()
+    report = analyze_repo_dict(tmp_path, update_baseline=True, profiler=prof)
+    assert "profile" not in report
+
+    reg = MetricsRegistry()
+    record_report(reg, report, profile=prof.to_dict())
+    record_report(reg, report, profile=prof.to_dict())
+    out = tmp_path / "gitcube.prom"
+    write_textfile(out, reg)
+    text = out.read_text(encoding="utf-8")
+
+    assert text.endswith("# EOF\n")
+    assert 'gitcube_stage_duration_seconds_count{stage="parse"} 2' in text
+    assert 'gitcube_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert "gitcube_files_scanned_total 4" in text
+    verdict = report["action"]["recommendation"]
+    assert f'gitcube_verdicts_total{{verdict="{verdict}"}} 2' in text
+    assert 'gitcube_baseline_samples{metric="cycle_index"} 1' in text
+
+
+def test_metrics_endpoint():
+    reg = MetricsRegistry()
+    reg.inc("gitcube_analyses", "Completed analyses.")
+    server = make_server(reg, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            assert resp.headers["Content-Type"] == CONTENT_TYPE
+            assert "gitcube_analyses_total 1" in resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
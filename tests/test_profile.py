@@ -0,0 +1,19 @@
+from pathlib import Path
+from gitcube.analyze import analyze_repo_dict
+
+
+def test_profile_section_only_when_enabled(tmp_path: Path):
+    (tmp_path/"a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path/"b.py").write_text("import a\nimport os\n", encoding="utf-8")
+
+    plain = analyze_repo_dict(tmp_path, disable_baseline=True)
+    assert "profile" not in plain
+
+    r = analyze_repo_dict(tmp_path, disable_baseline=True, profile=True)
+    stages = {s["stage"]: s for s in r["profile"]["stages"]}
+    assert {"walk", "read", "decode", "parse", "imports", "cycles", "report"} <= set(stages)
+    assert stages["read"]["files"] == 2
+    assert stages["decode"]["bytes"] == len("import b\n") + len("import a\nimport os\n")
+    assert stages["cycles"]["nodes"] == 2  # `os` is excluded as stdlib
+    assert r["profile"]["peak_memory_bytes"] > 0
+    assert r["metrics"] == plain["metrics"]
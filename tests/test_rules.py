@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import pytest
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.dna import build_structural_dna
+from gitcube.rules import RuleSet, _absolute, load_rules, parse_rule
+
+
+def test_trie_matches_prefixes_and_wildcards():
+    rs = RuleSet([parse_rule("api.* -> db"), parse_rule("*.tests -> app"), parse_rule("* -> legacy.old")])
+    assert rs.source_mask("api") == rs.source_mask("api.v1.views") == 0b001 | 0b100
+    assert rs.source_mask("apiclient") == 0b100
+    assert rs.source_mask("pkg.tests.test_x") == 0b110
+    assert rs._target_mask("db.models") == 0b001
+    assert rs._target_mask("legacy") == 0
+    assert rs._target_mask("legacy.old.x") == 0b100
+    with pytest.raises(ValueError):
+        parse_rule("api db")
+    with pytest.raises(ValueError):
+        RuleSet([parse_rule("a -> b")], severity="fatal")
+
+
+def test_relative_targets_resolve_against_source():
+    assert _absolute("api.v1.views", False, ".models") == "api.v1.models"
+    assert _absolute("api.v1.views", False, "..db") == "api.db"
+    assert _absolute("api", True, ".db") == "api.db"
+    rs = RuleSet([parse_rule("api -> db")])
+    rs.check("api.views", False, [("...db.models", 4), ("os", 1)], "api/views.py")
+    assert [(v.target, v.line) for v in rs.violations] == [("db.models", 4)]
+    assert rs.checked == 2
+
+
+def test_dna_carries_l_only_with_rules():
+    base = dict(metrics={}, thresholds={}, gate="ALLOW", n_nodes=1)
+    assert "L" not in build_structural_dna(**base)["signature"]
+    warn = build_structural_dna(**base, rules={"violations": 3, "severity": "warn"})
+    assert warn["signature"].endswith("L1")
+    clean = build_structural_dna(**base, rules={"violations": 0, "severity": "block"})
+    assert clean["signature"].endswith("L0")
+
+
+def _write(root: Path, rel: str, text: str) -> None:
+    p = root / rel
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text, encoding="utf-8")
+
+
+def test_violations_gate_and_report(tmp_path: Path):
+    _write(tmp_path, "api/__init__.py", "")
+    _write(tmp_path, "api/views.py", "import os\nfrom db.models import User\n")
+    _write(tmp_path, "db/models.py", "User = object\n")
+    assert load_rules(tmp_path / "pyproject.toml") is None
+    report = analyze_repo_dict(tmp_path, disable_baseline=True)
+    assert "rules" not in report and report["action"]["reason"] != "rule_violation"
+
+    _write(tmp_path, "pyproject.toml", '[tool.gitcube.rules]\nseverity = "warn"\nforbid = ["api -> db.*"]\n')
+    report = analyze_repo_dict(tmp_path, disable_baseline=True)
+    assert report["rules"]["items"] == [
+        {"rule": "api -> db.*", "from": "api.views", "to": "db.models", "at": "api/views.py:2"}
+    ]
+    assert report["action"]["recommendation"] == "WARN"
+    assert report["dna"]["signature"].endswith("L1")
+
+    _write(tmp_path, "pyproject.toml", '[tool.gitcube.rules]\nforbid = ["api -> db"]\n')
+    external = analyze_repo_dict(
+        tmp_path, disable_baseline=True, options=AnalysisOptions(external=True, store_path=tmp_path / "x.sqlite")
+    )
+    assert external["rules"]["violations"] == 1
+    assert external["action"] == {"recommendation": "BLOCK", "reason": "rule_violation"}
+
+
+def test_only_the_rules_table_is_parsed(tmp_path: Path, monkeypatch):
+    import gitcube.rules as rules_mod
+
+    pyproject = tmp_path / "pyproject.toml"
+    _write(tmp_path, "pyproject.toml", '[project]\nname = "gitcube-plugin"\n[tool.gitcube]\nx = [\n')
+    monkeypatch.setattr(rules_mod, "_toml_parser", lambda: pytest.fail("parsed without a rules table"))
+    assert load_rules(pyproject) is None
+
+    _write(tmp_path, "pyproject.toml", '[tool.gitcube.rules]\nforbid = ["api -> db"]\n')
+    monkeypatch.setattr(rules_mod, "_toml_parser", lambda: None)  # Python 3.10 without tomli
+    with pytest.warns(RuntimeWarning, match="tomli"):
+        assert load_rules(pyproject) is None
+
+
+def test_cli_rejects_bad_rules_and_warns_on_unchecked_modes(tmp_path: Path, capsys):
+    from gitcube.cli import main
+
+    _write(tmp_path, "api/views.py", "import db\n")
+    _write(tmp_path, "pyproject.toml", '[tool.gitcube.rules]\nforbid = ["api db"]\n')
+    with pytest.raises(SystemExit) as exc:
+        main(["analyze", str(tmp_path), "--json", "--no-baseline"])
+    assert exc.value.code == 2
+    assert "expected 'SOURCE -> TARGET'" in capsys.readouterr().err
+
+    _write(tmp_path, "pyproject.toml", "[tool.gitcube.rules]\nforbid = [\n")
+    with pytest.raises(SystemExit):
+        main(["analyze", str(tmp_path), "--json", "--no-baseline"])
+    assert "pyproject.toml" in capsys.readouterr().err
+
+    _write(tmp_path, "pyproject.toml", '[tool.gitcube.rules]\nforbid = ["api -> db"]\n')
+    main(["analyze", str(tmp_path), "--json", "--no-baseline", "--map-reduce"])
+    assert "not checked with" in capsys.readouterr().err
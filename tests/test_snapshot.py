@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from gitcube.cli import main
+from gitcube.graph import Graph
+from gitcube.metrics import compute_metrics
+from gitcube.snapshot import Snapshot, SnapshotStore, encode_snapshot
+
+
+def _graph() -> Graph:
+    edges = {
+        "a": {"b", "ü"},
+        "b": {"a"},
+        "ü": set(),
+        "js:app": {"js:lib"},
+        "js:lib": {"js:app"},
+    }
+    lang = {"a": "python", "b": "python", "ü": "python", "js:app": "javascript", "js:lib": "javascript"}
+    return Graph(nodes=set(edges), edges=edges, lang=lang)
+
+
+def test_roundtrip(tmp_path: Path):
+    g = _graph()
+    m = compute_metrics(g, [])
+    p = tmp_path / "t.gcs"
+    p.write_bytes(encode_snapshot(g, m, tree="ab" * 20, meta={"granularity": "module"}))
+    with Snapshot(p) as snap:
+        assert (snap.n_nodes, snap.n_edges, snap.tree) == (5, 5, "ab" * 20)
+        assert snap.metrics["cycle_index"] == m.cycle_index
+        back = snap.to_graph()
+        assert back.edges == g.edges and back.lang == g.lang
+        a, u = snap.find("a"), snap.find("ü")
+        assert snap.name(u) == "ü" and snap.find("zz") is None
+        assert sorted(snap.name(v) for v in snap.successors(a)) == ["b", "ü"]
+        groups = sorted(sorted(snap.name(x) for x in us) for us in snap.components().values())
+        assert groups == [["a", "b"], ["js:app", "js:lib"]]
+
+    data = bytearray(p.read_bytes())
+    data[8] = 99  # version
+    p.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version"):
+        Snapshot(p)
+
+
+def test_store_evicts_least_recently_used(tmp_path: Path):
+    g = _graph()
+    m = compute_metrics(g, [])
+    size = len(encode_snapshot(g, m, tree="x"))
+    store = SnapshotStore(tmp_path, max_bytes=2 * size + size // 2)
+    for i, key in enumerate(("old", "mid")):
+        store.save(key, g, m, tree=key)
+        os.utime(store.path(key), (1000 + i, 1000 + i))
+    store.open("old").close()  # touch: "mid" is now the least recently used
+    store.save("new", g, m, tree="new")
+    assert sorted(e.key for e in store.entries()) == ["new", "old"]
+    assert store.open("mid") is None
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_analyze_writes_snapshot_for_tree(tmp_path: Path, capsys):
+    (tmp_path / "a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("import a\n", encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+
+    main(["analyze", str(tmp_path), "--json", "--no-baseline"])
+    report = json.loads(capsys.readouterr().out)
+    assert main(["snapshot", str(tmp_path), "--json", "--node", "a"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["metrics"]["entropy_score"] == report["metrics"]["entropy_score"]
+    assert out["node"] == {"name": "a", "lang": "python", "imports": ["b"], "scc": ["b"]}
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_dirty_tree_snapshot_is_not_filed_under_head(tmp_path: Path, capsys):
+    from gitcube.gate import tree_hash, worktree_hash
+    from gitcube.snapshot import default_snapshot_dir
+
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    (tmp_path / "b.py").write_text("import a\n", encoding="utf-8")  # untracked edit
+
+    main(["analyze", str(tmp_path), "--json", "--no-baseline", "--no-verdict-cache"])
+    capsys.readouterr()
+    store = SnapshotStore(default_snapshot_dir(tmp_path))
+    assert store.open(tree_hash(str(tmp_path))) is None
+    assert store.open(worktree_hash(str(tmp_path))).n_nodes == 2
+    assert main(["snapshot", str(tmp_path), "--json"]) != 0
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_snapshot_with_untracked_non_source_is_found_via_head(tmp_path: Path, capsys):
+    (tmp_path / "a.py").write_text("import b\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("x = 1\n", encoding="utf-8")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    (tmp_path / "report.json").write_text("{}\n", encoding="utf-8")
+
+    main(["analyze", str(tmp_path), "--json", "--no-baseline"])
+    capsys.readouterr()
+    assert main(["snapshot", str(tmp_path), "--json", "--node", "a"]) == 0
+    assert json.loads(capsys.readouterr().out)["node"]["imports"] == ["b"]
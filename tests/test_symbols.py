@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from gitcube.analyze import AnalysisOptions, analyze_repo_dict
+from gitcube.ingest import ingest_files
+from gitcube.symbols import SymbolIndex, build_symbol_graph, module_qualname
+
+
+def _write(root: Path, rel: str, text: str) -> None:
+    p = root / rel
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text, encoding="utf-8")
+
+
+def _repo(root: Path) -> Path:
+    _write(root, "pkg/__init__.py", "from .core import Engine\n")
+    _write(
+        root,
+        "pkg/core.py",
+        "import os\nfrom .sub import utils\n\n"
+        "class Engine:\n"
+        "    def run(self):\n        return self.step() + utils.helper()\n\n"
+        "    def step(self):\n        return os.getcwd()\n",
+    )
+    _write(root, "pkg/sub/__init__.py", "")
+    _write(root, "pkg/sub/utils.py", "def helper():\n    from pkg import Engine\n    return Engine\n\ndef unused():\n    return 1\n")
+    _write(root, "pkg/sub/core.py", "def other():\n    pass\n")
+    return root
+
+
+def test_qualified_nodes_and_resolved_edges(tmp_path: Path):
+    root = _repo(tmp_path / "repo")
+    g = build_symbol_graph(root, ingest_files(root))
+    assert module_qualname(root / "pkg" / "__init__.py", root) == "pkg"
+    # same stem, different packages: two nodes
+    assert {"pkg.core", "pkg.sub.core"} <= g.nodes
+    assert g.edges["pkg.core.Engine.run"] == {"pkg.core.Engine.step", "pkg.sub.utils.helper"}
+    # re-export through pkg/__init__.py resolves to the defining module
+    assert g.edges["pkg.sub.utils.helper"] == {"pkg.core.Engine"}
+    assert g.edges["pkg.core.Engine.step"] == {"os"}
+    assert g.edges["pkg.sub.utils.unused"] == set()
+
+
+def test_tables_are_lazy_and_memoized(tmp_path: Path):
+    root = _repo(tmp_path / "repo")
+    index = SymbolIndex(root, ingest_files(root))
+    assert not index._tables
+    t = index.table("pkg.core")
+    assert index.table("pkg.core") is t
+    assert set(index._tables) == {"pkg.core"}
+    assert index.resolve("pkg.Engine.run") == "pkg.core.Engine.run"
+    assert set(index._tables) == {"pkg.core", "pkg"}
+
+
+def test_symbol_granularity_report(tmp_path: Path):
+    root = _repo(tmp_path / "repo")
+    r = analyze_repo_dict(root, disable_baseline=True, options=AnalysisOptions(granularity="symbol"))
+    assert r["graph"]["granularity"] == "symbol"
+    assert r["graph"]["externals"]["stdlib"] == 1
+    assert r["metrics"]["cycle_index"] == 0.0
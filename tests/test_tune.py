@@ -0,0 +1,76 @@
+import random
+from pathlib import Path
+
+from gitcube.baseline import RepoBaseline, thresholds_for_metric
+from gitcube.cli import main
+from gitcube.dna_history import DNAHistory, default_history_path
+from gitcube.tune import GATED, MIN_SAMPLES, parse_grid, rolling_median_mad, tune_grid, tune_history
+
+
+def _series(n: int, seed: int = 7):
+    r = random.Random(seed)
+    out = {k: [] for k in GATED}
+    for t in range(n):
+        out["entropy_score"].append(0.2 + 0.01 * r.gauss(0, 1) + (0.05 if t % 37 == 0 else 0.0))
+        out["cycle_index"].append(0.1 if t < n // 2 else 0.1 + 0.001 * r.random())  # flat, then noisy
+        out["density"].append(0.01 + 0.002 * r.random())
+    return out
+
+
+def _replay(series, window, warn_k, block_k):
+    """The live gate, one run at a time: thresholds from history, then update."""
+    b = RepoBaseline(window=window)
+    verdicts = []
+    for t in range(len(series["density"])):
+        values = {k: series[k][t] for k in GATED}
+        if t >= MIN_SAMPLES:
+            levels = []
+            for k, v in values.items():
+                th = thresholds_for_metric(key=k, value=v, n_nodes=1, n_edges=0, baseline=b, warn_k=warn_k, block_k=block_k)
+                levels.append(2 if v >= th.block else 1 if v >= th.warn else 0)
+            verdicts.append(max(levels))
+        b.update(values)
+    return verdicts
+
+
+def test_rolling_stats_match_baseline():
+    xs = _series(60)["entropy_score"]
+    med, mad = rolling_median_mad(xs, 12)
+    for i, t in enumerate(range(MIN_SAMPLES, len(xs))):
+        b = RepoBaseline(window=12)
+        for x in xs[:t]:
+            b.update({"x": x})
+        m, d, _ = b.stats("x")
+        assert abs(med[i] - m) < 1e-12 and abs(mad[i] - d) < 1e-12
+
+
+def test_grid_matches_naive_replay():
+    series = _series(200)
+    rows = tune_grid(series, windows=[10, 30], warn_ks=[1.0, 3.0], block_ks=[2.0, 4.0])
+    assert len(rows) == 2 * 3  # (3.0, 2.0): block_k < warn_k is skipped
+    for r in rows:
+        v = _replay(series, r["window"], r["warn_k"], r["block_k"])
+        assert r["runs"] == len(v)
+        assert r["flips"] == sum(1 for a, b in zip(v, v[1:]) if a != b)
+        assert r["block_rate"] == v.count(2) / len(v)
+        assert r["warn_rate"] == v.count(1) / len(v)
+    assert [r["flip_rate"] for r in rows] == sorted(r["flip_rate"] for r in rows)
+
+
+def test_parse_grid_and_current():
+    assert parse_grid("1:2:0.25") == [1.0, 1.25, 1.5, 1.75, 2.0]
+    assert parse_grid("10, 30") == [10.0, 30.0]
+    out = tune_history(_series(40), windows=[10], warn_ks=[2.0], block_ks=[3.0])
+    assert (out["current"]["window"], out["current"]["warn_k"], out["current"]["block_k"]) == (30, 1.5, 3.0)
+    assert out["settings"] == 2 * 2
+
+
+def test_cli_reads_dna_history(tmp_path: Path, capsys):
+    hist = DNAHistory(default_history_path(tmp_path))
+    series = _series(30)
+    for t in range(30):
+        symbols = {s: {"value": series[k][t]} for s, k in (("P", "entropy_score"), ("C", "cycle_index"), ("D", "density"))}
+        hist.append(dna={"symbols": symbols}, ts=1_700_000_000 + 3600 * t)
+    assert main(["tune", str(tmp_path), "--windows", "10", "--warn-k", "1.5", "--block-k", "3", "--top", "1"]) == 0
+    text = capsys.readouterr().out
+    assert "Replayed 30 run(s) over 2 setting(s)" in text and "current:" in text
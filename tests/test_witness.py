@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from gitcube.analyze import analyze_repo_dict
+from gitcube.graph import Graph, _go_import_lines, _js_import_lines
+from gitcube.witness import _shortest_cycle, witness_cycles
+
+
+def test_located_extractors():
+    js = "// x\nimport a from './a'\n\nconst b = require('b')\n"
+    assert _js_import_lines(js) == [("js:a", 2), ("js:b", 4)]
+    go = 'package m\n\nimport (\n\t"fmt"\n\tx "example.com/lib"\n)\nimport "os"\n'
+    assert sorted(_go_import_lines(go)) == [("go:fmt", 4), ("go:lib", 5), ("go:os", 7)]
+
+
+def test_shortest_cycle_is_bounded_to_component():
+    # long cycle 0->1->2->3->0 plus a chord 2->0; 4 is outside the SCC
+    adj = [[1, 4], [2], [3, 0], [0], [0]]
+    comp = [1, 1, 1, 1, 0]
+    assert sorted(_shortest_cycle(adj, comp, [0, 1, 2, 3])) == [0, 1, 2]
+
+
+def test_witness_without_provenance_uses_names():
+    g = Graph(nodes={"a", "b", "s"}, edges={"a": {"b"}, "b": {"a"}, "s": {"s"}})
+    w = witness_cycles(g)
+    assert w["sccs"] == 2
+    assert [x["path"] for x in w["witnesses"]] == ["a -> b -> a", "s -> s"]
+
+
+def test_report_points_at_import_lines(tmp_path: Path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text('"""doc"""\nimport os\nimport b\n', encoding="utf-8")
+    (tmp_path / "b.py").write_text("def f():\n    pass\nimport c\n", encoding="utf-8")
+    (tmp_path / "c.py").write_text("from a import x\nimport a\n", encoding="utf-8")
+    (tmp_path / "ok.py").write_text("import a\n", encoding="utf-8")
+    report = analyze_repo_dict(tmp_path, disable_baseline=True)
+    (w,) = report["cycles"]["witnesses"]
+    assert w["path"] == "pkg/a.py:3 -> b.py:3 -> c.py:1 -> pkg/a.py"
+    assert (w["size"], w["length"]) == (3, 3)
+
+    (tmp_path / "c.py").write_text("x = 1\n", encoding="utf-8")
+    assert "cycles" not in analyze_repo_dict(tmp_path, disable_baseline=True)
+
+
+
+def _girth(adj, members):
+    best = None
+    for s in members:
+        dist, todo = {s: 0}, [s]
+        for u in todo:
+            for v in adj[u]:
+                if v == s and (best is None or dist[u] + 1 < best):
+                    best = dist[u] + 1
+                if v in members and v not in dist:
+                    dist[v] = dist[u] + 1
+                    todo.append(v)
+    return best
+
+
+def test_shortest_cycle_checks_every_member():
+    import random
+
+    from gitcube.metrics import strongly_connected_components
+
+    # 40-node ring with chords from every even node, plus x <-> y hanging off it:
+    # x and y have the lowest degrees, so a top-degree start heuristic misses them
+    n, x, y = 40, 40, 41
+    adj = [[(i + 1) % n] + ([(i + 7) % n, (i + 13) % n] if i % 2 == 0 else []) for i in range(n)]
+    adj[1].append(x)
+    adj += [[y], [x, 3]]
+    assert sorted(_shortest_cycle(adj, [0] * len(adj), list(range(len(adj))))) == [x, y]
+
+    r = random.Random(3)
+    for _ in range(200):
+        k = r.randint(3, 30)
+        adj = [sorted({r.randrange(k) for _ in range(r.randint(1, 3))} - {u}) for u in range(k)]
+        comp, _ = strongly_connected_components(adj)
+        for c in set(comp):
+            members = [u for u in range(k) if comp[u] == c]
+            if len(members) > 1:
+                cyc = _shortest_cycle(adj, comp, members)
+                assert len(cyc) == _girth(adj, set(members))
+                assert all(cyc[(i + 1) % len(cyc)] in adj[u] for i, u in enumerate(cyc))
@@ -0,0 +1,45 @@
+import importlib.util
+import io
+import json
+import sys
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location("yantra_bridge", Path(__file__).resolve().parents[1] / "yantra_bridge.py")
+yb = sys.modules["yantra_bridge"] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(yb)
+
+REPORT = {
+    "tool": "gitcube-core",
+    "path": '/tmp/"metrics": x',
+    "metrics": {"entropy_score": 0.3, "cycle_index": 0.2, "density": 0.5},
+    "action": {"recommendation": "WARN", "reason": "threshold_warn"},
+    "thresholds": {"density": {"warn": 0.1, "block": 0.2}},
+    "dna": {"signature": "G1 P1 C1 D0 S0 R0 K0", "symbols": {"G": {"level": 1}}},
+}
+
+
+def test_partial_parse_matches_full_parse():
+    line = json.dumps(REPORT)
+    assert yb.report_to_packet(yb.parse_report_fields(line)) == yb.report_to_packet(REPORT)
+    # indented reports and missing sections fall back cleanly
+    assert yb.parse_report_fields(json.dumps(REPORT, indent=2))["metrics"] == REPORT["metrics"]
+    assert yb.parse_report_fields('{"tool": "x"}') == {"tool": "x"}
+
+
+def test_stream_convert_in_order_and_skips_bad_lines():
+    lines = []
+    for rec in ["ALLOW", "BLOCK", "WARN"] * 50:
+        r = dict(REPORT, action={"recommendation": rec})
+        lines.append(json.dumps(r))
+    lines.insert(7, "not json")
+    src = io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+    out = io.StringIO()
+    blocks, errors = yb.stream_convert(src, out, block_size=1 << 16)
+    packets = [json.loads(l) for l in out.getvalue().splitlines()]
+    assert errors == 1 and len(packets) == 150
+    assert [p["octave"] for p in packets[:3]] == [5, 1, 3]
+
+    src.seek(0)
+    out2 = io.StringIO()
+    yb.stream_convert(src, out2, workers=2, block_size=1 << 16)
+    assert out2.getvalue() == out.getvalue()
@@ -11,13 +11,25 @@ Output: a minimal VPacket-like dict (octave/strength/coherence/shadow)
 Run:
   gitcube analyze . --json > report.json
   python examples/yantra_bridge.py report.json
+
+Streaming (one JSON report per line in, one packet per line out):
+  cat reports.jsonl | python examples/yantra_bridge.py --stream - > packets.jsonl
+  python examples/yantra_bridge.py --stream reports.jsonl --workers 8 > packets.jsonl
+
+Input is read in newline-aligned byte blocks and parsed line by line, so
+memory stays flat regardless of input size. With --workers, blocks are
+parsed and mapped in a process pool (bounded in-flight blocks, output order
+preserved). Lines that fail to parse are reported on stderr and skipped.
 """
 
 from __future__ import annotations
 
+import argparse
 import json
 import sys
+from collections import deque
 from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Tuple
 
 
 def clamp(x: float, lo: float = 0.0, hi: float = 1.0) -> float:
@@ -29,12 +41,7 @@ def map_to_octave(rec: str) -> int:
     return {"ALLOW": 5, "WARN": 3, "BLOCK": 1}.get(rec, 2)
 
 
-def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: python examples/yantra_bridge.py report.json")
-        return 2
-
-    r = json.loads(Path(sys.argv[1]).read_text(encoding="utf-8"))
+def report_to_packet(r: dict) -> dict:
     rec = r.get("action", {}).get("recommendation", "UNKNOWN")
     m = r.get("metrics", {})
 
@@ -49,7 +56,7 @@ def main() -> int:
     # Strength = how decisive the structure is (low entropy -> strong).
     strength = clamp(0.15 + 0.85 * coherence)
 
-    pkt = {
+    return {
         "content": "gitcube_report",
         "topic": "logic",
         "octave": map_to_octave(str(rec)),
@@ -65,7 +72,144 @@ def main() -> int:
         },
     }
 
-    print(json.dumps(pkt, indent=2, ensure_ascii=False))
+
+_decoder = json.JSONDecoder()
+_loads = _decoder.decode
+_raw_decode = _decoder.raw_decode
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_WS = " \t\r\n"
+
+
+def _value_at(line: str, key: str, start: int = 0):
+    """Decode only the value of the first ``"key":`` at or after ``start``.
+
+    A quoted key cannot occur inside a JSON string value (its quotes would be
+    escaped), so the first match is a real key; callers only use keys that
+    appear once in a GitCube report.
+    """
+    i = line.find(f'"{key}":', start)
+    if i == -1:
+        raise KeyError(key)
+    i += len(key) + 3
+    while line[i] in _WS:
+        i += 1
+    return _raw_decode(line, i)[0]
+
+
+def parse_report_fields(line: str) -> dict:
+    """Partial parse: just the fields report_to_packet reads.
+
+    Skips thresholds, DNA symbol tables, octaves and profiles, which make up
+    most of a report. Falls back to a full parse if anything is off.
+    """
+    try:
+        dna_at = line.find('"dna":')
+        return {
+            "action": _value_at(line, "action"),
+            "metrics": _value_at(line, "metrics"),
+            "dna": {"signature": _value_at(line, "signature", dna_at)} if dna_at != -1 else {},
+        }
+    except (KeyError, ValueError, IndexError):
+        return _loads(line)
+
+
+def convert_lines(lines: Iterable[str]) -> Tuple[str, int]:
+    """Map raw JSONL report lines to packet lines; returns (output, n_errors)."""
+    out: List[str] = []
+    errors = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            out.append(_dumps(report_to_packet(parse_report_fields(line))))
+        except (ValueError, TypeError, AttributeError):
+            errors += 1
+    return ("\n".join(out) + "\n") if out else "", errors
+
+
+def convert_block(block: bytes) -> Tuple[str, int]:
+    return convert_lines(block.decode("utf-8", errors="replace").splitlines())
+
+
+def _blocks(stream: IO[bytes], size: int) -> Iterator[bytes]:
+    """Yield newline-terminated byte blocks of roughly ``size`` bytes.
+
+    Shipping one bytes object per block to a worker is a single memcpy,
+    far cheaper than pickling thousands of str lines.
+    """
+    tail = b""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunk = tail + chunk
+        cut = chunk.rfind(b"\n")
+        if cut == -1:
+            tail = chunk
+            continue
+        tail = chunk[cut + 1 :]
+        yield chunk[: cut + 1]
+    if tail:
+        yield tail
+
+
+def stream_convert(src: IO[bytes], dst: IO[str], *, workers: int = 0, block_size: int = 1 << 22) -> Tuple[int, int]:
+    """Convert a binary JSONL stream; returns (blocks, parse errors)."""
+    n_blocks = 0
+    n_errors = 0
+    if workers <= 0:
+        for block in _blocks(src, block_size):
+            text, err = convert_block(block)
+            dst.write(text)
+            n_blocks += 1
+            n_errors += err
+        return n_blocks, n_errors
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        inflight: deque = deque()  # bounded: at most 2 blocks per worker
+        for block in _blocks(src, block_size):
+            inflight.append(ex.submit(convert_block, block))
+            if len(inflight) >= 2 * workers:
+                text, err = inflight.popleft().result()
+                dst.write(text)
+                n_blocks += 1
+                n_errors += err
+        while inflight:
+            text, err = inflight.popleft().result()
+            dst.write(text)
+            n_blocks += 1
+            n_errors += err
+    return n_blocks, n_errors
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Map GitCube reports to VPacket-like records")
+    p.add_argument("report", nargs="?", help="report.json (single-report mode)")
+    p.add_argument("--stream", metavar="JSONL", help="Stream JSONL reports from a file, or '-' for stdin")
+    p.add_argument("--workers", type=int, default=0, help="Process pool size for --stream (0 = in-process)")
+    p.add_argument("--block-mb", type=float, default=4.0, help="Input bytes per work unit for --stream")
+    args = p.parse_args(None if argv is None else list(argv))
+
+    if args.stream:
+        src = sys.stdin.buffer if args.stream == "-" else open(args.stream, "rb")
+        block_size = max(1 << 16, int(args.block_mb * (1 << 20)))
+        try:
+            _, errors = stream_convert(src, sys.stdout, workers=args.workers, block_size=block_size)
+        finally:
+            if src is not sys.stdin.buffer:
+                src.close()
+        if errors:
+            print(f"[yantra_bridge] skipped {errors} unparsable line(s)", file=sys.stderr)
+        return 0
+
+    if not args.report:
+        print("Usage: python examples/yantra_bridge.py report.json")
+        return 2
+
+    r = json.loads(Path(args.report).read_text(encoding="utf-8"))
+    print(json.dumps(report_to_packet(r), indent=2, ensure_ascii=False))
     return 0
 
 